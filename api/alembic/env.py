@@ -55,6 +55,7 @@ from app.v1.electricity_monitoring.models.circuit import Circuit
 from app.v1.electricity_monitoring.models.clamp import Clamp
 from app.v1.electricity_monitoring.models.electric_panel import ElectricPanel
 from app.v1.electricity_monitoring.models.electric_sensor import ElectricSensor
+from app.v1.electricity_monitoring.models.circuit_energy_rollup import CircuitHourlyEnergyRollup, CircuitDailyEnergyRollup, CircuitEnergyRollupProgress
 
 from app.v1.appliances.models.appliance_type import ApplianceType
 from app.v1.appliances.models.appliance import Appliance
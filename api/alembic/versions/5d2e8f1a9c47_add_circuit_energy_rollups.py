@@ -0,0 +1,52 @@
+"""add circuit energy rollups
+
+Revision ID: 5d2e8f1a9c47
+Revises: b97099897e3a
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d2e8f1a9c47'
+down_revision = 'b97099897e3a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('circuit_hourly_energy_rollups',
+    sa.Column('circuit_id', sa.Uuid(), nullable=False),
+    sa.Column('hour_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('local_hour_start', sa.DateTime(), nullable=False),
+    sa.Column('kwh', sa.Float(), nullable=False),
+    sa.Column('money', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['circuit_id'], ['circuits.circuit_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('circuit_id', 'hour_start')
+    )
+    op.create_table('circuit_daily_energy_rollups',
+    sa.Column('circuit_id', sa.Uuid(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('day_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('kwh', sa.Float(), nullable=False),
+    sa.Column('money', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['circuit_id'], ['circuits.circuit_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('circuit_id', 'day')
+    )
+    op.create_table('circuit_energy_rollup_progress',
+    sa.Column('circuit_id', sa.Uuid(), nullable=False),
+    sa.Column('timezone', sa.String(), nullable=False),
+    sa.Column('hourly_rolled_up_until', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('daily_rolled_up_until', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['circuit_id'], ['circuits.circuit_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('circuit_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('circuit_energy_rollup_progress')
+    op.drop_table('circuit_daily_energy_rollups')
+    op.drop_table('circuit_hourly_energy_rollups')
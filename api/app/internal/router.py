@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Security
@@ -9,6 +9,7 @@ from app.internal.schemas.location_hvac_schedules_metadata import PostLocationHv
 from app.internal.schemas.location_temperature_sensor_metadata import PostLocationTemperatureSensorMetadataResponse
 from app.internal.schemas.location_thermostat_metadata import PostLocationThermostatsMetadataResponse
 from app.internal.schemas.metadata_statistic import ExportedSlim, FailedSlim, MetadataStatisticModel, StatisticSlim
+from app.px.pxmetrics import metrics
 from app.v1.dependencies import (
     get_dp_pes_service,
     get_electricity_dashboards_service,
@@ -43,6 +44,14 @@ from app.v3_adapter.electric_widgets.schemas import ElectricWidgetType
 router = APIRouter(tags=['internal'])
 
 
+@router.get(
+    '/metrics',
+    dependencies=[Security(verify_api_key_authorization, scopes=[AccessScope.ADMIN])],
+)
+def get_metrics() -> Dict[str, Any]:
+    return metrics.snapshot()
+
+
 @router.post(
     '/electric-dashboards/{electricity_dashboard_id}/widgets',
     dependencies=[Security(verify_api_key_authorization, scopes=[AccessScope.ADMIN])],
@@ -1,19 +1,73 @@
-from typing import Final, Literal
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Final, Literal
 from uuid import uuid4
 from fastapi import FastAPI, Request, Response
 from starlette.middleware.cors import CORSMiddleware
 from starlette.middleware.gzip import GZipMiddleware
 
 from app.px.pxlogger import PxContext, PxLogger, PxNote
+from app.px.pxmetrics import metrics
 from app.internal.router import router as internal_router
+from app.v1.dependencies import (
+    REDIS_CACHE_DATABASE_INDEX,
+    REDIS_CONSUMER_CACHE_DATABASE_INDEX,
+    REDIS_LOCATION_AGGREGATED_DATA_CACHE_DATABASE_INDEX,
+    get_dp_pes_client,
+    get_redis_cache_invalidation_listeners,
+    get_redis_connection_pools,
+    get_redis_local_caches,
+    get_timestream_client,
+)
 from app.v1.router import router as v1_router
 from app.v3_adapter.router import router as v3_adapter_router
 
 
 _logger: Final = PxLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    redis_connection_pools = get_redis_connection_pools()
+    for database_index in (
+        REDIS_CACHE_DATABASE_INDEX,
+        REDIS_CONSUMER_CACHE_DATABASE_INDEX,
+        REDIS_LOCATION_AGGREGATED_DATA_CACHE_DATABASE_INDEX,
+    ):
+        redis_connection_pools.get_pool(database_index)
+    redis_connection_pools.register_metrics(metrics)
+    for database_index, local_cache in get_redis_local_caches().items():
+        local_cache.register_metrics(metrics, f'redis_local_cache.db{database_index}')
+    for invalidation_listener in get_redis_cache_invalidation_listeners():
+        try:
+            invalidation_listener.start()
+        except Exception as e:
+            _logger.warning(
+                PxNote("Cache invalidation listener could not be started, local cache entries will only expire by TTL"),
+                exc_info=e,
+            )
+    dp_pes_client = get_dp_pes_client()
+    try:
+        get_timestream_client()
+    except Exception as e:
+        _logger.warning(
+            PxNote("Timestream client could not be created at startup"),
+            exc_info=e,
+        )
+    try:
+        yield
+    finally:
+        for invalidation_listener in get_redis_cache_invalidation_listeners():
+            invalidation_listener.stop()
+        for database_index, local_cache in get_redis_local_caches().items():
+            local_cache.unregister_metrics(metrics, f'redis_local_cache.db{database_index}')
+        redis_connection_pools.unregister_metrics(metrics)
+        redis_connection_pools.close()
+        dp_pes_client.close()
+
+
 app: Final = FastAPI(
-    title='powerx-api'
+    title='powerx-api',
+    lifespan=lifespan,
 )
 
 
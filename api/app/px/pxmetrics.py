@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable, Generator, Mapping
+from contextlib import contextmanager
+from typing import Any, Final
+
+
+class _Timing:
+    __slots__ = ("count", "total_s", "max_s")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total_s += seconds
+        self.max_s = max(self.max_s, seconds)
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "total_s": round(self.total_s, 6),
+            "avg_s": round(self.total_s / self.count, 6) if self.count else 0.0,
+            "max_s": round(self.max_s, 6),
+        }
+
+
+class PxMetrics:
+    """
+    A process-local registry of counters, timings and gauges.
+
+    Counters and timings are accumulated in memory for the lifetime of the process. Gauges are
+    callables registered by their owners (e.g. connection pools) and are evaluated lazily when a
+    snapshot is taken, so they always report the current state.
+
+    Every uvicorn worker keeps its own registry; aggregation across workers is left to whoever
+    scrapes the snapshots.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = {}
+        self._timings: dict[str, _Timing] = {}
+        self._gauges: dict[str, Callable[[], Mapping[str, Any]]] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                timing = self._timings[name] = _Timing()
+            timing.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str) -> Generator[None, None, None]:
+        """
+        Measures the wall time of the managed block and records it under ``name``.
+
+        The time is recorded even when the block raises.
+        """
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started_at)
+
+    def register_gauge(self, name: str, provider: Callable[[], Mapping[str, Any]]) -> None:
+        with self._lock:
+            self._gauges[name] = provider
+
+    def unregister_gauge(self, name: str) -> None:
+        with self._lock:
+            self._gauges.pop(name, None)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+            timings = {name: timing.as_dict() for name, timing in self._timings.items()}
+            gauges = dict(self._gauges)
+        return {
+            "counters": counters,
+            "timings": timings,
+            "gauges": {name: dict(provider()) for name, provider in gauges.items()},
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+
+metrics: Final = PxMetrics()
@@ -1,6 +1,52 @@
 from abc import ABC, abstractmethod
-from collections.abc import Mapping
-from typing import Optional, Union
+from collections.abc import Mapping, Sequence
+from contextlib import AbstractContextManager
+from typing import Any, List, Optional, Tuple, Union
+
+
+CacheValue = Union[str, int, float]
+
+
+class CachePipeline(ABC):
+    """
+    Queues cache commands and sends them in a single round trip on ``execute``.
+
+    Each queueing method returns the pipeline so calls can be chained. ``execute`` returns one
+    result per queued command, in order, with the same shape the equivalent ``Cache`` method would
+    return (e.g. ``None`` for a missing key or hash).
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> 'CachePipeline':
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: CacheValue, expire_in_seconds: Optional[int] = None) -> 'CachePipeline':
+        pass
+
+    @abstractmethod
+    def set_if_absent(self, key: str, value: CacheValue, expire_in_seconds: Optional[int] = None) -> 'CachePipeline':
+        pass
+
+    @abstractmethod
+    def delete(self, *keys: str) -> 'CachePipeline':
+        pass
+
+    @abstractmethod
+    def hget(self, name: str, key: str) -> 'CachePipeline':
+        pass
+
+    @abstractmethod
+    def hmget(self, name: str, keys: Sequence[str]) -> 'CachePipeline':
+        pass
+
+    @abstractmethod
+    def hgetall(self, key: str) -> 'CachePipeline':
+        pass
+
+    @abstractmethod
+    def execute(self) -> List[Any]:
+        pass
 
 
 class Cache(ABC):
@@ -10,7 +56,17 @@ class Cache(ABC):
         pass
 
     @abstractmethod
-    def set(self, key: str, value: Union[str, int, float], expire_in_seconds: Optional[int] = None) -> bool:
+    def set(self, key: str, value: CacheValue, expire_in_seconds: Optional[int] = None) -> bool:
+        pass
+
+    @abstractmethod
+    def set_if_absent(self, key: str, value: CacheValue, expire_in_seconds: Optional[int] = None) -> bool:
+        """Sets ``key`` only if it does not exist yet, returning whether it was set."""
+        pass
+
+    @abstractmethod
+    def delete(self, *keys: str) -> int:
+        """Deletes ``keys``, returning how many of them existed."""
         pass
 
     @abstractmethod
@@ -20,3 +76,46 @@ class Cache(ABC):
     @abstractmethod
     def hgetall(self, key: str) -> Mapping[str, str | int | float] | None:
         pass
+
+    @abstractmethod
+    def mget(self, keys: Sequence[str]) -> List[Optional[str]]:
+        """Returns the values of ``keys`` in order, with ``None`` for missing keys."""
+        pass
+
+    @abstractmethod
+    def mset(
+        self,
+        values: Mapping[str, CacheValue],
+        expire_in_seconds: Optional[int] | Mapping[str, Optional[int]] = None
+    ) -> bool:
+        """
+        Sets every key in ``values``.
+
+        ``expire_in_seconds`` is either one TTL applied to every key or a per-key mapping; keys
+        missing from the mapping never expire.
+        """
+        pass
+
+    @abstractmethod
+    def hmget(self, name: str, keys: Sequence[str]) -> List[Optional[str]]:
+        """Returns the values of the ``keys`` fields of hash ``name`` in order, with ``None`` for missing fields."""
+        pass
+
+    @abstractmethod
+    def hget_many(self, fields: Sequence[Tuple[str, str]]) -> List[Optional[str]]:
+        """Returns the value of each ``(name, key)`` hash field in order, with ``None`` for missing fields."""
+        pass
+
+    @abstractmethod
+    def hgetall_many(self, keys: Sequence[str]) -> List[Mapping[str, str | int | float] | None]:
+        """Returns every hash in ``keys`` in order, with ``None`` for missing hashes."""
+        pass
+
+    @abstractmethod
+    def pipeline(self) -> AbstractContextManager[CachePipeline]:
+        """
+        Opens a pipeline for batching arbitrary commands into one round trip.
+
+        Commands queued but not executed when the context exits are discarded.
+        """
+        pass
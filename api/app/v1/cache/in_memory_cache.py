@@ -0,0 +1,168 @@
+import threading
+import time
+from collections.abc import Callable, Generator, Mapping, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from app.v1.cache.cache import Cache, CachePipeline, CacheValue
+
+
+@dataclass
+class _Entry:
+    value: Union[str, Dict[str, str]]
+    expires_at: Optional[float]
+
+
+class InMemoryCachePipeline(CachePipeline):
+
+    def __init__(self, cache: 'InMemoryCache') -> None:
+        self._cache = cache
+        self._commands: List[Callable[[], Any]] = []
+
+    def _queued(self, command: Callable[[], Any]) -> 'InMemoryCachePipeline':
+        self._commands.append(command)
+        return self
+
+    def get(self, key: str) -> 'InMemoryCachePipeline':
+        return self._queued(lambda: self._cache.get(key))
+
+    def set(self, key: str, value: CacheValue, expire_in_seconds: Optional[int] = None) -> 'InMemoryCachePipeline':
+        return self._queued(lambda: self._cache.set(key, value, expire_in_seconds))
+
+    def set_if_absent(self, key: str, value: CacheValue, expire_in_seconds: Optional[int] = None) -> 'InMemoryCachePipeline':
+        return self._queued(lambda: self._cache.set_if_absent(key, value, expire_in_seconds))
+
+    def delete(self, *keys: str) -> 'InMemoryCachePipeline':
+        return self._queued(lambda: self._cache.delete(*keys))
+
+    def hget(self, name: str, key: str) -> 'InMemoryCachePipeline':
+        return self._queued(lambda: self._cache.hget(name, key))
+
+    def hmget(self, name: str, keys: Sequence[str]) -> 'InMemoryCachePipeline':
+        return self._queued(lambda: self._cache.hmget(name, keys))
+
+    def hgetall(self, key: str) -> 'InMemoryCachePipeline':
+        return self._queued(lambda: self._cache.hgetall(key))
+
+    def execute(self) -> List[Any]:
+        commands, self._commands = self._commands, []
+        with self._cache._lock:
+            return [command() for command in commands]
+
+
+class InMemoryCache(Cache):
+    """
+    A process-local ``Cache`` with Redis-like semantics, for tests and benchmarks.
+
+    Values are stored as strings, as ``RedisCache`` returns them, and expire lazily on access.
+    ``hset`` is provided to seed hashes, which the ``Cache`` interface itself never writes.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.RLock()
+
+    def _get_entry(self, key: str) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at is not None and entry.expires_at <= self._clock():
+            del self._entries[key]
+            return None
+        return entry
+
+    def _get_string(self, key: str) -> Optional[str]:
+        entry = self._get_entry(key)
+        if entry is None or not isinstance(entry.value, str):
+            return None
+        return entry.value
+
+    def _get_hash(self, key: str) -> Optional[Dict[str, str]]:
+        entry = self._get_entry(key)
+        if entry is None or not isinstance(entry.value, dict):
+            return None
+        return entry.value
+
+    def _expires_at(self, expire_in_seconds: Optional[int]) -> Optional[float]:
+        return self._clock() + expire_in_seconds if expire_in_seconds is not None else None
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            return self._get_string(key)
+
+    def set(self, key: str, value: CacheValue, expire_in_seconds: Optional[int] = None) -> bool:
+        with self._lock:
+            self._entries[key] = _Entry(value=str(value), expires_at=self._expires_at(expire_in_seconds))
+            return True
+
+    def set_if_absent(self, key: str, value: CacheValue, expire_in_seconds: Optional[int] = None) -> bool:
+        with self._lock:
+            if self._get_entry(key) is not None:
+                return False
+            return self.set(key, value, expire_in_seconds)
+
+    def hset(self, name: str, mapping: Mapping[str, CacheValue]) -> int:
+        with self._lock:
+            hash_value = self._get_hash(name)
+            if hash_value is None:
+                hash_value = {}
+                self._entries[name] = _Entry(value=hash_value, expires_at=None)
+            added = len(set(mapping) - set(hash_value))
+            hash_value.update({key: str(value) for key, value in mapping.items()})
+            return added
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            deleted = 0
+            for key in keys:
+                if self._get_entry(key) is not None:
+                    del self._entries[key]
+                    deleted += 1
+            return deleted
+
+    def hget(self, name: str, key: str) -> Optional[str]:
+        with self._lock:
+            hash_value = self._get_hash(name)
+            return hash_value.get(key) if hash_value is not None else None
+
+    def hgetall(self, key: str) -> Mapping[str, str | int | float] | None:
+        with self._lock:
+            hash_value = self._get_hash(key)
+            return dict(hash_value) if hash_value is not None else None
+
+    def mget(self, keys: Sequence[str]) -> List[Optional[str]]:
+        with self._lock:
+            return [self._get_string(key) for key in keys]
+
+    def mset(
+        self,
+        values: Mapping[str, CacheValue],
+        expire_in_seconds: Optional[int] | Mapping[str, Optional[int]] = None
+    ) -> bool:
+        with self._lock:
+            for key, value in values.items():
+                self.set(
+                    key,
+                    value,
+                    expire_in_seconds.get(key) if isinstance(expire_in_seconds, Mapping) else expire_in_seconds
+                )
+            return True
+
+    def hmget(self, name: str, keys: Sequence[str]) -> List[Optional[str]]:
+        with self._lock:
+            hash_value = self._get_hash(name) or {}
+            return [hash_value.get(key) for key in keys]
+
+    def hget_many(self, fields: Sequence[Tuple[str, str]]) -> List[Optional[str]]:
+        with self._lock:
+            return [self.hget(name, key) for name, key in fields]
+
+    def hgetall_many(self, keys: Sequence[str]) -> List[Mapping[str, str | int | float] | None]:
+        with self._lock:
+            return [self.hgetall(key) for key in keys]
+
+    @contextmanager
+    def pipeline(self) -> Generator[InMemoryCachePipeline, None, None]:
+        yield InMemoryCachePipeline(self)
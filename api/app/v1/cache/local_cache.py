@@ -0,0 +1,135 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Mapping
+from fnmatch import translate
+from typing import Any, Dict, Final, Hashable, Optional, Tuple
+
+from app.px.pxmetrics import PxMetrics
+
+
+_MISSING: Final = object()
+
+
+class LocalCache:
+    """
+    A bounded, thread-safe, in-process LRU cache sitting in front of one Redis database.
+
+    Only keys matching one of the configured namespaces are cached. A namespace is a glob pattern
+    (e.g. ``locations::*``) mapped to the TTL, in seconds, of the entries it covers; when several
+    patterns match a key the first one wins. Entries are grouped by Redis key so that a single
+    invalidation drops every cached read of that key (``GET``, ``HGET`` of any field, ``HGETALL``).
+    Eviction is least-recently-used over Redis keys once ``max_keys`` is exceeded.
+
+    Hits and misses are counted per namespace and reported through ``stats``.
+    """
+
+    def __init__(
+        self,
+        namespace_ttls: Mapping[str, float],
+        max_keys: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._namespaces: Tuple[Tuple[str, 're.Pattern[str]', float], ...] = tuple(
+            (pattern, re.compile(translate(pattern)), ttl)
+            for pattern, ttl in namespace_ttls.items()
+        )
+        self._max_keys = max_keys
+        self._clock = clock
+        self._entries: OrderedDict[str, Dict[Hashable, Tuple[Any, float]]] = OrderedDict()
+        self._hits: Dict[str, int] = {pattern: 0 for pattern in namespace_ttls}
+        self._misses: Dict[str, int] = {pattern: 0 for pattern in namespace_ttls}
+        self._evictions = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _namespace(self, key: str) -> Optional[Tuple[str, float]]:
+        for pattern, regex, ttl in self._namespaces:
+            if regex.match(key):
+                return pattern, ttl
+        return None
+
+    def is_cacheable(self, key: str) -> bool:
+        return self._namespace(key) is not None
+
+    def get(self, key: str, read: Hashable) -> Any:
+        """
+        Returns the cached result of ``read`` on ``key``, or ``LocalCache.MISSING``.
+
+        ``read`` identifies the command and its arguments, e.g. ``('hget', 'value')``.
+        """
+        namespace = self._namespace(key)
+        if namespace is None:
+            return _MISSING
+        pattern, _ = namespace
+        with self._lock:
+            reads = self._entries.get(key)
+            entry = reads.get(read) if reads is not None else None
+            if entry is None or entry[1] <= self._clock():
+                if entry is not None:
+                    del reads[read]  # type: ignore[union-attr]
+                self._misses[pattern] += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self._hits[pattern] += 1
+            return entry[0]
+
+    def generation(self) -> int:
+        """
+        Returns a token to take before reading from Redis and to hand back to ``set``.
+
+        Any invalidation in between makes ``set`` drop the value, so a read racing with a write can
+        never repopulate the local cache with the value the write replaced.
+        """
+        return self._generation
+
+    def set(self, key: str, read: Hashable, value: Any, generation: int) -> None:
+        namespace = self._namespace(key)
+        if namespace is None:
+            return
+        _, ttl = namespace
+        with self._lock:
+            if generation != self._generation:
+                return
+            reads = self._entries.get(key)
+            if reads is None:
+                reads = self._entries[key] = {}
+            else:
+                self._entries.move_to_end(key)
+            reads[read] = (value, self._clock() + ttl)
+            while len(self._entries) > self._max_keys:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self, key: str) -> None:
+        if not self.is_cacheable(key):
+            return
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "keys": len(self._entries),
+                "max_keys": self._max_keys,
+                "evictions": self._evictions,
+                "namespaces": {
+                    pattern: {"hits": self._hits[pattern], "misses": self._misses[pattern]}
+                    for pattern in self._hits
+                },
+            }
+
+    def register_metrics(self, metrics: PxMetrics, name: str) -> None:
+        metrics.register_gauge(name, self.stats)
+
+    def unregister_metrics(self, metrics: PxMetrics, name: str) -> None:
+        metrics.unregister_gauge(name)
+
+    MISSING: Final = _MISSING
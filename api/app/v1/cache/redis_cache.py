@@ -1,40 +1,227 @@
-from collections.abc import Mapping
-from typing import Optional, Union
+from collections.abc import Callable, Generator, Hashable, Mapping, Sequence
+from contextlib import contextmanager
+from typing import Any, Final, List, Optional, Tuple
 from redis import Redis
-from app.v1.cache.cache import Cache
+from redis.client import Pipeline
+from app.v1.cache.cache import Cache, CachePipeline, CacheValue
+from app.v1.cache.local_cache import LocalCache
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _none_if_empty(value: Any) -> Any:
+    # Redis never stores empty hashes, so an empty reply means the key does not exist
+    return value or None
+
+
+# Marks replies of commands queued internally (e.g. invalidation publishes) that callers never see
+_DISCARDED: Final = object()
+
+
+class RedisCachePipeline(CachePipeline):
+
+    def __init__(
+        self,
+        pipeline: Pipeline,
+        invalidation_channel: Optional[str] = None,
+        on_written: Optional[Callable[[Sequence[str]], None]] = None
+    ) -> None:
+        self._pipeline = pipeline
+        self._invalidation_channel = invalidation_channel
+        self._on_written = on_written
+        self._parsers: List[Callable[[Any], Any]] = []
+        self._written_keys: List[str] = []
+
+    def _queued(self, parser: Callable[[Any], Any]) -> 'RedisCachePipeline':
+        self._parsers.append(parser)
+        return self
+
+    def get(self, key: str) -> 'RedisCachePipeline':
+        self._pipeline.get(key)
+        return self._queued(_identity)
+
+    def _written(self, keys: Sequence[str]) -> 'RedisCachePipeline':
+        self._written_keys.extend(keys)
+        if self._invalidation_channel is not None:
+            for key in keys:
+                self._pipeline.publish(self._invalidation_channel, key)
+                self._queued(lambda _: _DISCARDED)
+        return self
+
+    def set(self, key: str, value: CacheValue, expire_in_seconds: Optional[int] = None) -> 'RedisCachePipeline':
+        self._pipeline.set(key, value, ex=expire_in_seconds)
+        self._queued(bool)
+        return self._written([key])
+
+    def set_if_absent(self, key: str, value: CacheValue, expire_in_seconds: Optional[int] = None) -> 'RedisCachePipeline':
+        self._pipeline.set(key, value, ex=expire_in_seconds, nx=True)
+        self._queued(bool)
+        return self._written([key])
+
+    def delete(self, *keys: str) -> 'RedisCachePipeline':
+        self._pipeline.delete(*keys)
+        self._queued(_identity)
+        return self._written(keys)
+
+    def hget(self, name: str, key: str) -> 'RedisCachePipeline':
+        self._pipeline.hget(name, key)
+        return self._queued(_identity)
+
+    def hmget(self, name: str, keys: Sequence[str]) -> 'RedisCachePipeline':
+        self._pipeline.hmget(name, list(keys))
+        return self._queued(_identity)
+
+    def hgetall(self, key: str) -> 'RedisCachePipeline':
+        self._pipeline.hgetall(key)
+        return self._queued(_none_if_empty)
+
+    def execute(self) -> List[Any]:
+        parsers, self._parsers = self._parsers, []
+        written_keys, self._written_keys = self._written_keys, []
+        if len(parsers) == 0:
+            return []
+        try:
+            results = [parser(value) for parser, value in zip(parsers, self._pipeline.execute())]
+        finally:
+            if self._on_written is not None and len(written_keys) > 0:
+                self._on_written(written_keys)
+        return [result for result in results if result is not _DISCARDED]
 
 
 class RedisCache(Cache):
+    """
+    ``Cache`` backed by one Redis database.
+
+    When given a ``local_cache``, reads of keys in its namespaces are served from process memory
+    until their TTL runs out or they are invalidated. Writes made through this class drop the key
+    locally and are published on ``invalidation_channel`` so that other workers drop it too (see
+    ``RedisCacheInvalidationListener``). Pipelines always go to Redis.
+    """
 
     def __init__(
         self,
-        redis_host: str,
-        redis_port: int,
-        database_index: int = 1
+        redis: Redis,
+        local_cache: Optional[LocalCache] = None,
+        invalidation_channel: Optional[str] = None
     ) -> None:
-        self._redis = Redis(
-            host=redis_host,
-            port=redis_port,
-            db=database_index,
-            encoding="utf-8",
-            decode_responses=True,
-            socket_timeout=3,
-            max_connections=100
-        )
-    
+        self._redis = redis
+        self._local_cache = local_cache
+        self._invalidation_channel = invalidation_channel
+
+    def _invalidate_locally(self, keys: Sequence[str]) -> None:
+        if self._local_cache is not None:
+            for key in keys:
+                self._local_cache.invalidate(key)
+
+    def _read_through(
+        self,
+        reads: Sequence[Tuple[str, Hashable]],
+        fetch: Callable[[Sequence[int]], List[Any]]
+    ) -> List[Any]:
+        """
+        Resolves every ``(key, read)`` from the local cache, calling ``fetch`` once with the
+        indexes of the misses and caching what it returns.
+        """
+        if self._local_cache is None:
+            return fetch(range(len(reads)))
+        generation = self._local_cache.generation()
+        results: List[Any] = [self._local_cache.get(key, read) for key, read in reads]
+        missed_indexes = [index for index, result in enumerate(results) if result is LocalCache.MISSING]
+        if len(missed_indexes) > 0:
+            for index, value in zip(missed_indexes, fetch(missed_indexes)):
+                key, read = reads[index]
+                self._local_cache.set(key, read, value, generation)
+                results[index] = value
+        return results
+
     def get(self, key: str) -> Optional[str]:
-        return self._redis.get(key)
-    
-    def set(self, key: str, value: Union[str, int, float], expire_in_seconds: Optional[int] = None) -> bool:
-        response = self._redis.set(key, value, ex=expire_in_seconds)
-        if response is None:
-            return False
-        return response
+        return self._read_through(
+            [(key, ('get',))],
+            lambda _: [self._redis.get(key)]
+        )[0]
+
+    def set(self, key: str, value: CacheValue, expire_in_seconds: Optional[int] = None) -> bool:
+        with self.pipeline() as pipeline:
+            return pipeline.set(key, value, expire_in_seconds).execute()[0]
+
+    def set_if_absent(self, key: str, value: CacheValue, expire_in_seconds: Optional[int] = None) -> bool:
+        with self.pipeline() as pipeline:
+            return pipeline.set_if_absent(key, value, expire_in_seconds).execute()[0]
+
+    def delete(self, *keys: str) -> int:
+        if len(keys) == 0:
+            return 0
+        with self.pipeline() as pipeline:
+            return pipeline.delete(*keys).execute()[0]
 
     def hget(self, name: str, key: str) -> str | None:
-        return self._redis.hget(name, key)
+        return self._read_through(
+            [(name, ('hget', key))],
+            lambda _: [self._redis.hget(name, key)]
+        )[0]
 
     def hgetall(self, key: str) -> Mapping[str, str | int | float] | None:
-        if not self._redis.exists(key):
-            return None
-        return self._redis.hgetall(key)
+        value = self._read_through(
+            [(key, ('hgetall',))],
+            lambda _: [_none_if_empty(self._redis.hgetall(key))]
+        )[0]
+        return dict(value) if value is not None else None
+
+    def mget(self, keys: Sequence[str]) -> List[Optional[str]]:
+        if len(keys) == 0:
+            return []
+        return self._read_through(
+            [(key, ('get',)) for key in keys],
+            lambda indexes: self._redis.mget([keys[index] for index in indexes])
+        )
+
+    def mset(
+        self,
+        values: Mapping[str, CacheValue],
+        expire_in_seconds: Optional[int] | Mapping[str, Optional[int]] = None
+    ) -> bool:
+        if len(values) == 0:
+            return True
+        # MSET cannot set expiries, so each key gets its own SET within one pipeline instead
+        with self.pipeline() as pipeline:
+            for key, value in values.items():
+                pipeline.set(
+                    key,
+                    value,
+                    expire_in_seconds.get(key) if isinstance(expire_in_seconds, Mapping) else expire_in_seconds
+                )
+            return all(pipeline.execute())
+
+    def hmget(self, name: str, keys: Sequence[str]) -> List[Optional[str]]:
+        if len(keys) == 0:
+            return []
+        return self._read_through(
+            [(name, ('hget', key)) for key in keys],
+            lambda indexes: self._redis.hmget(name, [keys[index] for index in indexes])
+        )
+
+    def hget_many(self, fields: Sequence[Tuple[str, str]]) -> List[Optional[str]]:
+        def fetch(indexes: Sequence[int]) -> List[Any]:
+            with self.pipeline() as pipeline:
+                for index in indexes:
+                    pipeline.hget(*fields[index])
+                return pipeline.execute()
+
+        return self._read_through([(name, ('hget', key)) for name, key in fields], fetch)
+
+    def hgetall_many(self, keys: Sequence[str]) -> List[Mapping[str, str | int | float] | None]:
+        def fetch(indexes: Sequence[int]) -> List[Any]:
+            with self.pipeline() as pipeline:
+                for index in indexes:
+                    pipeline.hgetall(keys[index])
+                return pipeline.execute()
+
+        values = self._read_through([(key, ('hgetall',)) for key in keys], fetch)
+        return [dict(value) if value is not None else None for value in values]
+
+    @contextmanager
+    def pipeline(self) -> Generator[RedisCachePipeline, None, None]:
+        with self._redis.pipeline(transaction=False) as pipeline:
+            yield RedisCachePipeline(pipeline, self._invalidation_channel, self._invalidate_locally)
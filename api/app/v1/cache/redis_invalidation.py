@@ -0,0 +1,80 @@
+from typing import Any, Dict, Final, Optional
+
+from redis import Redis
+from redis.client import PubSub, PubSubWorkerThread
+
+from app.px.pxlogger import PxLogger, PxNote
+from app.v1.cache.local_cache import LocalCache
+
+
+_logger: Final = PxLogger(__name__)
+
+
+def invalidation_channel(database_index: int) -> str:
+    """The channel ``RedisCache`` publishes the keys it writes to, so other workers drop their copies."""
+    return f"cache-invalidation::db{database_index}"
+
+
+class RedisCacheInvalidationListener:
+    """
+    Keeps a ``LocalCache`` coherent with its Redis database across processes.
+
+    Each uvicorn worker runs one listener per local cache, on a background thread, subscribed to:
+
+    - ``invalidation_channel(database_index)``, where ``RedisCache`` publishes every key it writes;
+    - the ``__keyspace@<db>__:*`` keyspace notifications, which cover writes made by other
+      services. They are only emitted when the server has ``notify-keyspace-events`` enabled
+      (``K$hgx`` or wider); without them, externally written keys stay stale for at most their
+      namespace TTL.
+
+    If the subscription drops, messages may have been missed, so the whole local cache is cleared.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        database_index: int,
+        local_cache: LocalCache,
+        poll_interval_seconds: float = 1.0,
+    ) -> None:
+        self._redis = redis
+        self._database_index = database_index
+        self._local_cache = local_cache
+        self._poll_interval_seconds = poll_interval_seconds
+        self._keyspace_prefix = f"__keyspace@{database_index}__:"
+        self._pubsub: Optional[PubSub] = None
+        self._thread: Optional[PubSubWorkerThread] = None
+
+    def _on_invalidation_message(self, message: Dict[str, Any]) -> None:
+        self._local_cache.invalidate(message["data"])
+
+    def _on_keyspace_message(self, message: Dict[str, Any]) -> None:
+        self._local_cache.invalidate(message["channel"][len(self._keyspace_prefix):])
+
+    def _on_error(self, error: BaseException, pubsub: PubSub, thread: PubSubWorkerThread) -> None:
+        _logger.warning(
+            PxNote("Cache invalidation subscription failed, clearing local cache", database_index=self._database_index),
+            exc_info=error,
+        )
+        self._local_cache.clear()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{invalidation_channel(self._database_index): self._on_invalidation_message})
+        self._pubsub.psubscribe(**{f"{self._keyspace_prefix}*": self._on_keyspace_message})
+        self._thread = self._pubsub.run_in_thread(
+            sleep_time=self._poll_interval_seconds,
+            daemon=True,
+            exception_handler=self._on_error,
+        )
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread.join(timeout=self._poll_interval_seconds * 2)
+            self._thread = None
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
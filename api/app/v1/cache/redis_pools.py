@@ -0,0 +1,127 @@
+import threading
+from typing import Any, Dict, Final, Set
+
+from redis import BlockingConnectionPool, Redis
+from redis.connection import Connection
+
+from app.px.pxmetrics import PxMetrics
+
+
+class _CountingConnectionPool(BlockingConnectionPool):
+    """A ``BlockingConnectionPool`` keeping count of the connections it creates and lends."""
+
+    def reset(self) -> None:
+        # Also called when the process forks, which drops the parent's connections
+        self._counts_lock = threading.Lock()
+        self.created_connections = 0
+        self._lent_connections: Set[int] = set()
+        super().reset()
+
+    @property
+    def in_use_connections(self) -> int:
+        with self._counts_lock:
+            return len(self._lent_connections)
+
+    def make_connection(self) -> Connection:
+        connection = super().make_connection()
+        with self._counts_lock:
+            self.created_connections += 1
+        return connection
+
+    def get_connection(self, command_name: object, *keys: Any, **options: Any) -> Connection:
+        connection = super().get_connection(command_name, *keys, **options)
+        with self._counts_lock:
+            self._lent_connections.add(id(connection))
+        return connection
+
+    def release(self, connection: Connection) -> None:
+        with self._counts_lock:
+            self._lent_connections.discard(id(connection))
+        super().release(connection)
+
+
+class RedisConnectionPools:
+    """
+    Process-wide registry of Redis connection pools, one per database index.
+
+    Pools are created lazily on first use and shared by every ``Redis`` client handed out for the
+    same database index, so requests reuse warm connections instead of opening a new pool each.
+    ``BlockingConnectionPool`` is used so that a saturated pool makes callers wait up to
+    ``pool_timeout_seconds`` for a free connection rather than growing without bound.
+    """
+
+    def __init__(
+        self,
+        redis_host: str,
+        redis_port: int,
+        max_connections: int = 100,
+        socket_timeout_seconds: float = 3,
+        socket_connect_timeout_seconds: float = 3,
+        pool_timeout_seconds: float = 5,
+        health_check_interval_seconds: int = 30,
+    ) -> None:
+        self._redis_host = redis_host
+        self._redis_port = redis_port
+        self._max_connections = max_connections
+        self._socket_timeout_seconds = socket_timeout_seconds
+        self._socket_connect_timeout_seconds = socket_connect_timeout_seconds
+        self._pool_timeout_seconds = pool_timeout_seconds
+        self._health_check_interval_seconds = health_check_interval_seconds
+        self._pools: Dict[int, _CountingConnectionPool] = {}
+        self._lock = threading.Lock()
+
+    def get_pool(self, database_index: int) -> BlockingConnectionPool:
+        pool = self._pools.get(database_index)
+        if pool is not None:
+            return pool
+        with self._lock:
+            pool = self._pools.get(database_index)
+            if pool is None:
+                pool = _CountingConnectionPool(
+                    host=self._redis_host,
+                    port=self._redis_port,
+                    db=database_index,
+                    encoding="utf-8",
+                    decode_responses=True,
+                    socket_timeout=self._socket_timeout_seconds,
+                    socket_connect_timeout=self._socket_connect_timeout_seconds,
+                    health_check_interval=self._health_check_interval_seconds,
+                    max_connections=self._max_connections,
+                    timeout=self._pool_timeout_seconds,
+                )
+                self._pools[database_index] = pool
+        return pool
+
+    def get_client(self, database_index: int) -> Redis:
+        return Redis(connection_pool=self.get_pool(database_index))
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            pools = dict(self._pools)
+        stats: Dict[str, Dict[str, int]] = {}
+        for database_index, pool in sorted(pools.items()):
+            created = pool.created_connections
+            in_use = pool.in_use_connections
+            stats[f"db{database_index}"] = {
+                "max_connections": pool.max_connections,
+                "created": created,
+                "idle": created - in_use,
+                "in_use": in_use,
+            }
+        return stats
+
+    def register_metrics(self, metrics: PxMetrics) -> None:
+        metrics.register_gauge(_METRICS_GAUGE_NAME, self.stats)
+
+    def unregister_metrics(self, metrics: PxMetrics) -> None:
+        metrics.unregister_gauge(_METRICS_GAUGE_NAME)
+
+    def close(self) -> None:
+        with self._lock:
+            pools = list(self._pools.values())
+            self._pools.clear()
+        for pool in pools:
+            pool.disconnect()
+
+
+_METRICS_GAUGE_NAME: Final = "redis_connection_pools"
@@ -0,0 +1,211 @@
+import json
+import math
+import random
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, Final, List, Optional, Sequence, TypeVar
+
+from app.px.pxmetrics import PxMetrics, metrics as default_metrics
+from app.v1.cache.cache import Cache
+
+
+T = TypeVar('T')
+
+
+@dataclass(frozen=True)
+class _Envelope:
+    value: Any
+    stale_at: float
+    compute_seconds: float
+
+
+_LOCK_SUFFIX: Final = '::lock'
+
+
+class SingleFlightCache:
+    """
+    Read-through caching of expensive aggregates that many requests ask for at once.
+
+    Values are stored as JSON, together with when they go stale and how long they took to compute,
+    and ``get_or_compute`` makes sure only one caller at a time recomputes a given key:
+
+    - fresh values are served as is, except that a caller may refresh one early as its expiry
+      approaches (probabilistic early expiration, a.k.a. XFetch). The closer the expiry and the
+      slower the computation, the likelier it is, so refreshes spread out instead of piling up on
+      the expiry instant;
+    - a refresh is done by whoever takes the per-key lock. Everyone else keeps being served the
+      current value, which stays in the cache for ``stale_for_seconds`` past its TTL for that
+      purpose;
+    - on a cold miss, callers that lose the lock wait up to ``wait_timeout_seconds`` for the lock
+      holder's result before giving up and computing it themselves.
+
+    ``beta`` scales early refreshes: above 1 favours refreshing earlier, 0 disables them.
+    """
+
+    def __init__(
+        self,
+        cache: Cache,
+        lock_timeout_seconds: int = 60,
+        wait_timeout_seconds: float = 10.0,
+        poll_interval_seconds: float = 0.1,
+        beta: float = 1.0,
+        clock: Callable[[], float] = time.time,
+        sleep: Callable[[float], None] = time.sleep,
+        random_: Callable[[], float] = random.random,
+        metrics: PxMetrics = default_metrics,
+    ) -> None:
+        self._cache = cache
+        self._lock_timeout_seconds = lock_timeout_seconds
+        self._wait_timeout_seconds = wait_timeout_seconds
+        self._poll_interval_seconds = poll_interval_seconds
+        self._beta = beta
+        self._clock = clock
+        self._sleep = sleep
+        self._random = random_
+        self._metrics = metrics
+
+    def _parse(self, raw_value: Optional[str]) -> Optional[_Envelope]:
+        if raw_value is None:
+            return None
+        try:
+            envelope = json.loads(raw_value)
+            return _Envelope(
+                value=envelope['value'],
+                stale_at=float(envelope['stale_at']),
+                compute_seconds=float(envelope['compute_seconds'])
+            )
+        except (ValueError, TypeError, KeyError):
+            # Written in another format, e.g. before this class was used for the key
+            return None
+
+    def _read(self, keys: Sequence[str]) -> List[Optional[_Envelope]]:
+        return [self._parse(raw_value) for raw_value in self._cache.mget(keys)]
+
+    def _should_refresh(self, envelope: _Envelope) -> bool:
+        # 1 - random() is in (0, 1], so the log is never undefined and the jitter never negative
+        jitter = -envelope.compute_seconds * self._beta * math.log(1 - self._random())
+        return self._clock() + jitter >= envelope.stale_at
+
+    def _try_lock(self, keys: Sequence[str]) -> List[bool]:
+        if len(keys) == 0:
+            return []
+        with self._cache.pipeline() as pipeline:
+            for key in keys:
+                pipeline.set_if_absent(key + _LOCK_SUFFIX, 1, self._lock_timeout_seconds)
+            return [bool(locked) for locked in pipeline.execute()]
+
+    def _wait_for_values(self, keys: Sequence[str]) -> List[Optional[_Envelope]]:
+        envelopes: List[Optional[_Envelope]] = [None] * len(keys)
+        deadline = self._clock() + self._wait_timeout_seconds
+        while self._clock() < deadline:
+            self._sleep(self._poll_interval_seconds)
+            missing_indexes = [index for index, envelope in enumerate(envelopes) if envelope is None]
+            for index, envelope in zip(missing_indexes, self._read([keys[index] for index in missing_indexes])):
+                envelopes[index] = envelope
+            if all(envelope is not None for envelope in envelopes):
+                break
+        return envelopes
+
+    def _compute_and_store(
+        self,
+        keys: Sequence[str],
+        indexes: List[int],
+        compute: Callable[[List[int]], List[T]],
+        ttl_seconds: int,
+        stale_for_seconds: int,
+        locked: bool
+    ) -> List[T]:
+        started_at = self._clock()
+        try:
+            values = compute(indexes)
+            computed_at = self._clock()
+            self._cache.mset(
+                {
+                    keys[index]: json.dumps({
+                        'value': value,
+                        'stale_at': computed_at + ttl_seconds,
+                        'compute_seconds': computed_at - started_at,
+                    })
+                    for index, value in zip(indexes, values)
+                },
+                ttl_seconds + stale_for_seconds
+            )
+            return values
+        finally:
+            # Past the lock timeout someone else may hold the locks now, so leave them to expire
+            if locked and self._clock() - started_at < self._lock_timeout_seconds:
+                self._cache.delete(*(keys[index] + _LOCK_SUFFIX for index in indexes))
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], T],
+        ttl_seconds: int,
+        stale_for_seconds: int = 0
+    ) -> T:
+        """
+        Returns the value cached under ``key``, calling ``compute`` to (re)populate it when needed.
+
+        ``compute`` must return a JSON-serialisable value.
+        """
+        return self.get_or_compute_many([key], lambda _: [compute()], ttl_seconds, stale_for_seconds)[0]
+
+    def get_or_compute_many(
+        self,
+        keys: Sequence[str],
+        compute: Callable[[List[int]], List[T]],
+        ttl_seconds: int,
+        stale_for_seconds: int = 0
+    ) -> List[T]:
+        """
+        Like ``get_or_compute`` for several keys at once, in a few round trips.
+
+        ``compute`` is given the indexes of the keys to (re)populate and must return their values
+        in the same order. It is called at most twice: once for the keys this caller got the locks
+        of, and once for the keys it gave up waiting for.
+        """
+        values: List[Any] = [None] * len(keys)
+        envelopes = self._read(keys)
+
+        to_refresh = [
+            index for index, envelope in enumerate(envelopes)
+            if envelope is None or self._should_refresh(envelope)
+        ]
+        locks = dict(zip(to_refresh, self._try_lock([keys[index] for index in to_refresh])))
+        to_compute: List[int] = []
+        to_wait_for: List[int] = []
+        for index, envelope in enumerate(envelopes):
+            if envelope is not None and index not in locks:
+                self._metrics.increment('cache.single_flight.hit')
+                values[index] = envelope.value
+            elif envelope is not None and not locks[index]:
+                self._metrics.increment('cache.single_flight.stale')
+                values[index] = envelope.value
+            elif envelope is not None:
+                self._metrics.increment('cache.single_flight.refresh')
+                to_compute.append(index)
+            elif locks[index]:
+                self._metrics.increment('cache.single_flight.miss')
+                to_compute.append(index)
+            else:
+                to_wait_for.append(index)
+
+        if len(to_compute) > 0:
+            for index, value in zip(to_compute, self._compute_and_store(keys, to_compute, compute, ttl_seconds, stale_for_seconds, locked=True)):
+                values[index] = value
+
+        if len(to_wait_for) > 0:
+            timed_out: List[int] = []
+            for index, envelope in zip(to_wait_for, self._wait_for_values([keys[index] for index in to_wait_for])):
+                if envelope is not None:
+                    self._metrics.increment('cache.single_flight.waited')
+                    values[index] = envelope.value
+                else:
+                    self._metrics.increment('cache.single_flight.wait_timeout')
+                    timed_out.append(index)
+            if len(timed_out) > 0:
+                for index, value in zip(timed_out, self._compute_and_store(keys, timed_out, compute, ttl_seconds, stale_for_seconds, locked=False)):
+                    values[index] = value
+
+        return values
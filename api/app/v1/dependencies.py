@@ -1,9 +1,12 @@
 import logging
 import os
 
-from typing import Any, Generator, List, Optional
+from datetime import timedelta
+from functools import lru_cache
+from typing import Any, Dict, Generator, List, Literal, Optional
 
 import boto3
+from botocore.config import Config
 import jwt
 
 from dotenv import load_dotenv
@@ -40,7 +43,11 @@ from app.v1.auth.services.user_location_access_grants import UserLocationAccessG
 from app.v1.auth.services.user_organization_access_grants import UserOrganizationAccessGrantsService
 from app.v1.auth.services.access_roles import AccessRolesService
 from app.v1.cache.cache import Cache
+from app.v1.cache.local_cache import LocalCache
 from app.v1.cache.redis_cache import RedisCache
+from app.v1.cache.single_flight_cache import SingleFlightCache
+from app.v1.cache.redis_invalidation import RedisCacheInvalidationListener, invalidation_channel
+from app.v1.cache.redis_pools import RedisConnectionPools
 from app.v1.dp_pes.client import DpPesClient
 from app.v1.dp_pes.service import DpPesService
 from app.v1.electricity_dashboards.repositories.electricity_dashboards_repository import PostgresElectricityDashboardsRepository
@@ -51,6 +58,7 @@ from app.v1.electricity_dashboards.services.electricity_dashboards_service impor
 from app.v1.electricity_dashboards.services.energy_consumption_breakdown_electric_widgets_service import EnergyConsumptionBreakdownElectricWidgetsService
 from app.v1.electricity_dashboards.services.energy_load_curve_electric_widgets_service import EnergyLoadCurveElectricWidgetsService
 from app.v1.electricity_dashboards.services.panel_system_health_electric_widgets_service import PanelSystemHealthElectricWidgetsService
+from app.v1.electricity_monitoring.repositories.circuit_energy_rollups_repository import PostgresCircuitEnergyRollupsRepository
 from app.v1.electricity_monitoring.repositories.circuits_repository import PostgresCircuitsRepository
 from app.v1.electricity_monitoring.repositories.clamps_repository import PostgresClampsRepository
 from app.v1.electricity_monitoring.repositories.electric_panels_repository import PostgresElectricPanelsRepository
@@ -59,6 +67,8 @@ from app.v1.electricity_monitoring.services.circuits import CircuitsService
 from app.v1.electricity_monitoring.services.clamps import ClampsService
 from app.v1.electricity_monitoring.services.electric_panels import ElectricPanelsService
 from app.v1.electricity_monitoring.services.electric_sensors import ElectricSensorsService
+from app.v1.electricity_monitoring.services.circuit_energy import CircuitEnergyService
+from app.v1.electricity_monitoring.services.location_energy_usage import LocationEnergyUsageService
 from app.v1.hvac.repositories.hvac_equipment_types_repository import PostgresHvacEquipmentTypesRepository
 from app.v1.hvac.repositories.hvac_holds_repository import PostgresHvacHoldsRepository
 from app.v1.hvac.repositories.hvac_schedules_repository import PostgresHvacSchedulesRepository
@@ -114,6 +124,9 @@ from app.v1.temperature_monitoring.services.temperature_sensor_place_alerts impo
 from app.v1.temperature_monitoring.services.temperature_sensor_place_readings import TemperatureSensorPlaceReadingsService
 from app.v1.temperature_monitoring.services.temperature_sensor_places import TemperatureSensorPlacesService
 from app.v1.temperature_monitoring.services.temperature_sensors import TemperatureSensorsService
+from app.v1.timestream.query_result_cache import TimestreamQueryResultCache
+from app.v1.timestream.resolution_planner import TimestreamResolutionPlanner
+from app.v1.timestream.segment_cache import TimestreamSegmentCache
 from app.v1.timestream.services.circuit_measurements_service import TimestreamElectricityCircuitMeasurementsService
 from app.v1.timestream.services.electric_sensor_voltages_service import TimestreamElectricSensorVoltagesService
 from app.v1.timestream.services.hvac_zone_measurements_service import TimestreamHvacZoneMeasurementsService
@@ -133,6 +146,10 @@ JWT_REFRESH_TOKEN_SECRET_KEY = os.environ['JWT_REFRESH_TOKEN_SECRET_KEY']
 
 DP_PES_URL = os.environ['DP_PES_URL']
 DP_PES_API_KEY = os.environ['DP_PES_API_KEY']
+DP_PES_POOL_MAXSIZE = int(os.environ.get('DP_PES_POOL_MAXSIZE', '10'))
+DP_PES_CONNECT_TIMEOUT_S = float(os.environ.get('DP_PES_CONNECT_TIMEOUT_S', '3.05'))
+DP_PES_READ_TIMEOUT_S = float(os.environ.get('DP_PES_READ_TIMEOUT_S', '10'))
+DP_PES_MAX_RETRIES = int(os.environ.get('DP_PES_MAX_RETRIES', '3'))
 
 TIMESTREAM_DATABASE_TEMPERATURE = os.environ["TIMESTREAM_DATABASE_TEMPERATURE"]
 TIMESTREAM_TABLE_TEMPERATURE_PLACES = os.environ["TIMESTREAM_TABLE_TEMPERATURE_PLACES"]
@@ -144,8 +161,43 @@ TIMESTREAM_TABLE_PES_AVERAGES = os.environ["TIMESTREAM_TABLE_PES_AVERAGES"]
 TIMESTREAM_DATABASE_HVAC = os.environ["TIMESTREAM_DATABASE_HVAC"]
 TIMESTREAM_TABLE_CONTROL_ZONES = os.environ["TIMESTREAM_TABLE_CONTROL_ZONES"]
 
+TIMESTREAM_MAX_POOL_CONNECTIONS = int(os.environ.get('TIMESTREAM_MAX_POOL_CONNECTIONS', '50'))
+TIMESTREAM_CONNECT_TIMEOUT_S = float(os.environ.get('TIMESTREAM_CONNECT_TIMEOUT_S', '5'))
+TIMESTREAM_READ_TIMEOUT_S = float(os.environ.get('TIMESTREAM_READ_TIMEOUT_S', '30'))
+TIMESTREAM_MAX_ATTEMPTS = int(os.environ.get('TIMESTREAM_MAX_ATTEMPTS', '3'))
+_RETRY_MODES: Dict[str, Literal['legacy', 'standard', 'adaptive']] = {
+    'legacy': 'legacy',
+    'standard': 'standard',
+    'adaptive': 'adaptive',
+}
+TIMESTREAM_RETRY_MODE = _RETRY_MODES[os.environ.get('TIMESTREAM_RETRY_MODE', 'standard')]
+TIMESTREAM_FAN_OUT_MAX_WORKERS = int(os.environ.get('TIMESTREAM_FAN_OUT_MAX_WORKERS', '16'))
+TIMESTREAM_FAN_OUT_MAX_CONCURRENCY_PER_REQUEST = int(os.environ.get('TIMESTREAM_FAN_OUT_MAX_CONCURRENCY_PER_REQUEST', '4'))
+TIMESTREAM_SHARED_SINGLE_FLIGHT_ENABLED = os.environ.get('TIMESTREAM_SHARED_SINGLE_FLIGHT_ENABLED', 'false').lower() == 'true'
+TIMESTREAM_SHARED_SINGLE_FLIGHT_TTL_S = int(os.environ.get('TIMESTREAM_SHARED_SINGLE_FLIGHT_TTL_S', '5'))
+TIMESTREAM_RESULT_CACHE_ENABLED = os.environ.get('TIMESTREAM_RESULT_CACHE_ENABLED', 'false').lower() == 'true'
+TIMESTREAM_RESULT_CACHE_SETTLE_DELAY_S = int(os.environ.get('TIMESTREAM_RESULT_CACHE_SETTLE_DELAY_S', '21600'))
+TIMESTREAM_RESULT_CACHE_CLOSED_TTL_S = int(os.environ.get('TIMESTREAM_RESULT_CACHE_CLOSED_TTL_S', '604800'))
+TIMESTREAM_RESULT_CACHE_OPEN_TTL_S = int(os.environ.get('TIMESTREAM_RESULT_CACHE_OPEN_TTL_S', '60'))
+TIMESTREAM_SEGMENT_CACHE_ENABLED = os.environ.get('TIMESTREAM_SEGMENT_CACHE_ENABLED', 'false').lower() == 'true'
+TIMESTREAM_SEGMENT_CACHE_SEGMENT_S = int(os.environ.get('TIMESTREAM_SEGMENT_CACHE_SEGMENT_S', '86400'))
+TIMESTREAM_SEGMENT_CACHE_TTL_S = int(os.environ.get('TIMESTREAM_SEGMENT_CACHE_TTL_S', '691200'))
+TIMESTREAM_SEGMENT_CACHE_EMPTY_TTL_S = int(os.environ.get('TIMESTREAM_SEGMENT_CACHE_EMPTY_TTL_S', '3600'))
+TIMESTREAM_RESOLUTION_MAX_POINTS_PER_SERIES = int(os.environ.get('TIMESTREAM_RESOLUTION_MAX_POINTS_PER_SERIES', '1500'))
+
 REDIS_CACHE_HOST = os.environ['REDIS_CACHE_HOST']
 REDIS_CACHE_PORT = int(os.environ['REDIS_CACHE_PORT'])
+REDIS_CACHE_MAX_CONNECTIONS = int(os.environ.get('REDIS_CACHE_MAX_CONNECTIONS', '100'))
+REDIS_CACHE_SOCKET_TIMEOUT_S = float(os.environ.get('REDIS_CACHE_SOCKET_TIMEOUT_S', '3'))
+REDIS_CACHE_SOCKET_CONNECT_TIMEOUT_S = float(os.environ.get('REDIS_CACHE_SOCKET_CONNECT_TIMEOUT_S', '3'))
+REDIS_CACHE_POOL_TIMEOUT_S = float(os.environ.get('REDIS_CACHE_POOL_TIMEOUT_S', '5'))
+REDIS_L1_CACHE_ENABLED = os.environ.get('REDIS_L1_CACHE_ENABLED', 'false').lower() == 'true'
+REDIS_L1_CACHE_MAX_KEYS = int(os.environ.get('REDIS_L1_CACHE_MAX_KEYS', '10000'))
+REDIS_L1_CACHE_THERMOSTAT_STATE_TTL_S = float(os.environ.get('REDIS_L1_CACHE_THERMOSTAT_STATE_TTL_S', '5'))
+REDIS_L1_CACHE_LOCATION_AGGREGATES_TTL_S = float(os.environ.get('REDIS_L1_CACHE_LOCATION_AGGREGATES_TTL_S', '300'))
+REDIS_CACHE_DATABASE_INDEX = 1
+REDIS_CONSUMER_CACHE_DATABASE_INDEX = 0
+REDIS_LOCATION_AGGREGATED_DATA_CACHE_DATABASE_INDEX = 2
 
 LOGO_S3_BUCKET_NAME = os.environ['LOGO_S3_BUCKET_NAME']
 
@@ -228,26 +280,76 @@ def get_db() -> Generator[Session, Any, None]:
 def get_s3_client() -> S3Client:
     return boto3.client('s3')
 
-def get_cache() -> Cache:
-    return RedisCache(
+@lru_cache(maxsize=None)
+def get_redis_connection_pools() -> RedisConnectionPools:
+    return RedisConnectionPools(
         redis_host=REDIS_CACHE_HOST,
         redis_port=REDIS_CACHE_PORT,
-        database_index=1
+        max_connections=REDIS_CACHE_MAX_CONNECTIONS,
+        socket_timeout_seconds=REDIS_CACHE_SOCKET_TIMEOUT_S,
+        socket_connect_timeout_seconds=REDIS_CACHE_SOCKET_CONNECT_TIMEOUT_S,
+        pool_timeout_seconds=REDIS_CACHE_POOL_TIMEOUT_S,
+    )
+
+@lru_cache(maxsize=None)
+def get_redis_local_caches() -> Dict[int, LocalCache]:
+    if not REDIS_L1_CACHE_ENABLED:
+        return {}
+    return {
+        REDIS_CACHE_DATABASE_INDEX: LocalCache(
+            namespace_ttls={
+                pattern: REDIS_L1_CACHE_THERMOSTAT_STATE_TTL_S
+                for pattern in (
+                    '*::fan::mode',
+                    '*::hvac::mode',
+                    '*::thermostat::*',
+                    '*::room::temperatureC',
+                    '*::keypad::lockout',
+                    '*::auto::*',
+                )
+            },
+            max_keys=REDIS_L1_CACHE_MAX_KEYS,
+        ),
+        REDIS_LOCATION_AGGREGATED_DATA_CACHE_DATABASE_INDEX: LocalCache(
+            namespace_ttls={
+                'locations::*': REDIS_L1_CACHE_LOCATION_AGGREGATES_TTL_S,
+            },
+            max_keys=REDIS_L1_CACHE_MAX_KEYS,
+        ),
+    }
+
+@lru_cache(maxsize=None)
+def get_redis_cache_invalidation_listeners() -> List[RedisCacheInvalidationListener]:
+    return [
+        RedisCacheInvalidationListener(
+            redis=get_redis_connection_pools().get_client(database_index),
+            database_index=database_index,
+            local_cache=local_cache,
+        )
+        for database_index, local_cache in get_redis_local_caches().items()
+    ]
+
+def _get_redis_cache(database_index: int) -> RedisCache:
+    local_cache = get_redis_local_caches().get(database_index)
+    return RedisCache(
+        get_redis_connection_pools().get_client(database_index),
+        local_cache=local_cache,
+        invalidation_channel=invalidation_channel(database_index) if local_cache is not None else None
     )
 
+def get_cache() -> Cache:
+    return _get_redis_cache(REDIS_CACHE_DATABASE_INDEX)
+
 def get_consumer_cache() -> Cache:
-    return RedisCache(
-        redis_host=REDIS_CACHE_HOST,
-        redis_port=REDIS_CACHE_PORT,
-        database_index=0
-    )
+    return _get_redis_cache(REDIS_CONSUMER_CACHE_DATABASE_INDEX)
 
 def get_location_aggregated_data_cache() -> Cache:
-    return RedisCache(
-        redis_host=REDIS_CACHE_HOST,
-        redis_port=REDIS_CACHE_PORT,
-        database_index=2
-    )
+    return _get_redis_cache(REDIS_LOCATION_AGGREGATED_DATA_CACHE_DATABASE_INDEX)
+
+def get_location_aggregated_data_single_flight_cache(
+    location_aggregated_data_cache: Cache = Depends(get_location_aggregated_data_cache)
+) -> SingleFlightCache:
+    return SingleFlightCache(location_aggregated_data_cache)
 
 
 # Appliances module
@@ -532,24 +634,85 @@ def get_location_operating_hours_service(db_session: Session = Depends(get_db))
 
 
 # Timestream services
+@lru_cache(maxsize=None)
 def get_timestream_client() -> TimestreamClient:
-    boto3_client = boto3.client('timestream-query')
+    boto3_client = boto3.client(
+        service_name='timestream-query',
+        config=Config(
+            max_pool_connections=TIMESTREAM_MAX_POOL_CONNECTIONS,
+            connect_timeout=TIMESTREAM_CONNECT_TIMEOUT_S,
+            read_timeout=TIMESTREAM_READ_TIMEOUT_S,
+            retries={
+                'max_attempts': TIMESTREAM_MAX_ATTEMPTS,
+                'mode': TIMESTREAM_RETRY_MODE,
+            },
+            endpoint_discovery_enabled=True,
+        )
+    )
     return TimestreamClient(
-        query_client=boto3_client
+        query_client=boto3_client,
+        max_workers=TIMESTREAM_FAN_OUT_MAX_WORKERS,
+        max_concurrency_per_fan_out=TIMESTREAM_FAN_OUT_MAX_CONCURRENCY_PER_REQUEST,
+        shared_cache=SingleFlightCache(get_cache()) if TIMESTREAM_SHARED_SINGLE_FLIGHT_ENABLED else None,
+        shared_cache_ttl_seconds=TIMESTREAM_SHARED_SINGLE_FLIGHT_TTL_S,
+        result_cache=TimestreamQueryResultCache(
+            get_cache(),
+            settle_delay=timedelta(seconds=TIMESTREAM_RESULT_CACHE_SETTLE_DELAY_S),
+            closed_ttl_seconds=TIMESTREAM_RESULT_CACHE_CLOSED_TTL_S,
+            open_ttl_seconds=TIMESTREAM_RESULT_CACHE_OPEN_TTL_S
+        ) if TIMESTREAM_RESULT_CACHE_ENABLED else None
+    )
+
+@lru_cache(maxsize=None)
+def get_timestream_segment_cache() -> Optional[TimestreamSegmentCache]:
+    if not TIMESTREAM_SEGMENT_CACHE_ENABLED:
+        return None
+    return TimestreamSegmentCache(
+        get_cache(),
+        segment_size=timedelta(seconds=TIMESTREAM_SEGMENT_CACHE_SEGMENT_S),
+        settle_delay=timedelta(seconds=TIMESTREAM_RESULT_CACHE_SETTLE_DELAY_S),
+        ttl_seconds=TIMESTREAM_SEGMENT_CACHE_TTL_S,
+        empty_ttl_seconds=TIMESTREAM_SEGMENT_CACHE_EMPTY_TTL_S
     )
 
+@lru_cache(maxsize=None)
+def get_timestream_resolution_planner() -> TimestreamResolutionPlanner:
+    return TimestreamResolutionPlanner(max_points_per_series=TIMESTREAM_RESOLUTION_MAX_POINTS_PER_SERIES)
+
 def get_timestream_temperature_sensor_place_measurements_service(timestream_client: TimestreamClient = Depends(get_timestream_client)) -> TimestreamTemperatureSensorPlaceMeasurementsService:
     return TimestreamTemperatureSensorPlaceMeasurementsService(
         database=TIMESTREAM_DATABASE_TEMPERATURE,
         table=TIMESTREAM_TABLE_TEMPERATURE_PLACES,
-        client=timestream_client
+        client=timestream_client,
+        segment_cache=get_timestream_segment_cache(),
+        resolution_planner=get_timestream_resolution_planner()
     )
 
 def get_timestream_electricity_circuit_measurements_service(timestream_client: TimestreamClient = Depends(get_timestream_client)) -> TimestreamElectricityCircuitMeasurementsService:
     return TimestreamElectricityCircuitMeasurementsService(
         database=TIMESTREAM_DATABASE_ELECTRICITY,
         table=TIMESTREAM_TABLE_ELECTRICITY_CIRCUITS,
-        client=timestream_client
+        client=timestream_client,
+        resolution_planner=get_timestream_resolution_planner()
+    )
+
+def get_circuit_energy_service(
+    db_session: Session = Depends(get_db),
+    timestream_electricity_circuit_measurements_service: TimestreamElectricityCircuitMeasurementsService = Depends(get_timestream_electricity_circuit_measurements_service)
+) -> CircuitEnergyService:
+    return CircuitEnergyService(
+        circuit_energy_rollups_repository=PostgresCircuitEnergyRollupsRepository(db_session),
+        circuit_measurements_service=timestream_electricity_circuit_measurements_service
+    )
+
+def get_location_energy_usage_service(
+    circuit_energy_service: CircuitEnergyService = Depends(get_circuit_energy_service),
+    location_aggregated_data_cache: Cache = Depends(get_location_aggregated_data_cache)
+) -> LocationEnergyUsageService:
+    return LocationEnergyUsageService(
+        circuit_energy_service=circuit_energy_service,
+        cache=location_aggregated_data_cache,
+        settle_delay=timedelta(seconds=TIMESTREAM_RESULT_CACHE_SETTLE_DELAY_S)
     )
 
 def get_timestream_electric_sensor_voltages_service(timestream_client: TimestreamClient = Depends(get_timestream_client)) -> TimestreamElectricSensorVoltagesService:
@@ -563,7 +726,9 @@ def get_timestream_hvac_zone_measurements_service(timestream_client: TimestreamC
     return TimestreamHvacZoneMeasurementsService(
         database=TIMESTREAM_DATABASE_HVAC,
         table=TIMESTREAM_TABLE_CONTROL_ZONES,
-        client=timestream_client
+        client=timestream_client,
+        segment_cache=get_timestream_segment_cache(),
+        resolution_planner=get_timestream_resolution_planner()
     )
 
 def get_timestream_pes_averages_service(time_stream_client: TimestreamClient = Depends(get_timestream_client)) -> TimestreamPesAveragesService:
@@ -662,10 +827,15 @@ def verify_api_key_authorization(
 
 
 # DP PES module
+@lru_cache(maxsize=None)
 def get_dp_pes_client() -> DpPesClient:
     return DpPesClient(
         url=DP_PES_URL,
-        apikey=DP_PES_API_KEY
+        apikey=DP_PES_API_KEY,
+        pool_maxsize=DP_PES_POOL_MAXSIZE,
+        connect_timeout_seconds=DP_PES_CONNECT_TIMEOUT_S,
+        read_timeout_seconds=DP_PES_READ_TIMEOUT_S,
+        max_retries=DP_PES_MAX_RETRIES,
     )
 
 def get_dp_pes_service(
@@ -1,7 +1,6 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from itertools import chain
-from typing import Iterable, final
+from typing import Dict, Iterable, List, Sequence, final
 from typing_extensions import assert_never
 from uuid import UUID
 
@@ -34,6 +33,14 @@ class LocationDevicesRepository(ABC):
     def get_gateways(self, location_id: UUID) -> Iterable[LocationGateway]:
         ...
 
+    @abstractmethod
+    def get_devices_for_locations(self, location_ids: Sequence[UUID]) -> Dict[UUID, List[LocationDevice]]:
+        ...
+
+    @abstractmethod
+    def get_gateways_for_locations(self, location_ids: Sequence[UUID]) -> Dict[UUID, List[LocationGateway]]:
+        ...
+
     @abstractmethod
     def get_device_by_duid(self, device_duid: str) -> LocationDevice | None:
         ...
@@ -45,25 +52,31 @@ class PostgresLocationDevicesRepository(LocationDevicesRepository):
 
     @final
     def get_devices(self, location_id: UUID) -> Iterable[LocationDevice]:
-        temperature_sensors = self.session.query(TemperatureSensorModel).filter(TemperatureSensorModel.location_id == location_id).all()
+        return self.get_devices_for_locations([location_id])[location_id]
 
-        gateways = self.session.query(GatewayModel).filter(GatewayModel.location_id == location_id).all()
+    @final
+    def get_devices_for_locations(self, location_ids: Sequence[UUID]) -> Dict[UUID, List[LocationDevice]]:
+        temperature_sensors = self.session.query(TemperatureSensorModel).filter(TemperatureSensorModel.location_id.in_(location_ids)).all()
+
+        gateways = self.session.query(GatewayModel).filter(GatewayModel.location_id.in_(location_ids)).all()
         nodes = self.session.query(NodeModel).filter(NodeModel.gateway_id.in_([x.gateway_id for x in gateways])).all()
 
         electric_sensors = self.session.query(ElectricSensorModel).filter(ElectricSensorModel.gateway_id.in_([x.gateway_id for x in gateways])).all()
         thermotats = self.session.query(ThermostatModel).filter(ThermostatModel.node_id.in_([node.node_id for node in nodes])).all()
 
-        return [
-            LocationDevice(
-                device_duid=device.duid,
-                location_id=location_id,
-            )
-            for device in chain[TemperatureSensorModel | ElectricSensorModel | ThermostatModel](
-                temperature_sensors,
-                electric_sensors,
-                thermotats
-            )
-        ]
+        gateway_locations = {gateway.gateway_id: gateway.location_id for gateway in gateways}
+        node_locations = {node.node_id: gateway_locations[node.gateway_id] for node in nodes}
+
+        devices: Dict[UUID, List[LocationDevice]] = {location_id: [] for location_id in location_ids}
+        for temperature_sensor in temperature_sensors:
+            devices[temperature_sensor.location_id].append(LocationDevice(device_duid=temperature_sensor.duid, location_id=temperature_sensor.location_id))
+        for electric_sensor in electric_sensors:
+            location_id = gateway_locations[electric_sensor.gateway_id]
+            devices[location_id].append(LocationDevice(device_duid=electric_sensor.duid, location_id=location_id))
+        for thermostat in thermotats:
+            location_id = node_locations[thermostat.node_id]
+            devices[location_id].append(LocationDevice(device_duid=thermostat.duid, location_id=location_id))
+        return devices
 
     @final
     def get_device_by_duid(self, device_duid: str) -> LocationDevice | None:
@@ -97,10 +110,16 @@ class PostgresLocationDevicesRepository(LocationDevicesRepository):
 
     @final
     def get_gateways(self, location_id: UUID) -> Iterable[LocationGateway]:
-        gateways = self.session.query(GatewayModel).filter(GatewayModel.location_id == location_id).all()
-        return [
-            LocationGateway(
-                gateway_duid=gateway.duid,
+        return self.get_gateways_for_locations([location_id])[location_id]
+
+    @final
+    def get_gateways_for_locations(self, location_ids: Sequence[UUID]) -> Dict[UUID, List[LocationGateway]]:
+        gateways = self.session.query(GatewayModel).filter(GatewayModel.location_id.in_(location_ids)).all()
+        location_gateways: Dict[UUID, List[LocationGateway]] = {location_id: [] for location_id in location_ids}
+        for gateway in gateways:
+            location_gateways[gateway.location_id].append(
+                LocationGateway(
+                    gateway_duid=gateway.duid,
+                )
             )
-            for gateway in gateways
-        ]
+        return location_gateways
@@ -1,5 +1,6 @@
 from datetime import datetime, timedelta, timezone
-from typing import Final, Literal, Optional
+from collections.abc import Mapping, Sequence
+from typing import Dict, Final, List, Literal, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, validator
@@ -41,29 +42,82 @@ class DeviceStatusService:
         self.location_devices_repository = location_devices_repository
 
     def get_device_status( self, device_duid: str) -> Optional[DeviceStatus]:
-        device_status: Final = map_none(self.cache.hgetall(f"status::device::{device_duid}"), lambda x: _DeviceStatusRaw.model_validate(x))
-        if device_status is None:
-            return None
-        return DeviceStatus(
-            last_seen=convert_to_utc(device_status.last_seen),
-            signal_strength=device_status.signal_strength,
-            status="online" if datetime.now(timezone.utc) - device_status.last_seen < _DEVICE_OFFLINE_TIMEOUT else "offline",
-        )
+        return self.get_device_statuses([device_duid])[device_duid]
 
     def get_gateway_status(self, gateway_duid: str) -> Optional[GatewayStatus]:
-        gateway_status: Final = map_none(self.cache.hgetall(f"status::gateway::{gateway_duid}"), lambda x: _GatewayStatusRaw.model_validate(x))
-        if gateway_status is None:
-            return None
-        
-        return GatewayStatus(
-            last_seen=convert_to_utc(gateway_status.last_seen),
-            status="online" if datetime.now(timezone.utc) - gateway_status.last_seen < _GATEWAY_OFFLINE_TIMEOUT else "offline"
-        )
+        return self.get_gateway_statuses([gateway_duid])[gateway_duid]
+
+    def get_device_statuses(self, device_duids: Sequence[str]) -> Dict[str, Optional[DeviceStatus]]:
+        device_statuses, _ = self._get_statuses(device_duids, [])
+        return device_statuses
+
+    def get_gateway_statuses(self, gateway_duids: Sequence[str]) -> Dict[str, Optional[GatewayStatus]]:
+        _, gateway_statuses = self._get_statuses([], gateway_duids)
+        return gateway_statuses
 
     def get_location_status(self, location_id: UUID) -> LocationStatus:
-        devices = self.location_devices_repository.get_devices(location_id)
-        gateways = self.location_devices_repository.get_gateways(location_id)
-        return LocationStatus(
-            devices={device.device_duid: self.get_device_status(device.device_duid) for device in devices},
-            gateways={gateway.gateway_duid: self.get_gateway_status(gateway.gateway_duid) for gateway in gateways},
+        return self.get_location_statuses([location_id])[location_id]
+
+    def get_location_statuses(self, location_ids: Sequence[UUID]) -> Dict[UUID, LocationStatus]:
+        location_device_duids: Dict[UUID, List[str]] = {
+            location_id: [device.device_duid for device in devices]
+            for location_id, devices in self.location_devices_repository.get_devices_for_locations(location_ids).items()
+        }
+        location_gateway_duids: Dict[UUID, List[str]] = {
+            location_id: [gateway.gateway_duid for gateway in gateways]
+            for location_id, gateways in self.location_devices_repository.get_gateways_for_locations(location_ids).items()
+        }
+
+        device_statuses, gateway_statuses = self._get_statuses(
+            [duid for duids in location_device_duids.values() for duid in duids],
+            [duid for duids in location_gateway_duids.values() for duid in duids],
         )
+        return {
+            location_id: LocationStatus(
+                devices={duid: device_statuses[duid] for duid in location_device_duids[location_id]},
+                gateways={duid: gateway_statuses[duid] for duid in location_gateway_duids[location_id]},
+            )
+            for location_id in location_ids
+        }
+
+    def _get_statuses(
+        self,
+        device_duids: Sequence[str],
+        gateway_duids: Sequence[str],
+    ) -> tuple[Dict[str, Optional[DeviceStatus]], Dict[str, Optional[GatewayStatus]]]:
+        # Device and gateway hashes are fetched together in a single pipelined round trip
+        raw_statuses: Final = self.cache.hgetall_many(
+            [f"status::device::{device_duid}" for device_duid in device_duids]
+            + [f"status::gateway::{gateway_duid}" for gateway_duid in gateway_duids]
+        )
+        now: Final = datetime.now(timezone.utc)
+        device_statuses = {
+            device_duid: _to_device_status(raw_status, now)
+            for device_duid, raw_status in zip(device_duids, raw_statuses[:len(device_duids)])
+        }
+        gateway_statuses = {
+            gateway_duid: _to_gateway_status(raw_status, now)
+            for gateway_duid, raw_status in zip(gateway_duids, raw_statuses[len(device_duids):])
+        }
+        return device_statuses, gateway_statuses
+
+
+def _to_device_status(raw_status: Optional[Mapping[str, str | int | float]], now: datetime) -> Optional[DeviceStatus]:
+    device_status: Final = map_none(raw_status, lambda x: _DeviceStatusRaw.model_validate(x))
+    if device_status is None:
+        return None
+    return DeviceStatus(
+        last_seen=convert_to_utc(device_status.last_seen),
+        signal_strength=device_status.signal_strength,
+        status="online" if now - device_status.last_seen < _DEVICE_OFFLINE_TIMEOUT else "offline",
+    )
+
+
+def _to_gateway_status(raw_status: Optional[Mapping[str, str | int | float]], now: datetime) -> Optional[GatewayStatus]:
+    gateway_status: Final = map_none(raw_status, lambda x: _GatewayStatusRaw.model_validate(x))
+    if gateway_status is None:
+        return None
+    return GatewayStatus(
+        last_seen=convert_to_utc(gateway_status.last_seen),
+        status="online" if now - gateway_status.last_seen < _GATEWAY_OFFLINE_TIMEOUT else "offline"
+    )
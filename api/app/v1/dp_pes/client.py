@@ -1,32 +1,75 @@
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 from urllib.parse import urljoin
 
 import requests
 
 from pydantic import  BaseModel
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.px.pxmetrics import metrics
+
+
+class _DpPesRetry(Retry):
+
+    def is_retry(self, method: str, status_code: int, has_retry_after: bool = False) -> bool:
+        # A POST failing with another 5xx may have been applied, only a 503 says it was not
+        if method.upper() == 'POST' and status_code != 503:
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
 
 
 class DpPesClient:
+    """
+    HTTP client for the DP-PES API.
+
+    Requests go through a single keep-alive ``requests.Session`` whose connection pool is bounded by
+    ``pool_maxsize``, so one instance should be shared by the whole process. Failed connection
+    attempts and 5xx responses are retried with jittered exponential backoff; read timeouts are not
+    retried because the request may already have been applied upstream. For the same reason, POST
+    requests are only retried on 503 responses.
+    """
 
     def __init__(
         self,
         url: str,
-        apikey: str
+        apikey: str,
+        pool_maxsize: int = 10,
+        connect_timeout_seconds: float = 3.05,
+        read_timeout_seconds: float = 10,
+        max_retries: int = 3,
+        backoff_factor: float = 0.5,
+        backoff_jitter: float = 0.5,
     ):
         self.url = url
         self.apikey = apikey
-    
+        self.timeout: Tuple[float, float] = (connect_timeout_seconds, read_timeout_seconds)
+        retry = _DpPesRetry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,
+            status=max_retries,
+            status_forcelist=(500, 502, 503, 504),
+            allowed_methods=frozenset({'GET', 'POST'}),
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_jitter,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers['px-apikey'] = self.apikey
+
     def get(
         self,
         route: str,
         params: Optional[Dict[str, str]] = None,
         headers: Optional[Dict[str, str]] = None
     ):
-        if headers is None:
-            headers = {}
-        headers['px-apikey'] = self.apikey
-        return requests.get(urljoin(self.url, route), params=params, headers=headers)
-    
+        with metrics.timer(f'dp_pes.GET {route}'):
+            return self.session.get(urljoin(self.url, route), params=params, headers=headers, timeout=self.timeout)
+
     def post(
         self,
         route: str,
@@ -34,8 +77,9 @@ class DpPesClient:
         params: Optional[Dict[str, str]] = None,
         headers: Optional[Dict[str, str]] = None
     ):
-        if headers is None:
-            headers = {}
-        headers['px-apikey'] = self.apikey
         body_json = body.model_dump_json() if body is not None else None
-        return requests.post(urljoin(self.url, route), data=body_json, params=params, headers=headers)
+        with metrics.timer(f'dp_pes.POST {route}'):
+            return self.session.post(urljoin(self.url, route), data=body_json, params=params, headers=headers, timeout=self.timeout)
+
+    def close(self) -> None:
+        self.session.close()
@@ -0,0 +1,75 @@
+from collections.abc import Iterator, Sequence
+from datetime import datetime
+from itertools import chain
+from typing import Dict, List, Tuple
+from uuid import UUID
+
+from app.v1.timestream.schemas.circuit_energy_usage import CircuitEnergyUsage
+from app.v1.timestream.schemas.energy_usage import EnergyUsage
+
+
+class CircuitEnergyPivot:
+    """
+    The energy usage of a location's circuits pivoted into a (group x circuit) table, e.g. the
+    groups of a load curve or the single period of a consumption breakdown.
+
+    Mains come first in each row, then branch circuits, so that their totals are sums of slices of
+    the rows. Cells of circuits without usage in a group are left at zero.
+    """
+
+    def __init__(self, group_starts: Sequence[datetime], main_ids: Sequence[UUID], branch_ids: Sequence[UUID]):
+        self.group_starts = list(group_starts)
+        self.main_ids = list(main_ids)
+        self.branch_ids = list(branch_ids)
+        self._mains = slice(0, len(self.main_ids))
+        self._branches = slice(len(self.main_ids), len(self.main_ids) + len(self.branch_ids))
+        self._columns: Dict[UUID, int] = {}
+        for column, circuit_id in enumerate(chain(self.main_ids, self.branch_ids)):
+            self._columns.setdefault(circuit_id, column)
+        width = len(self.main_ids) + len(self.branch_ids)
+        self.kwh: List[List[float]] = [[0.0] * width for _ in self.group_starts]
+        self.money: List[List[float]] = [[0.0] * width for _ in self.group_starts]
+        self._has_usage: List[bytearray] = [bytearray(width) for _ in self.group_starts]
+
+    def add(self, group: int, usage: CircuitEnergyUsage) -> None:
+        """Adds ``usage`` to the cell of its circuit in the ``group``-th group, unless the circuit is unknown."""
+        column = self._columns.get(usage.circuit_id)
+        if column is None:
+            return
+        self.kwh[group][column] += usage.usage.kwh
+        self.money[group][column] += usage.usage.money
+        self._has_usage[group][column] = 1
+
+    def mains_kwh(self) -> List[float]:
+        return [sum(row[self._mains]) for row in self.kwh]
+
+    def branches_kwh(self) -> List[float]:
+        return [sum(row[self._branches]) for row in self.kwh]
+
+    def mains_usage(self) -> EnergyUsage:
+        """The usage of the mains over all groups."""
+        return EnergyUsage(
+            kwh=sum(sum(row[self._mains]) for row in self.kwh),
+            money=sum(sum(row[self._mains]) for row in self.money)
+        )
+
+    def branches_usage(self) -> EnergyUsage:
+        """The usage of the branch circuits over all groups."""
+        return EnergyUsage(
+            kwh=sum(sum(row[self._branches]) for row in self.kwh),
+            money=sum(sum(row[self._branches]) for row in self.money)
+        )
+
+    def branch_usages(self) -> List[EnergyUsage]:
+        """The usage of each branch circuit over all groups, in the order of ``branch_ids``."""
+        kwh = [sum(column) for column in zip(*(row[self._branches] for row in self.kwh))] or [0.0] * len(self.branch_ids)
+        money = [sum(column) for column in zip(*(row[self._branches] for row in self.money))] or [0.0] * len(self.branch_ids)
+        return [EnergyUsage(kwh=circuit_kwh, money=circuit_money) for circuit_kwh, circuit_money in zip(kwh, money)]
+
+    def group_branches_kwh(self, group: int) -> Iterator[Tuple[UUID, float]]:
+        """Yields the kWh of the branch circuits with usage in the ``group``-th group."""
+        row = self.kwh[group]
+        has_usage = self._has_usage[group]
+        for column, circuit_id in enumerate(self.branch_ids, start=len(self.main_ids)):
+            if has_usage[column] and self._columns[circuit_id] == column:
+                yield circuit_id, row[column]
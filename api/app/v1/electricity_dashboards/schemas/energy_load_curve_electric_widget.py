@@ -66,6 +66,10 @@ class EnergyLoadCurveGroup(BaseModel):
 class GetEnergyLoadCurveElectricWidgetResponseData(BaseModel):
     devices: Dict[UUID, str]
     groups: List[EnergyLoadCurveGroup]
+    # The size of the returned groups, larger than the requested one when groups were merged to
+    # fit max_points, in which case the last group may be shorter
+    group_size: int
+    group_unit: EnergyLoadCurveElectricWidgetGroupByUnit
 
 
 class GetEnergyLoadCurveElectricWidgetResponse(BaseResponse):
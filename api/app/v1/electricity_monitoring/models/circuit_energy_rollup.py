@@ -0,0 +1,37 @@
+from datetime import date, datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import DateTime, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class CircuitHourlyEnergyRollup(Base):
+    __tablename__ = "circuit_hourly_energy_rollups"
+
+    circuit_id: Mapped[UUID] = mapped_column(ForeignKey("circuits.circuit_id", ondelete="CASCADE"), primary_key=True)
+    hour_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    local_hour_start: Mapped[datetime] = mapped_column()
+    kwh: Mapped[float] = mapped_column()
+    money: Mapped[float] = mapped_column()
+
+
+class CircuitDailyEnergyRollup(Base):
+    __tablename__ = "circuit_daily_energy_rollups"
+
+    circuit_id: Mapped[UUID] = mapped_column(ForeignKey("circuits.circuit_id", ondelete="CASCADE"), primary_key=True)
+    day: Mapped[date] = mapped_column(primary_key=True)
+    day_start: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    kwh: Mapped[float] = mapped_column()
+    money: Mapped[float] = mapped_column()
+
+
+class CircuitEnergyRollupProgress(Base):
+    __tablename__ = "circuit_energy_rollup_progress"
+
+    circuit_id: Mapped[UUID] = mapped_column(ForeignKey("circuits.circuit_id", ondelete="CASCADE"), primary_key=True)
+    timezone: Mapped[str] = mapped_column()
+    hourly_rolled_up_until: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    daily_rolled_up_until: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+    updated_at: Mapped[datetime] = mapped_column(default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
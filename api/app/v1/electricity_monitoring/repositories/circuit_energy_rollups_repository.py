@@ -0,0 +1,205 @@
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timedelta
+from typing import Dict, List, final
+from uuid import UUID
+
+from sqlalchemy import Date, DateTime, cast, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.v1.electricity_monitoring.models.circuit_energy_rollup import (
+    CircuitDailyEnergyRollup as CircuitDailyEnergyRollupModel,
+    CircuitEnergyRollupProgress as CircuitEnergyRollupProgressModel,
+    CircuitHourlyEnergyRollup as CircuitHourlyEnergyRollupModel,
+)
+from app.v1.electricity_monitoring.schemas.circuit_energy_rollup import (
+    CircuitDailyEnergyRollup,
+    CircuitEnergyRollupProgress,
+    CircuitHourlyEnergyRollup,
+)
+from app.v1.timestream.schemas.circuit_energy_usage import CircuitEnergyUsage
+from app.v1.timestream.schemas.energy_usage import EnergyUsage
+
+
+class CircuitEnergyRollupsRepository(ABC):
+
+    @abstractmethod
+    def get_progress(self, circuit_ids: List[UUID]) -> Dict[UUID, CircuitEnergyRollupProgress]:
+        ...
+
+    @abstractmethod
+    def save_progress(self, progress: List[CircuitEnergyRollupProgress]) -> None:
+        ...
+
+    @abstractmethod
+    def save_hourly_rollups(self, rollups: List[CircuitHourlyEnergyRollup]) -> None:
+        ...
+
+    @abstractmethod
+    def refresh_daily_rollups(self, circuit_ids: List[UUID], timezone: str, first_day: date, last_day: date) -> None:
+        """Recomputes the daily rollups of ``first_day`` to ``last_day``, inclusive, from the hourly ones."""
+        ...
+
+    @abstractmethod
+    def get_hourly_rollups(self, circuit_ids: List[UUID], start_datetime: datetime, end_datetime: datetime) -> List[CircuitHourlyEnergyRollup]:
+        """Returns the hourly rollups starting in ``[start_datetime, end_datetime)``, ordered by start."""
+        ...
+
+    @abstractmethod
+    def get_daily_rollups(self, circuit_ids: List[UUID], first_day: date, last_day: date) -> List[CircuitDailyEnergyRollup]:
+        """Returns the daily rollups of ``first_day`` to ``last_day``, inclusive, ordered by day."""
+        ...
+
+    @abstractmethod
+    def sum_hourly_rollups(self, circuit_ids: List[UUID], start_datetime: datetime, end_datetime: datetime) -> List[CircuitEnergyUsage]:
+        """Returns the usage of each circuit over the hours starting in ``[start_datetime, end_datetime)``."""
+        ...
+
+    @abstractmethod
+    def sum_daily_rollups(self, circuit_ids: List[UUID], first_day: date, last_day: date) -> List[CircuitEnergyUsage]:
+        """Returns the usage of each circuit over ``first_day`` to ``last_day``, inclusive."""
+        ...
+
+
+class PostgresCircuitEnergyRollupsRepository(CircuitEnergyRollupsRepository):
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    @final
+    def get_progress(self, circuit_ids: List[UUID]) -> Dict[UUID, CircuitEnergyRollupProgress]:
+        if len(circuit_ids) == 0:
+            return {}
+        progress = self.session.query(CircuitEnergyRollupProgressModel).filter(
+            CircuitEnergyRollupProgressModel.circuit_id.in_(circuit_ids)
+        ).all()
+        return {
+            circuit_progress.circuit_id: CircuitEnergyRollupProgress.model_validate(circuit_progress, from_attributes=True)
+            for circuit_progress in progress
+        }
+
+    @final
+    def save_progress(self, progress: List[CircuitEnergyRollupProgress]) -> None:
+        if len(progress) == 0:
+            return
+        statement = insert(CircuitEnergyRollupProgressModel).values([
+            {**circuit_progress.model_dump(), 'updated_at': func.now()}
+            for circuit_progress in progress
+        ])
+        self.session.execute(statement.on_conflict_do_update(
+            index_elements=[CircuitEnergyRollupProgressModel.circuit_id],
+            set_={
+                'timezone': statement.excluded.timezone,
+                'hourly_rolled_up_until': statement.excluded.hourly_rolled_up_until,
+                'daily_rolled_up_until': statement.excluded.daily_rolled_up_until,
+                'updated_at': statement.excluded.updated_at,
+            }
+        ))
+        self.session.commit()
+
+    @final
+    def save_hourly_rollups(self, rollups: List[CircuitHourlyEnergyRollup]) -> None:
+        if len(rollups) == 0:
+            return
+        statement = insert(CircuitHourlyEnergyRollupModel).values([rollup.model_dump() for rollup in rollups])
+        self.session.execute(statement.on_conflict_do_update(
+            index_elements=[CircuitHourlyEnergyRollupModel.circuit_id, CircuitHourlyEnergyRollupModel.hour_start],
+            set_={
+                'local_hour_start': statement.excluded.local_hour_start,
+                'kwh': statement.excluded.kwh,
+                'money': statement.excluded.money,
+            }
+        ))
+        self.session.commit()
+
+    @final
+    def refresh_daily_rollups(self, circuit_ids: List[UUID], timezone: str, first_day: date, last_day: date) -> None:
+        if len(circuit_ids) == 0:
+            return
+        # Hourly bins follow the location's local time, so each one falls within a single local day
+        day = cast(CircuitHourlyEnergyRollupModel.local_hour_start, Date)
+        daily_rollups = select(
+            CircuitHourlyEnergyRollupModel.circuit_id,
+            day,
+            func.timezone(literal(timezone), cast(day, DateTime)),
+            func.sum(CircuitHourlyEnergyRollupModel.kwh),
+            func.sum(CircuitHourlyEnergyRollupModel.money),
+        ).where(
+            CircuitHourlyEnergyRollupModel.circuit_id.in_(circuit_ids),
+            CircuitHourlyEnergyRollupModel.local_hour_start >= datetime.combine(first_day, datetime.min.time()),
+            CircuitHourlyEnergyRollupModel.local_hour_start < datetime.combine(last_day + timedelta(days=1), datetime.min.time()),
+        ).group_by(
+            CircuitHourlyEnergyRollupModel.circuit_id,
+            day,
+        )
+        statement = insert(CircuitDailyEnergyRollupModel).from_select(
+            ['circuit_id', 'day', 'day_start', 'kwh', 'money'],
+            daily_rollups
+        )
+        self.session.execute(statement.on_conflict_do_update(
+            index_elements=[CircuitDailyEnergyRollupModel.circuit_id, CircuitDailyEnergyRollupModel.day],
+            set_={
+                'day_start': statement.excluded.day_start,
+                'kwh': statement.excluded.kwh,
+                'money': statement.excluded.money,
+            }
+        ))
+        self.session.commit()
+
+    @final
+    def get_hourly_rollups(self, circuit_ids: List[UUID], start_datetime: datetime, end_datetime: datetime) -> List[CircuitHourlyEnergyRollup]:
+        if len(circuit_ids) == 0:
+            return []
+        rollups = self.session.query(CircuitHourlyEnergyRollupModel).filter(
+            CircuitHourlyEnergyRollupModel.circuit_id.in_(circuit_ids),
+            CircuitHourlyEnergyRollupModel.hour_start >= start_datetime,
+            CircuitHourlyEnergyRollupModel.hour_start < end_datetime,
+        ).order_by(CircuitHourlyEnergyRollupModel.hour_start).all()
+        return [CircuitHourlyEnergyRollup.model_validate(rollup, from_attributes=True) for rollup in rollups]
+
+    @final
+    def get_daily_rollups(self, circuit_ids: List[UUID], first_day: date, last_day: date) -> List[CircuitDailyEnergyRollup]:
+        if len(circuit_ids) == 0:
+            return []
+        rollups = self.session.query(CircuitDailyEnergyRollupModel).filter(
+            CircuitDailyEnergyRollupModel.circuit_id.in_(circuit_ids),
+            CircuitDailyEnergyRollupModel.day >= first_day,
+            CircuitDailyEnergyRollupModel.day <= last_day,
+        ).order_by(CircuitDailyEnergyRollupModel.day).all()
+        return [CircuitDailyEnergyRollup.model_validate(rollup, from_attributes=True) for rollup in rollups]
+
+    @final
+    def sum_hourly_rollups(self, circuit_ids: List[UUID], start_datetime: datetime, end_datetime: datetime) -> List[CircuitEnergyUsage]:
+        if len(circuit_ids) == 0:
+            return []
+        rows = self.session.query(
+            CircuitHourlyEnergyRollupModel.circuit_id,
+            func.sum(CircuitHourlyEnergyRollupModel.kwh),
+            func.sum(CircuitHourlyEnergyRollupModel.money),
+        ).filter(
+            CircuitHourlyEnergyRollupModel.circuit_id.in_(circuit_ids),
+            CircuitHourlyEnergyRollupModel.hour_start >= start_datetime,
+            CircuitHourlyEnergyRollupModel.hour_start < end_datetime,
+        ).group_by(CircuitHourlyEnergyRollupModel.circuit_id).all()
+        return [
+            CircuitEnergyUsage(circuit_id=circuit_id, usage=EnergyUsage(kwh=kwh, money=money))
+            for circuit_id, kwh, money in rows
+        ]
+
+    @final
+    def sum_daily_rollups(self, circuit_ids: List[UUID], first_day: date, last_day: date) -> List[CircuitEnergyUsage]:
+        if len(circuit_ids) == 0:
+            return []
+        rows = self.session.query(
+            CircuitDailyEnergyRollupModel.circuit_id,
+            func.sum(CircuitDailyEnergyRollupModel.kwh),
+            func.sum(CircuitDailyEnergyRollupModel.money),
+        ).filter(
+            CircuitDailyEnergyRollupModel.circuit_id.in_(circuit_ids),
+            CircuitDailyEnergyRollupModel.day >= first_day,
+            CircuitDailyEnergyRollupModel.day <= last_day,
+        ).group_by(CircuitDailyEnergyRollupModel.circuit_id).all()
+        return [
+            CircuitEnergyUsage(circuit_id=circuit_id, usage=EnergyUsage(kwh=kwh, money=money))
+            for circuit_id, kwh, money in rows
+        ]
@@ -0,0 +1,28 @@
+from datetime import date, datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class CircuitHourlyEnergyRollup(BaseModel):
+    circuit_id: UUID
+    hour_start: datetime
+    # Start of the hour in the circuit's location time, without timezone
+    local_hour_start: datetime
+    kwh: float
+    money: float
+
+
+class CircuitDailyEnergyRollup(BaseModel):
+    circuit_id: UUID
+    day: date
+    day_start: datetime
+    kwh: float
+    money: float
+
+
+class CircuitEnergyRollupProgress(BaseModel):
+    circuit_id: UUID
+    timezone: str
+    hourly_rolled_up_until: datetime
+    daily_rolled_up_until: datetime
@@ -0,0 +1,244 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, cast
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+from app.px.pxmetrics import metrics
+from app.v1.electricity_dashboards.schemas.energy_load_curve_electric_widget import EnergyLoadCurveElectricWidgetGroupByUnit
+from app.v1.electricity_monitoring.repositories.circuit_energy_rollups_repository import CircuitEnergyRollupsRepository
+from app.v1.timestream.schemas.circuit_energy_usage import CircuitEnergyUsage
+from app.v1.timestream.schemas.energy_usage import EnergyUsage
+from app.v1.timestream.schemas.grouped_circuit_energy_usage_mesaure import GroupedCircuitEnergyUsageMeasure
+from app.v1.timestream.services.circuit_measurements_service import TimestreamElectricityCircuitMeasurementsService
+
+
+_LOCAL_EPOCH = datetime(1970, 1, 1)
+
+
+def _is_hour_aligned(value: datetime, tz: ZoneInfo) -> bool:
+    local_value = value.astimezone(tz)
+    return local_value.minute == 0 and local_value.second == 0 and local_value.microsecond == 0
+
+
+def _is_day_aligned(value: datetime, tz: ZoneInfo) -> bool:
+    return _is_hour_aligned(value, tz) and value.astimezone(tz).hour == 0
+
+
+def _exclusive_end(end_datetime: datetime, tz: ZoneInfo, is_aligned: Callable[[datetime, ZoneInfo], bool]) -> Optional[datetime]:
+    # Periods end either on a boundary or just before one, e.g. at 23:59:59.999999
+    if is_aligned(end_datetime + timedelta(microseconds=1), tz):
+        return end_datetime + timedelta(microseconds=1)
+    if is_aligned(end_datetime, tz):
+        return end_datetime
+    return None
+
+
+def _local_bin_start(local_start: datetime, bin_size: timedelta) -> datetime:
+    # Same as Timestream's BIN(local_time, ...), which bins from the epoch
+    return _LOCAL_EPOCH + (local_start - _LOCAL_EPOCH) // bin_size * bin_size
+
+
+class CircuitEnergyService:
+    """
+    Serves circuit energy queries from the hourly and daily rollups whenever they can answer them
+    exactly, and from Timestream otherwise.
+
+    Rollups can answer a query when every circuit is rolled up past its end and it starts and ends
+    on whole hours of the circuits' local time (whole days to use the daily rollups). Periods may end
+    either on the boundary itself or a microsecond before it; in both cases the boundary is excluded.
+    """
+
+    def __init__(
+        self,
+        circuit_energy_rollups_repository: CircuitEnergyRollupsRepository,
+        circuit_measurements_service: TimestreamElectricityCircuitMeasurementsService
+    ):
+        self.circuit_energy_rollups_repository = circuit_energy_rollups_repository
+        self.circuit_measurements_service = circuit_measurements_service
+
+    def _get_rollups_coverage(self, circuit_ids: List[UUID]) -> Optional[Tuple[ZoneInfo, datetime, datetime]]:
+        """
+        Returns the circuits' timezone and until when hourly and daily rollups cover all of them, or
+        ``None`` when some are not rolled up.
+        """
+        if len(circuit_ids) == 0:
+            return None
+        progress = self.circuit_energy_rollups_repository.get_progress(circuit_ids)
+        if len(progress) != len(set(circuit_ids)):
+            return None
+        timezones = {circuit_progress.timezone for circuit_progress in progress.values()}
+        if len(timezones) != 1:
+            return None
+        return (
+            ZoneInfo(timezones.pop()),
+            min(circuit_progress.hourly_rolled_up_until for circuit_progress in progress.values()),
+            min(circuit_progress.daily_rolled_up_until for circuit_progress in progress.values()),
+        )
+
+    def _get_rollups_period(
+        self,
+        coverage: Optional[Tuple[ZoneInfo, datetime, datetime]],
+        start_datetime: datetime,
+        end_datetime: datetime
+    ) -> Optional[Tuple[ZoneInfo, datetime, bool]]:
+        """
+        Returns the circuits' timezone, the exclusive end of the period and whether daily rollups
+        can be used, or ``None`` when rollups cannot answer for the period.
+        """
+        if coverage is None:
+            return None
+        tz, hourly_rolled_up_until, daily_rolled_up_until = coverage
+        if not _is_hour_aligned(start_datetime, tz):
+            return None
+        end_exclusive = _exclusive_end(end_datetime, tz, _is_hour_aligned)
+        if end_exclusive is None or end_exclusive > hourly_rolled_up_until:
+            return None
+        use_daily_rollups = (
+            _is_day_aligned(start_datetime, tz)
+            and _is_day_aligned(end_exclusive, tz)
+            and end_exclusive <= daily_rolled_up_until
+        )
+        return tz, end_exclusive, use_daily_rollups
+
+    def _sum_rollups(
+        self,
+        circuit_ids: List[UUID],
+        start_datetime: datetime,
+        period: Tuple[ZoneInfo, datetime, bool]
+    ) -> List[CircuitEnergyUsage]:
+        tz, end_exclusive, use_daily_rollups = period
+        if use_daily_rollups:
+            return self.circuit_energy_rollups_repository.sum_daily_rollups(
+                circuit_ids=circuit_ids,
+                first_day=start_datetime.astimezone(tz).date(),
+                last_day=end_exclusive.astimezone(tz).date() - timedelta(days=1)
+            )
+        return self.circuit_energy_rollups_repository.sum_hourly_rollups(
+            circuit_ids=circuit_ids,
+            start_datetime=start_datetime,
+            end_datetime=end_exclusive
+        )
+
+    def get_energy_table_circuits_energy(
+        self,
+        circuit_ids: List[UUID],
+        start_datetime: datetime,
+        end_datetime: datetime,
+    ) -> List[CircuitEnergyUsage]:
+        period = self._get_rollups_period(self._get_rollups_coverage(circuit_ids), start_datetime, end_datetime)
+        if period is None:
+            metrics.increment('circuit_energy.timestream')
+            return self.circuit_measurements_service.get_energy_table_circuits_energy(
+                circuit_ids=circuit_ids,
+                start_datetime=start_datetime,
+                end_datetime=end_datetime
+            )
+        metrics.increment('circuit_energy.rollups')
+        return self._sum_rollups(circuit_ids, start_datetime, period)
+
+    def get_total_energy_for_windows(
+        self,
+        circuit_ids: List[UUID],
+        windows: Sequence[Tuple[datetime, datetime]]
+    ) -> List[EnergyUsage]:
+        """
+        Returns the energy used by all of ``circuit_ids`` together within each ``(start, end)``
+        window. Windows the rollups cannot answer for are all queried from Timestream at once.
+        """
+        coverage = self._get_rollups_coverage(circuit_ids)
+        usages: List[Optional[EnergyUsage]] = []
+        for start_datetime, end_datetime in windows:
+            period = self._get_rollups_period(coverage, start_datetime, end_datetime)
+            if period is None:
+                usages.append(None)
+                continue
+            metrics.increment('circuit_energy.rollups')
+            circuit_usages = self._sum_rollups(circuit_ids, start_datetime, period)
+            usages.append(EnergyUsage(
+                kwh=sum(circuit_usage.usage.kwh for circuit_usage in circuit_usages),
+                money=sum(circuit_usage.usage.money for circuit_usage in circuit_usages)
+            ))
+
+        missing_indexes = [index for index, usage in enumerate(usages) if usage is None]
+        if len(missing_indexes) > 0:
+            metrics.increment('circuit_energy.timestream')
+            missing_usages = self.circuit_measurements_service.get_total_energy_for_windows(
+                circuit_ids=circuit_ids,
+                windows=[windows[index] for index in missing_indexes]
+            )
+            for index, usage in zip(missing_indexes, missing_usages):
+                usages[index] = usage
+        return cast(List[EnergyUsage], usages)
+
+    def get_grouped_circuits_energy(
+        self,
+        circuit_ids: List[UUID],
+        start_datetime: datetime,
+        end_datetime: datetime,
+        group_by_unit: EnergyLoadCurveElectricWidgetGroupByUnit,
+        group_by_size: int
+    ) -> List[GroupedCircuitEnergyUsageMeasure]:
+        period = None
+        if group_by_unit in (EnergyLoadCurveElectricWidgetGroupByUnit.hours, EnergyLoadCurveElectricWidgetGroupByUnit.days):
+            period = self._get_rollups_period(self._get_rollups_coverage(circuit_ids), start_datetime, end_datetime)
+        if period is None:
+            metrics.increment('circuit_energy.timestream')
+            return self.circuit_measurements_service.get_grouped_circuits_energy(
+                circuit_ids=circuit_ids,
+                start_datetime=start_datetime,
+                end_datetime=end_datetime,
+                group_by_unit=group_by_unit,
+                group_by_size=group_by_size
+            )
+
+        metrics.increment('circuit_energy.rollups')
+        tz, end_exclusive, use_daily_rollups = period
+        bin_size = timedelta(hours=group_by_size) if group_by_unit is EnergyLoadCurveElectricWidgetGroupByUnit.hours else timedelta(days=group_by_size)
+
+        # (circuit_id, local start, start, kwh, money) of each rollup
+        rollups: List[Tuple[UUID, datetime, datetime, float, float]]
+        if use_daily_rollups:
+            rollups = [
+                (rollup.circuit_id, datetime.combine(rollup.day, datetime.min.time()), rollup.day_start, rollup.kwh, rollup.money)
+                for rollup in self.circuit_energy_rollups_repository.get_daily_rollups(
+                    circuit_ids=circuit_ids,
+                    first_day=start_datetime.astimezone(tz).date(),
+                    last_day=end_exclusive.astimezone(tz).date() - timedelta(days=1)
+                )
+            ]
+        else:
+            rollups = [
+                (rollup.circuit_id, rollup.local_hour_start, rollup.hour_start, rollup.kwh, rollup.money)
+                for rollup in self.circuit_energy_rollups_repository.get_hourly_rollups(
+                    circuit_ids=circuit_ids,
+                    start_datetime=start_datetime,
+                    end_datetime=end_exclusive
+                )
+            ]
+
+        # Mirrors BIN(local_time, ...) + (MIN(time) - MIN(local_time)) in the Timestream query
+        usages: Dict[Tuple[datetime, UUID], List[float]] = defaultdict(lambda: [0.0, 0.0])
+        first_starts: Dict[Tuple[datetime, UUID], Tuple[datetime, datetime]] = {}
+        for circuit_id, local_start, start, kwh, money in rollups:
+            group = (_local_bin_start(local_start, bin_size), circuit_id)
+            usages[group][0] += kwh
+            usages[group][1] += money
+            first_local_start, first_start = first_starts.get(group, (local_start, start))
+            first_starts[group] = (min(first_local_start, local_start), min(first_start, start))
+
+        measures: List[Tuple[datetime, GroupedCircuitEnergyUsageMeasure]] = []
+        for (local_bin_start, circuit_id), (kwh, money) in usages.items():
+            first_local_start, first_start = first_starts[(local_bin_start, circuit_id)]
+            measures.append((
+                local_bin_start,
+                GroupedCircuitEnergyUsageMeasure(
+                    start=(local_bin_start + (first_start.astimezone(timezone.utc).replace(tzinfo=None) - first_local_start)).replace(tzinfo=timezone.utc),
+                    usage=CircuitEnergyUsage(
+                        circuit_id=circuit_id,
+                        usage=EnergyUsage(kwh=kwh, money=money)
+                    )
+                )
+            ))
+        measures.sort(key=lambda measure: (measure[0], measure[1].start))
+        return [measure for _, measure in measures]
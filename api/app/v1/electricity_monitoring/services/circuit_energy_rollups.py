@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta, timezone
+from typing import List
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+from app.v1.electricity_monitoring.repositories.circuit_energy_rollups_repository import CircuitEnergyRollupsRepository
+from app.v1.electricity_monitoring.schemas.circuit_energy_rollup import CircuitEnergyRollupProgress
+from app.v1.timestream.services.circuit_measurements_service import TimestreamElectricityCircuitMeasurementsService
+
+
+def floor_to_local_hour(value: datetime, tz: ZoneInfo) -> datetime:
+    return value.astimezone(tz).replace(minute=0, second=0, microsecond=0).astimezone(timezone.utc)
+
+
+def floor_to_local_day(value: datetime, tz: ZoneInfo) -> datetime:
+    return datetime.combine(value.astimezone(tz).date(), datetime.min.time(), tz).astimezone(timezone.utc)
+
+
+class CircuitEnergyRollupsService:
+    """
+    Maintains the hourly and daily circuit energy rollups from Timestream.
+
+    Rollups are computed per location, since hours and days follow the location's local time, in
+    chunks of ``chunk_size`` so that a backfill can be interrupted and resumed. Each chunk is
+    committed along with the circuits' progress, and rolling up an hour again simply overwrites it.
+    """
+
+    def __init__(
+        self,
+        circuit_energy_rollups_repository: CircuitEnergyRollupsRepository,
+        circuit_measurements_service: TimestreamElectricityCircuitMeasurementsService,
+        chunk_size: timedelta = timedelta(days=7)
+    ):
+        self.circuit_energy_rollups_repository = circuit_energy_rollups_repository
+        self.circuit_measurements_service = circuit_measurements_service
+        self.chunk_size = chunk_size
+
+    def roll_up_location_circuits(
+        self,
+        circuit_ids: List[UUID],
+        location_timezone: str,
+        backfill_from: datetime,
+        roll_up_until: datetime
+    ) -> None:
+        """
+        Rolls up the energy of ``circuit_ids`` from where each was left, or from ``backfill_from``
+        for circuits never rolled up, to the last full hour before ``roll_up_until``.
+
+        Hours are not rolled up again once done, so ``roll_up_until`` should lag behind now by the
+        time readings take to settle. Circuits rolled up past it, e.g. by runs with a shorter lag,
+        are moved back to it so that their unsettled hours are served from Timestream and rolled up
+        again once settled.
+        """
+        if len(circuit_ids) == 0:
+            return
+        tz = ZoneInfo(location_timezone)
+        target = floor_to_local_hour(roll_up_until, tz)
+        progress = self.circuit_energy_rollups_repository.get_progress(circuit_ids)
+        ahead = [circuit_progress for circuit_progress in progress.values() if circuit_progress.hourly_rolled_up_until > target]
+        if len(ahead) > 0:
+            self.circuit_energy_rollups_repository.save_progress([
+                CircuitEnergyRollupProgress(
+                    circuit_id=circuit_progress.circuit_id,
+                    timezone=circuit_progress.timezone,
+                    hourly_rolled_up_until=target,
+                    daily_rolled_up_until=min(circuit_progress.daily_rolled_up_until, floor_to_local_day(target, tz))
+                )
+                for circuit_progress in ahead
+            ])
+        chunk_start = min(
+            progress[circuit_id].hourly_rolled_up_until if circuit_id in progress else floor_to_local_hour(backfill_from, tz)
+            for circuit_id in circuit_ids
+        )
+
+        while chunk_start < target:
+            chunk_end = min(chunk_start + self.chunk_size, target)
+            # Saved page by page so that a chunk of many circuits is never held in memory at once
+            for hourly_rollups in self.circuit_measurements_service.iter_hourly_circuits_energy_rollups(
+                circuit_ids=circuit_ids,
+                start_datetime=chunk_start,
+                end_datetime=chunk_end - timedelta(microseconds=1)
+            ):
+                self.circuit_energy_rollups_repository.save_hourly_rollups(hourly_rollups)
+            self.circuit_energy_rollups_repository.refresh_daily_rollups(
+                circuit_ids=circuit_ids,
+                timezone=location_timezone,
+                first_day=chunk_start.astimezone(tz).date(),
+                last_day=(chunk_end - timedelta(microseconds=1)).astimezone(tz).date()
+            )
+            # The day chunk_end falls in is only partially rolled up, so daily rollups stop before it
+            self.circuit_energy_rollups_repository.save_progress([
+                CircuitEnergyRollupProgress(
+                    circuit_id=circuit_id,
+                    timezone=location_timezone,
+                    hourly_rolled_up_until=chunk_end,
+                    daily_rolled_up_until=floor_to_local_day(chunk_end, tz)
+                )
+                for circuit_id in circuit_ids
+            ])
+            chunk_start = chunk_end
@@ -0,0 +1,109 @@
+import hashlib
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Final, List
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+from app.v1.cache.cache import Cache
+from app.v1.electricity_dashboards.schemas.energy_load_curve_electric_widget import EnergyLoadCurveElectricWidgetGroupByUnit
+from app.v1.electricity_monitoring.services.circuit_energy import CircuitEnergyService
+
+
+# Long enough for every day of a month to stay available until the month is over
+_DAILY_TOTAL_TTL: Final = timedelta(days=40)
+
+
+class LocationEnergyUsageService:
+    """
+    Computes month-to-date energy usage incrementally.
+
+    The usage of each closed local day is queried once and kept in the cache, so a month-to-date
+    total only costs a query for the part of the current day that has elapsed, plus one for any
+    closed days not cached yet. A day only closes ``settle_delay`` after its end, so that late
+    readings are still counted, and totals are cached per set of circuits.
+    """
+
+    def __init__(
+        self,
+        circuit_energy_service: CircuitEnergyService,
+        cache: Cache,
+        settle_delay: timedelta = timedelta(hours=6)
+    ):
+        self.circuit_energy_service = circuit_energy_service
+        self.cache = cache
+        self.settle_delay = settle_delay
+
+    def _daily_total_key(self, location_id: UUID, circuit_ids: List[UUID], day: date) -> str:
+        circuits_hash = hashlib.sha256(','.join(sorted(str(circuit_id) for circuit_id in circuit_ids)).encode()).hexdigest()[:16]
+        return f"locations::{location_id!s}::electricity-usage-daily::{circuits_hash}::{day.isoformat()}"
+
+    def _get_closed_days_kwh(
+        self,
+        location_id: UUID,
+        location_timezone: ZoneInfo,
+        circuit_ids: List[UUID],
+        days: List[date]
+    ) -> Dict[date, float]:
+        if len(days) == 0:
+            return {}
+        cached_totals = self.cache.mget([self._daily_total_key(location_id, circuit_ids, day) for day in days])
+        totals = {day: float(total) for day, total in zip(days, cached_totals) if total is not None}
+        missing_days = [day for day in days if day not in totals]
+        if len(missing_days) == 0:
+            return totals
+
+        # Query every day between the first and last missing ones at once, they are usually contiguous
+        missing_totals = {day: 0.0 for day in days if missing_days[0] <= day <= missing_days[-1]}
+        measures = self.circuit_energy_service.get_grouped_circuits_energy(
+            circuit_ids=circuit_ids,
+            start_datetime=datetime.combine(missing_days[0], datetime.min.time(), location_timezone).astimezone(timezone.utc),
+            end_datetime=(
+                datetime.combine(missing_days[-1] + timedelta(days=1), datetime.min.time(), location_timezone) - timedelta(microseconds=1)
+            ).astimezone(timezone.utc),
+            group_by_unit=EnergyLoadCurveElectricWidgetGroupByUnit.days,
+            group_by_size=1
+        )
+        for measure in measures:
+            # Bins start at local midnight, give or take a DST shift, so their middle is always on the right day
+            day = (measure.start + timedelta(hours=12)).astimezone(location_timezone).date()
+            if day in missing_totals:
+                missing_totals[day] += measure.usage.usage.kwh
+
+        self.cache.mset(
+            {self._daily_total_key(location_id, circuit_ids, day): total for day, total in missing_totals.items()},
+            expire_in_seconds=int(_DAILY_TOTAL_TTL.total_seconds())
+        )
+        return {**totals, **missing_totals}
+
+    def get_month_to_date_kwh(
+        self,
+        location_id: UUID,
+        location_timezone: str,
+        circuit_ids: List[UUID],
+        end_datetime: datetime
+    ) -> float:
+        """
+        Returns the usage of ``circuit_ids`` from the start of the location's current month to
+        ``end_datetime``.
+        """
+        tz = ZoneInfo(location_timezone)
+        today = end_datetime.astimezone(tz).date()
+        # Until it settles, yesterday may still receive buffered readings so it is queried along with today
+        settled_until = (end_datetime - self.settle_delay).astimezone(tz).date()
+        live_start_day = max(settled_until, today.replace(day=1))
+        closed_days = [today.replace(day=day) for day in range(1, live_start_day.day)]
+
+        closed_days_kwh = self._get_closed_days_kwh(location_id, tz, circuit_ids, closed_days)
+
+        live_start = datetime.combine(live_start_day, datetime.min.time(), tz).astimezone(timezone.utc)
+        live_kwh = 0.0
+        if end_datetime > live_start:
+            live_kwh = sum(
+                usage_record.usage.kwh
+                for usage_record in self.circuit_energy_service.get_energy_table_circuits_energy(
+                    circuit_ids=circuit_ids,
+                    start_datetime=live_start,
+                    end_datetime=end_datetime.astimezone(timezone.utc)
+                )
+            )
+        return sum(closed_days_kwh.values()) + live_kwh
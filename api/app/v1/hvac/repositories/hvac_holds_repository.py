@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from datetime import datetime, timezone
+from typing import Dict, Sequence
 from uuid import UUID
 
 
@@ -19,6 +20,10 @@ class HvacHoldsRepository(ABC):
     def get_latest_active_hvac_hold_for_control_zone_hvac_widget(self, control_zone_hvac_widget_id: UUID) -> HvacHold | None:
         pass
 
+    @abstractmethod
+    def get_latest_active_hvac_holds_for_control_zone_hvac_widgets(self, control_zone_hvac_widget_ids: Sequence[UUID]) -> Dict[UUID, HvacHold]:
+        pass
+
     @abstractmethod
     def set_control_zone_hvac_widget_id_for_hvac_hold(self, hvac_hold_id: UUID, control_zone_hvac_widget_id: UUID) -> HvacHold | None:
         pass
@@ -74,6 +79,24 @@ class PostgresHvacHoldsRepository(HvacHoldsRepository):
         if hvac_hold:
             return HvacHold.model_validate(hvac_hold, from_attributes=True)
         return None
+
+    def get_latest_active_hvac_holds_for_control_zone_hvac_widgets(self, control_zone_hvac_widget_ids: Sequence[UUID]) -> Dict[UUID, HvacHold]:
+        hvac_holds = (
+            self.db_session
+            .query(HvacHoldModel)
+            .filter(
+                HvacHoldModel.control_zone_hvac_widget_id.in_(control_zone_hvac_widget_ids),
+                HvacHoldModel.expire_at_actual.isnot(None),
+                HvacHoldModel.expire_at_actual > datetime.now(tz=timezone.utc)
+            )
+            .order_by(HvacHoldModel.created_at.desc())
+            .all()
+        )
+        latest_hvac_holds: Dict[UUID, HvacHold] = {}
+        for hvac_hold in hvac_holds:
+            if hvac_hold.control_zone_hvac_widget_id not in latest_hvac_holds:
+                latest_hvac_holds[hvac_hold.control_zone_hvac_widget_id] = HvacHold.model_validate(hvac_hold, from_attributes=True)
+        return latest_hvac_holds
     
     def set_control_zone_hvac_widget_id_for_hvac_hold(self, hvac_hold_id: UUID, control_zone_hvac_widget_id: UUID) -> HvacHold | None:
         hvac_hold = self.db_session.query(HvacHoldModel).filter(HvacHoldModel.hvac_hold_id == hvac_hold_id).first()
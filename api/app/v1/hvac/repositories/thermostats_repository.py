@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, final
+from typing import List, Optional, Sequence, final
 from uuid import UUID
 
 from sqlalchemy.orm import Session
@@ -22,6 +22,10 @@ class ThermostatsRepository(ABC):
     @abstractmethod
     def filter_by(self, **kwargs) -> List[Thermostat]:
         ...
+
+    @abstractmethod
+    def get_for_hvac_zones(self, hvac_zone_ids: Sequence[UUID]) -> List[Thermostat]:
+        ...
     
     @abstractmethod
     def update(self, thermostat_update: ThermostatUpdate) -> Optional[Thermostat]:
@@ -72,6 +76,14 @@ class PostgresThermostatsRepository(ThermostatsRepository):
             for thermostat in thermostats
         ]
     
+    @final
+    def get_for_hvac_zones(self, hvac_zone_ids: Sequence[UUID]) -> List[Thermostat]:
+        thermostats = self.session.query(ThermostatModel).filter(ThermostatModel.hvac_zone_id.in_(hvac_zone_ids)).all()
+        return [
+            Thermostat.model_validate(thermostat, from_attributes=True)
+            for thermostat in thermostats
+        ]
+
     @final
     def update(self, thermostat_update: ThermostatUpdate) -> Optional[Thermostat]:
         thermostat = self.session.query(ThermostatModel).filter(ThermostatModel.thermostat_id == thermostat_update.thermostat_id).first()
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Dict, Sequence
 from uuid import UUID
 
 from app.v1.hvac.repositories.hvac_holds_repository import HvacHoldsRepository
@@ -22,6 +23,9 @@ class HvacHoldsService:
     
     def get_latest_active_hvac_hold_for_control_zone_hvac_widget(self, control_zone_hvac_widget_id: UUID) -> HvacHold | None:
         return self.repository.get_latest_active_hvac_hold_for_control_zone_hvac_widget(control_zone_hvac_widget_id)
+
+    def get_latest_active_hvac_holds_for_control_zone_hvac_widgets(self, control_zone_hvac_widget_ids: Sequence[UUID]) -> Dict[UUID, HvacHold]:
+        return self.repository.get_latest_active_hvac_holds_for_control_zone_hvac_widgets(control_zone_hvac_widget_ids)
     
     def set_control_zone_hvac_widget_id_for_hvac_hold(self, hvac_hold_id: UUID, control_zone_hvac_widget_id: UUID) -> HvacHold | None:
         existing_hvac_hold = self.repository.get_latest_active_hvac_hold_for_control_zone_hvac_widget(control_zone_hvac_widget_id)
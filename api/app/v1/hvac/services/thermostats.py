@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List, Sequence
 from uuid import UUID
 
 from app.errors import NotFoundError
@@ -36,6 +36,14 @@ class ThermostatsService:
             raise ValueError('Multiple thermostats found for the same hvac zone')
         return thermostats[0]
 
+    def get_thermostats_for_hvac_zones(self, hvac_zone_ids: Sequence[UUID]) -> Dict[UUID, Thermostat]:
+        thermostats: Dict[UUID, Thermostat] = {}
+        for thermostat in self.thermostats_repository.get_for_hvac_zones(hvac_zone_ids):
+            if thermostat.hvac_zone_id in thermostats:
+                raise ValueError('Multiple thermostats found for the same hvac zone')
+            thermostats[thermostat.hvac_zone_id] = thermostat
+        return thermostats
+
     def update_thermostat(self, thermostat_update: ThermostatUpdate) -> Thermostat:
         thermostat = self.thermostats_repository.update(thermostat_update)
         if thermostat is None:
@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Dict, List, Mapping, Optional, Sequence
 from uuid import UUID
 
 from app.v1.cache.cache import Cache
@@ -9,6 +9,92 @@ from app.v1.hvac_dashboards.schemas.control_zone_hvac_widget import ControlZoneH
 from app.v1.hvac_dashboards.repositories.control_zone_hvac_widgets_repository import ControlZoneHvacWidgetsRepository
 
 
+_VIRTUAL_DEVICE_STATE_FIELDS = (
+    'fan::mode',
+    'hvac::mode',
+    'thermostat::status',
+    'thermostat::setpointC',
+    'room::temperatureC',
+    'keypad::lockout',
+    'auto::mode',
+    'auto::heating-setpointC',
+    'auto::cooling-setpointC',
+)
+
+
+def _parse_virtual_device_state(
+    cache_values: Mapping[str, Optional[str]],
+    cache_activity: Optional[str]
+) -> VirtualDeviceState:
+    cache_fan_mode = cache_values['fan::mode']
+    fan_mode: Optional[ThermostatHvacFanMode] = None
+    if cache_fan_mode is not None:
+        fan_mode_int = int(cache_fan_mode)
+        if fan_mode_int == 0:
+            fan_mode = ThermostatHvacFanMode.ALWAYS_ON
+        elif fan_mode_int == 1:
+            fan_mode = ThermostatHvacFanMode.AUTO        
+
+    cache_hvac_mode = cache_values['hvac::mode']
+    hvac_mode: Optional[ThermostatHvacMode] = None
+    if cache_hvac_mode is not None:
+        hvac_mode_int = int(cache_hvac_mode)
+        if hvac_mode_int == 1:
+            hvac_mode = ThermostatHvacMode.COOLING
+        elif hvac_mode_int == 2:
+            hvac_mode = ThermostatHvacMode.HEATING
+
+    cache_thermostat_status = cache_values['thermostat::status']
+    thermostat_status: Optional[ThermostatStatus] = None
+    if cache_thermostat_status is not None:
+        thermostat_status_int = int(cache_thermostat_status)
+        if thermostat_status_int == 0:
+            thermostat_status = ThermostatStatus.OFF
+        elif thermostat_status_int == 1:
+            thermostat_status = ThermostatStatus.ON
+
+    cache_thermostat_setpoint_c = cache_values['thermostat::setpointC']
+    thermostat_setpoint_c = float(cache_thermostat_setpoint_c) if cache_thermostat_setpoint_c is not None else None 
+
+    cache_room_temperature_c = cache_values['room::temperatureC']
+    room_temperature_c = float(cache_room_temperature_c) if cache_room_temperature_c is not None else None
+
+    cache_keypad_lockout = cache_values['keypad::lockout']
+    keypad_lockout: Optional[ThermostatLockoutType] = None
+    if cache_keypad_lockout is not None:
+        keypad_lockout_int = int(cache_keypad_lockout)
+        if keypad_lockout_int == 0:
+            keypad_lockout = ThermostatLockoutType.NOT_LOCKED
+        elif keypad_lockout_int == 1:
+            keypad_lockout = ThermostatLockoutType.LOCKED
+        elif keypad_lockout_int == 2:
+            keypad_lockout = ThermostatLockoutType.UNLOCKED
+
+    cache_auto_mode = cache_values['auto::mode']
+    auto_mode = int(cache_auto_mode) == 1 if cache_auto_mode is not None else None
+
+    cache_auto_heating_setpoint_c = cache_values['auto::heating-setpointC']
+    auto_heating_setpoint_c = float(cache_auto_heating_setpoint_c) if cache_auto_heating_setpoint_c is not None else None
+
+    cache_auto_cooling_setpoint_c = cache_values['auto::cooling-setpointC']
+    auto_cooling_setpoint_c = float(cache_auto_cooling_setpoint_c) if cache_auto_cooling_setpoint_c is not None else None
+
+    activity_datetime = datetime.fromtimestamp(int(cache_activity) / 1000, tz=timezone.utc) if cache_activity is not None else None
+
+    return VirtualDeviceState(
+        fan_mode=fan_mode,
+        hvac_mode=hvac_mode,
+        thermostat_status=thermostat_status,
+        thermostat_setpoint_c=thermostat_setpoint_c,
+        room_temperature_c=room_temperature_c,
+        keypad_lockout=keypad_lockout,
+        auto_mode=auto_mode,
+        auto_heating_setpoint_c=auto_heating_setpoint_c,
+        auto_cooling_setpoint_c=auto_cooling_setpoint_c,
+        activity=activity_datetime
+    )
+
+
 class ControlZoneHvacWidgetsService:
 
     def __init__(
@@ -68,76 +154,31 @@ class ControlZoneHvacWidgetsService:
         self,
         thermostat_duid: str
     ) -> VirtualDeviceState:
-        cache_fan_mode = self.cache.hget(f'{thermostat_duid}::fan::mode', 'value')
-        fan_mode: Optional[ThermostatHvacFanMode] = None
-        if cache_fan_mode is not None:
-            fan_mode_int = int(cache_fan_mode)
-            if fan_mode_int == 0:
-                fan_mode = ThermostatHvacFanMode.ALWAYS_ON
-            elif fan_mode_int == 1:
-                fan_mode = ThermostatHvacFanMode.AUTO        
-
-        cache_hvac_mode = self.cache.hget(f'{thermostat_duid}::hvac::mode', 'value')
-        hvac_mode: Optional[ThermostatHvacMode] = None
-        if cache_hvac_mode is not None:
-            hvac_mode_int = int(cache_hvac_mode)
-            if hvac_mode_int == 1:
-                hvac_mode = ThermostatHvacMode.COOLING
-            elif hvac_mode_int == 2:
-                hvac_mode = ThermostatHvacMode.HEATING
-
-        cache_thermostat_status = self.cache.hget(f'{thermostat_duid}::thermostat::status', 'value')
-        thermostat_status: Optional[ThermostatStatus] = None
-        if cache_thermostat_status is not None:
-            thermostat_status_int = int(cache_thermostat_status)
-            if thermostat_status_int == 0:
-                thermostat_status = ThermostatStatus.OFF
-            elif thermostat_status_int == 1:
-                thermostat_status = ThermostatStatus.ON
-
-        cache_thermostat_setpoint_c = self.cache.hget(f'{thermostat_duid}::thermostat::setpointC', 'value')
-        thermostat_setpoint_c = float(cache_thermostat_setpoint_c) if cache_thermostat_setpoint_c is not None else None 
-
-        cache_room_temperature_c = self.cache.hget(f'{thermostat_duid}::room::temperatureC', 'value')
-        room_temperature_c = float(cache_room_temperature_c) if cache_room_temperature_c is not None else None
-
-        cache_keypad_lockout = self.cache.hget(f'{thermostat_duid}::keypad::lockout', 'value')
-        keypad_lockout: Optional[ThermostatLockoutType] = None
-        if cache_keypad_lockout is not None:
-            keypad_lockout_int = int(cache_keypad_lockout)
-            if keypad_lockout_int == 0:
-                keypad_lockout = ThermostatLockoutType.NOT_LOCKED
-            elif keypad_lockout_int == 1:
-                keypad_lockout = ThermostatLockoutType.LOCKED
-            elif keypad_lockout_int == 2:
-                keypad_lockout = ThermostatLockoutType.UNLOCKED
-            
-
-        cache_auto_mode = self.cache.hget(f'{thermostat_duid}::auto::mode', 'value')
-        auto_mode = int(cache_auto_mode) == 1 if cache_auto_mode is not None else None
-
-        cache_auto_heating_setpoint_c = self.cache.hget(f'{thermostat_duid}::auto::heating-setpointC', 'value')
-        auto_heating_setpoint_c = float(cache_auto_heating_setpoint_c) if cache_auto_heating_setpoint_c is not None else None
-
-        cache_auto_cooling_setpoint_c = self.cache.hget(f'{thermostat_duid}::auto::cooling-setpointC', 'value')
-        auto_cooling_setpoint_c = float(cache_auto_cooling_setpoint_c) if cache_auto_cooling_setpoint_c is not None else None
-
-        cache_activity = self.consumer_cache.get(f'activity::{thermostat_duid}')
-        activity_datetime = datetime.fromtimestamp(int(cache_activity) / 1000, tz=timezone.utc) if cache_activity is not None else None
-
-        virtual_device_state = VirtualDeviceState(
-            fan_mode=fan_mode,
-            hvac_mode=hvac_mode,
-            thermostat_status=thermostat_status,
-            thermostat_setpoint_c=thermostat_setpoint_c,
-            room_temperature_c=room_temperature_c,
-            keypad_lockout=keypad_lockout,
-            auto_mode=auto_mode,
-            auto_heating_setpoint_c=auto_heating_setpoint_c,
-            auto_cooling_setpoint_c=auto_cooling_setpoint_c,
-            activity=activity_datetime
-        )
-        return virtual_device_state
+        return self.get_virtual_device_states([thermostat_duid])[thermostat_duid]
+
+    def get_virtual_device_states(
+        self,
+        thermostat_duids: Sequence[str]
+    ) -> Dict[str, VirtualDeviceState]:
+        # One pipelined round trip per cache, whatever the number of thermostats
+        cache_values = self.cache.hget_many([
+            (f'{thermostat_duid}::{field}', 'value')
+            for thermostat_duid in thermostat_duids
+            for field in _VIRTUAL_DEVICE_STATE_FIELDS
+        ])
+        cache_activities = self.consumer_cache.mget([
+            f'activity::{thermostat_duid}'
+            for thermostat_duid in thermostat_duids
+        ])
+
+        field_count = len(_VIRTUAL_DEVICE_STATE_FIELDS)
+        return {
+            thermostat_duid: _parse_virtual_device_state(
+                dict(zip(_VIRTUAL_DEVICE_STATE_FIELDS, cache_values[index * field_count:(index + 1) * field_count])),
+                cache_activities[index]
+            )
+            for index, thermostat_duid in enumerate(thermostat_duids)
+        }
         
     def get_control_zone_hvac_widgets_with_schedule(self, hvac_schedule_id: UUID) -> List[ControlZoneHvacWidget]:
         return self.control_zone_hvac_widgets_repository.get_control_zone_hvac_widgets_with_schedule(hvac_schedule_id)
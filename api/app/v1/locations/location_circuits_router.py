@@ -51,7 +51,8 @@ def list_location_circuits_data(
         circuit_ids=[circuit.circuit_id for circuit in circuits],
         start_datetime=start_datetime,
         end_datetime=end_datetime,
-        aggregation_interval=aggregation_interval
+        aggregation_interval=aggregation_interval,
+        location_timezone=location.timezone
     )
 
     location_circuit_measurements: Dict[UUID, List[CircuitAggregatedMeasurement]] = {}
@@ -60,7 +60,8 @@ def list_location_hvac_zones_data(
         hvac_widget_ids=list(hvac_widget_to_hvac_zone.keys()),
         start_datetime=start_datetime,
         end_datetime=end_datetime,
-        aggregation_interval=aggregation_interval
+        aggregation_interval=aggregation_interval,
+        location_timezone=location.timezone
     )
 
     location_hvac_zone_measurements: Dict[UUID, List[ControlZoneAggregatedMeasurement]] = {}
@@ -52,7 +52,8 @@ def list_temperature_sensor_places_data(
         temperature_sensor_place_ids=[temperature_sensor_place.temperature_sensor_place_id for temperature_sensor_place in temperature_sensor_places],
         start_datetime=start_datetime,
         end_datetime=end_datetime,
-        aggregation_interval=aggregation_interval
+        aggregation_interval=aggregation_interval,
+        location_timezone=location.timezone
     )
 
     location_temperature_sensor_place_measurements: Dict[UUID, List[TemperatureSensorPlaceAggregatedMeasurement]] = {}
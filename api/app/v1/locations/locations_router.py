@@ -191,6 +191,26 @@ def get_locations(organization_id: Optional[UUID] = Query(default=None),
     return locations    
 
 
+@router.get(
+    '/status',
+    dependencies=[Security(verify_any_authorization, scopes=[AccessScope.LOCATIONS_READ])],
+)
+def get_locations_status(
+    location_ids: Annotated[List[UUID], Query(min_length=1, max_length=100)],
+    access_token_data: Optional[AccessTokenData] = Depends(get_access_token_data),
+    locations_service: LocationsService = Depends(get_locations_service),
+    user_access_grants_helper: UserAccessGrantsHelper = Depends(get_user_access_grants_helper),
+    device_status_service: DeviceStatusService = Depends(get_device_status_service),
+) -> Dict[UUID, LocationStatus]:
+    # Allow API Keys to access all locations (for now), but check if a jwt user has access to each location
+    if access_token_data is not None and AccessScope.ADMIN not in access_token_data.access_scopes:
+        for location_id in location_ids:
+            location = _get_location(location_id, locations_service)
+            if not user_access_grants_helper.is_user_authorized_for_location_read(access_token_data.user_id, location):
+                raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail='Forbidden')
+    return device_status_service.get_location_statuses(list(dict.fromkeys(location_ids)))
+
+
 @router.get(
     '/{location_id}',
     dependencies=[Security(verify_any_authorization, scopes=[AccessScope.LOCATIONS_READ])],
@@ -1,6 +1,6 @@
 from abc import ABC, abstractmethod
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Dict, List, Optional, Sequence
 from uuid import UUID
 
 from app.v1.cache.cache import Cache
@@ -13,6 +13,10 @@ class TemperatureSensorPlaceReadingsRepository(ABC):
     def get_latest_activity_for_temperature_sensor_place(self, temperature_sensor_place_id: UUID) -> Optional[TemperatureSensorPlaceReading]:
         pass
 
+    @abstractmethod
+    def get_latest_activity_for_temperature_sensor_places(self, temperature_sensor_place_ids: Sequence[UUID]) -> Dict[UUID, Optional[TemperatureSensorPlaceReading]]:
+        pass
+
 
 class CacheTemperatureSensorPlaceReadingsRepository(TemperatureSensorPlaceReadingsRepository):
 
@@ -22,16 +26,29 @@ class CacheTemperatureSensorPlaceReadingsRepository(TemperatureSensorPlaceReadin
     def _temperature_places_activity_key(self, temperature_sensor_place_id: UUID) -> str:
         return f"temperature_place::{temperature_sensor_place_id!s}::activity"
 
-    def get_latest_activity_for_temperature_sensor_place(self, temperature_sensor_place_id: UUID) -> Optional[TemperatureSensorPlaceReading]:
-        cache_key = self._temperature_places_activity_key(temperature_sensor_place_id)
-        response = self._cache.get(cache_key)
-        if response is None:
-            return None
+    def _parse_activity(self, temperature_sensor_place_id: UUID, response: str) -> TemperatureSensorPlaceReading:
         raw_activity = TemperatureSensorPlaceReadingRaw.model_validate_json(response)
-        parsed_activity = TemperatureSensorPlaceReading(
+        return TemperatureSensorPlaceReading(
             temperature_sensor_place_id=temperature_sensor_place_id,
             temperature_c=raw_activity.temperature_c,
             battery_percentage=raw_activity.battery_percentage,
             created_at=datetime.fromtimestamp(raw_activity.timestamp_ms_utc / 1000, tz=timezone.utc)
         )
-        return parsed_activity
+
+    def get_latest_activity_for_temperature_sensor_place(self, temperature_sensor_place_id: UUID) -> Optional[TemperatureSensorPlaceReading]:
+        cache_key = self._temperature_places_activity_key(temperature_sensor_place_id)
+        response = self._cache.get(cache_key)
+        if response is None:
+            return None
+        return self._parse_activity(temperature_sensor_place_id, response)
+
+    def get_latest_activity_for_temperature_sensor_places(self, temperature_sensor_place_ids: Sequence[UUID]) -> Dict[UUID, Optional[TemperatureSensorPlaceReading]]:
+        unique_temperature_sensor_place_ids: List[UUID] = list(dict.fromkeys(temperature_sensor_place_ids))
+        responses = self._cache.mget([
+            self._temperature_places_activity_key(temperature_sensor_place_id)
+            for temperature_sensor_place_id in unique_temperature_sensor_place_ids
+        ])
+        return {
+            temperature_sensor_place_id: self._parse_activity(temperature_sensor_place_id, response) if response is not None else None
+            for temperature_sensor_place_id, response in zip(unique_temperature_sensor_place_ids, responses)
+        }
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, Optional, Sequence
 from uuid import UUID
 
 from app.v1.temperature_monitoring.repositories.temperature_sensor_place_readings_repository import TemperatureSensorPlaceReadingsRepository
@@ -15,3 +15,6 @@ class TemperatureSensorPlaceReadingsService:
     
     def get_latest_activity_for_temperature_sensor_place(self, temperature_sensor_place_id: UUID) -> Optional[TemperatureSensorPlaceReading]:
         return self._temperature_sensor_place_readings_repository.get_latest_activity_for_temperature_sensor_place(temperature_sensor_place_id)
+
+    def get_latest_activity_for_temperature_sensor_places(self, temperature_sensor_place_ids: Sequence[UUID]) -> Dict[UUID, Optional[TemperatureSensorPlaceReading]]:
+        return self._temperature_sensor_place_readings_repository.get_latest_activity_for_temperature_sensor_places(temperature_sensor_place_ids)
@@ -231,6 +231,38 @@ def list_temperature_sensor_places(location_id: Optional[UUID] = Query(default=N
     return temperature_sensor_places
 
 
+@router.get(
+    '/latest-readings',
+    dependencies=[Security(verify_any_authorization, scopes=[AccessScope.TEMPERATURE_MONITORING_READ])],
+    response_model=List[TemperatureSensorPlaceReading]
+)
+def list_latest_temperature_sensor_place_readings(location_id: Optional[UUID] = Query(default=None),
+                                                  temperature_sensor_id: Optional[UUID] = Query(default=None),
+                                                  name: Optional[str] = Query(default=None),
+                                                  access_token_data: Optional[AccessTokenData] = Depends(get_access_token_data),
+                                                  temperature_sensor_places_service: TemperatureSensorPlacesService = Depends(get_temperature_sensor_places_service),
+                                                  temperature_sensor_place_readings_service: TemperatureSensorPlaceReadingsService = Depends(get_temperature_sensor_place_readings_service),
+                                                  locations_service: LocationsService = Depends(get_locations_service),
+                                                  user_access_grants_helper: UserAccessGrantsHelper = Depends(get_user_access_grants_helper)):
+    temperature_sensor_places = list_temperature_sensor_places(
+        location_id=location_id,
+        temperature_sensor_id=temperature_sensor_id,
+        name=name,
+        access_token_data=access_token_data,
+        temperature_sensor_places_service=temperature_sensor_places_service,
+        locations_service=locations_service,
+        user_access_grants_helper=user_access_grants_helper
+    )
+    latest_readings = temperature_sensor_place_readings_service.get_latest_activity_for_temperature_sensor_places(
+        [temperature_sensor_place.temperature_sensor_place_id for temperature_sensor_place in temperature_sensor_places]
+    )
+    return [
+        latest_reading
+        for latest_reading in latest_readings.values()
+        if latest_reading is not None
+    ]
+
+
 @router.get(
     '/{temperature_sensor_place_id}',
     dependencies=[Security(verify_jwt_authorization, scopes=[AccessScope.TEMPERATURE_MONITORING_READ])],
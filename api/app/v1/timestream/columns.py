@@ -0,0 +1,77 @@
+from collections.abc import Callable, Iterator, Sequence
+from enum import StrEnum
+from typing import Any, Dict, List, Tuple
+from uuid import UUID
+
+from app.v1.timestream.utils import parse_timestream_datetime
+
+
+class ColumnType(StrEnum):
+    """
+    Timestream scalar types a column is decoded from, as in the ``ColumnInfo`` of a query.
+
+    ``UUID`` is a ``VARCHAR`` holding ids, e.g. ``measure_name``.
+    """
+    VARCHAR = 'VARCHAR'
+    UUID = 'UUID'
+    DOUBLE = 'DOUBLE'
+    BIGINT = 'BIGINT'
+    BOOLEAN = 'BOOLEAN'
+    TIMESTAMP = 'TIMESTAMP'
+
+
+def _memoized(decode: Callable[[str], Any]) -> Callable[[Sequence[str]], List[Any]]:
+    # Ids and bin timestamps repeat across rows, e.g. every circuit has the same bins, so each
+    # distinct value is only decoded once and its decoded object is shared
+    def _decode_column(values: Sequence[str]) -> List[Any]:
+        decoded: Dict[str, Any] = {}
+        return [
+            decoded[value] if value in decoded else decoded.setdefault(value, decode(value))
+            for value in values
+        ]
+    return _decode_column
+
+
+_COLUMN_DECODERS: Dict[ColumnType, Callable[[Sequence[str]], List[Any]]] = {
+    ColumnType.VARCHAR: _memoized(str),
+    ColumnType.UUID: _memoized(UUID),
+    ColumnType.DOUBLE: lambda values: list(map(float, values)),
+    ColumnType.BIGINT: lambda values: list(map(int, values)),
+    ColumnType.BOOLEAN: lambda values: [value == 'true' for value in values],
+    ColumnType.TIMESTAMP: _memoized(parse_timestream_datetime),
+}
+
+
+class TimestreamColumns:
+    """
+    The rows of a query decoded column by column into typed lists.
+
+    Unpacking it gives its columns, in order; ``rows`` zips them back into typed rows.
+    """
+
+    def __init__(self, columns: List[List[Any]], row_count: int):
+        self.columns = columns
+        self.row_count = row_count
+
+    def __len__(self) -> int:
+        return self.row_count
+
+    def __iter__(self) -> Iterator[List[Any]]:
+        return iter(self.columns)
+
+    def __getitem__(self, index: int) -> List[Any]:
+        return self.columns[index]
+
+    def rows(self) -> Iterator[Tuple[Any, ...]]:
+        return zip(*self.columns)
+
+
+def decode_columns(rows: Sequence[Sequence[str]], column_types: Sequence[ColumnType]) -> TimestreamColumns:
+    if any(len(row) != len(column_types) for row in rows):
+        raise ValueError(f'Expected rows of {len(column_types)} columns')
+    if len(rows) == 0:
+        return TimestreamColumns([[] for _ in column_types], 0)
+    return TimestreamColumns(
+        [_COLUMN_DECODERS[column_type](values) for column_type, values in zip(column_types, zip(*rows))],
+        len(rows)
+    )
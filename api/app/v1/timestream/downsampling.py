@@ -0,0 +1,124 @@
+from collections.abc import Callable, Sequence
+from datetime import datetime
+from typing import List, Optional, TypeVar
+
+
+T = TypeVar('T')
+
+
+def _lttb_indices(xs: Sequence[float], ys: Sequence[float], max_points: int) -> List[int]:
+    # Largest-Triangle-Three-Buckets: the first and last points are kept, the others are split in
+    # max_points - 2 buckets, and each bucket keeps the point forming the largest triangle with the
+    # point kept in the previous bucket and the average of the next bucket
+    count = len(xs)
+    if count <= max_points:
+        return list(range(count))
+    if max_points < 3:
+        return [0, count - 1][:max_points]
+
+    bucket_size = (count - 2) / (max_points - 2)
+    kept = [0]
+    previous = 0
+    for bucket in range(max_points - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        next_end = min(int((bucket + 2) * bucket_size) + 1, count)
+        next_xs = xs[end:next_end] or xs[count - 1:]
+        next_ys = ys[end:next_end] or ys[count - 1:]
+        average_x = sum(next_xs) / len(next_xs)
+        average_y = sum(next_ys) / len(next_ys)
+
+        previous_x, previous_y = xs[previous], ys[previous]
+        dx, dy = average_x - previous_x, average_y - previous_y
+        # Twice the triangle's area, which is enough to compare them
+        previous = max(
+            range(start, end),
+            key=lambda i: abs(dx * (ys[i] - previous_y) - (xs[i] - previous_x) * dy)
+        )
+        kept.append(previous)
+    kept.append(count - 1)
+    return kept
+
+
+def _sample_buckets(points: Sequence[T], max_points: int, y: Callable[[T], Optional[float]]) -> List[T]:
+    # Splits the points in buckets of consecutive points, each keeping its point furthest from its
+    # average, surrounded by its first and last gap markers if they come before and after it, so
+    # that every gap still lies between markers. Consecutive markers collapse into one, and the
+    # markers at the ends, which do not stop any line, are dropped.
+    size = -(-len(points) // max(max_points // 3, 1))
+    kept: List[T] = []
+    for start in range(0, len(points), size):
+        bucket = points[start:start + size]
+        markers = [index for index, point in enumerate(bucket) if y(point) is None]
+        values = {index: float(value) for index, point in enumerate(bucket) if (value := y(point)) is not None}
+        sampled: List[int] = []
+        if len(values) > 0:
+            average = sum(values.values()) / len(values)
+            value_index = max(values, key=lambda index: abs(values[index] - average))
+            sampled.extend(marker for marker in markers[:1] if marker < value_index)
+            sampled.append(value_index)
+            sampled.extend(marker for marker in markers[-1:] if marker > value_index)
+        else:
+            sampled.extend(markers[:1])
+        for index in sampled:
+            if y(bucket[index]) is not None or (len(kept) > 0 and y(kept[-1]) is not None):
+                kept.append(bucket[index])
+    while len(kept) > 0 and y(kept[-1]) is None:
+        kept.pop()
+    return kept[:max_points]
+
+
+def lttb(
+    points: Sequence[T],
+    max_points: int,
+    x: Callable[[T], datetime],
+    y: Callable[[T], Optional[float]]
+) -> List[T]:
+    """
+    Downsamples ``points``, sorted by ``x``, to at most ``max_points`` while preserving the shape
+    of the curve they draw, using the Largest-Triangle-Three-Buckets algorithm.
+
+    Points whose ``y`` is ``None`` are gap markers: they are kept, and the runs of points between
+    them are downsampled separately, each keeping its ends and a share of the rest of
+    ``max_points`` proportional to its length, so that a line is never drawn across a gap.
+
+    When ``max_points`` cannot fit the markers and the ends of every run, the series is sampled
+    with one point per bucket of consecutive points instead, and the runs of points falling
+    between gaps may be dropped.
+    """
+    if len(points) <= max_points:
+        return list(points)
+
+    runs: List[List[int]] = [[]]
+    gaps: List[int] = []
+    for index, point in enumerate(points):
+        if y(point) is None:
+            gaps.append(index)
+            runs.append([])
+        else:
+            runs[-1].append(index)
+    runs = [run for run in runs if len(run) > 0]
+    run_ends = sum(min(len(run), 2) for run in runs)
+    if len(gaps) + run_ends > max_points:
+        return _sample_buckets(points, max_points, y)
+
+    budget = max_points - len(gaps) - run_ends
+    run_points = sum(len(run) for run in runs)
+    kept = list(gaps)
+    for run in runs:
+        run_budget = min(len(run), 2) + budget * len(run) // run_points
+        xs = [x(points[index]).timestamp() for index in run]
+        ys = [float(y(points[index]) or 0.0) for index in run]
+        kept.extend(run[index] for index in _lttb_indices(xs, ys, run_budget))
+    return [points[index] for index in sorted(kept)]
+
+
+def buckets(items: Sequence[T], max_buckets: int) -> List[Sequence[T]]:
+    """
+    Splits ``items`` into at most ``max_buckets`` runs of consecutive items of the same size,
+    but for the last one, e.g. to merge bins that add up such as energy usages.
+    """
+    if len(items) <= max_buckets:
+        return [items[index:index + 1] for index in range(len(items))]
+    size = -(-len(items) // max_buckets)
+    return [items[start:start + size] for start in range(0, len(items), size)]
@@ -0,0 +1,111 @@
+import base64
+import json
+import re
+import zlib
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from typing import Final, List, Optional, Tuple
+
+from app.px.pxmetrics import PxMetrics, metrics as default_metrics
+from app.v1.cache.cache import Cache
+
+
+_KEY_PREFIX: Final = 'timestream::result::'
+_IN_LIST = re.compile(r"\bIN\s*\(\s*('[^']*'(?:\s*,\s*'[^']*')*)\s*\)", re.IGNORECASE)
+_LITERAL = re.compile(r"'[^']*'")
+
+
+def compress_rows(rows: List[List[str]]) -> Tuple[str, int]:
+    """Returns ``rows`` as base64-encoded zlib-compressed JSON, along with the JSON's size."""
+    serialized = json.dumps(rows, separators=(',', ':')).encode()
+    return base64.b64encode(zlib.compress(serialized)).decode(), len(serialized)
+
+
+def decompress_rows(compressed: str) -> Tuple[List[List[str]], int]:
+    """Reverses ``compress_rows``."""
+    serialized = zlib.decompress(base64.b64decode(compressed))
+    return json.loads(serialized), len(serialized)
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalises a query so that equivalent ones compare equal: whitespace is collapsed and the
+    literals of ``IN (...)`` lists are sorted, since callers often build those lists from sets.
+    Literals are otherwise left alone as they are case sensitive.
+    """
+    collapsed = ' '.join(query.split())
+    return _IN_LIST.sub(
+        lambda match: 'IN (' + ', '.join(sorted(set(_LITERAL.findall(match.group(1))))) + ')',
+        collapsed
+    )
+
+
+class TimestreamQueryResultCache:
+    """
+    Caches the rows of Timestream queries in a ``Cache``, based on the end of the time window
+    they read.
+
+    A window that ended more than ``settle_delay`` ago is closed: its data will not change any more
+    so the result is kept for ``closed_ttl_seconds``. A window ending later than that still
+    receives measurements and its result is only kept for ``open_ttl_seconds``. Queries without a
+    known window end, e.g. those relative to ``now()``, are not cached.
+
+    Gateways buffer readings while offline and upload them once reconnected, so the settle delay
+    is hours rather than minutes. A shorter delay caches more queries for long, but a reading that
+    arrives after its window closed stays missing from the cached result until it expires.
+
+    Rows are stored as zlib-compressed JSON; results larger than ``max_compressed_bytes`` once
+    compressed are not stored.
+    """
+
+    def __init__(
+        self,
+        cache: Cache,
+        settle_delay: timedelta = timedelta(hours=6),
+        closed_ttl_seconds: int = int(timedelta(days=7).total_seconds()),
+        open_ttl_seconds: int = 60,
+        max_compressed_bytes: int = 1024 * 1024,
+        clock: Callable[[], datetime] = lambda: datetime.now(tz=timezone.utc),
+        metrics: PxMetrics = default_metrics,
+    ):
+        self._cache = cache
+        self._settle_delay = settle_delay
+        self._closed_ttl_seconds = closed_ttl_seconds
+        self._open_ttl_seconds = open_ttl_seconds
+        self._max_compressed_bytes = max_compressed_bytes
+        self._clock = clock
+        self._metrics = metrics
+
+    def _is_closed(self, window_end: datetime) -> bool:
+        if window_end.tzinfo is None:
+            window_end = window_end.replace(tzinfo=timezone.utc)
+        return window_end <= self._clock() - self._settle_delay
+
+    def get_or_query(
+        self,
+        fingerprint: str,
+        window_end: Optional[datetime],
+        run_query: Callable[[], List[List[str]]]
+    ) -> List[List[str]]:
+        if window_end is None:
+            return run_query()
+
+        key = _KEY_PREFIX + fingerprint
+        is_closed = self._is_closed(window_end)
+        window = 'closed' if is_closed else 'open'
+        cached = self._cache.get(key)
+        if cached is not None:
+            rows, size = decompress_rows(cached)
+            self._metrics.increment(f'timestream.result_cache.{window}.hit')
+            self._metrics.increment('timestream.result_cache.bytes_saved', size)
+            return rows
+
+        self._metrics.increment(f'timestream.result_cache.{window}.miss')
+        rows = run_query()
+        compressed, size = compress_rows(rows)
+        if len(compressed) <= self._max_compressed_bytes:
+            self._cache.set(key, compressed, self._closed_ttl_seconds if is_closed else self._open_ttl_seconds)
+            self._metrics.increment('timestream.result_cache.compressed_bytes_saved', size - len(compressed))
+        else:
+            self._metrics.increment('timestream.result_cache.too_large')
+        return rows
@@ -0,0 +1,163 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Final, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+
+# All of them divide a day, so that planned bins never straddle the segments of the segment cache
+BIN_SIZES: Final[Tuple[timedelta, ...]] = (
+    timedelta(minutes=1),
+    timedelta(minutes=5),
+    timedelta(minutes=10),
+    timedelta(minutes=15),
+    timedelta(minutes=30),
+    timedelta(hours=1),
+    timedelta(hours=2),
+    timedelta(hours=3),
+    timedelta(hours=6),
+    timedelta(hours=12),
+    timedelta(days=1),
+)
+
+
+EPOCH: Final[datetime] = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def _minutes(value: timedelta) -> int:
+    return round(value.total_seconds() / 60.0)
+
+
+def _shifted_bin(column: str, size: timedelta, offset: timedelta) -> str:
+    if offset == timedelta(0):
+        return f'BIN({column}, {_minutes(size)}m)'
+    offset_minutes = _minutes(offset)
+    return f'BIN({column} + {offset_minutes}m, {_minutes(size)}m) - {offset_minutes}m'
+
+
+def _timestamp(value: datetime) -> str:
+    return f"from_iso8601_timestamp('{value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}')"
+
+
+@dataclass(frozen=True)
+class OffsetChange:
+    """
+    A change of the local UTC offset, e.g. for daylight saving time. The bin containing it runs
+    from ``bin_start``, on the previous offset, to ``bin_end``, on the new ``offset``.
+    """
+    bin_start: datetime
+    bin_end: datetime
+    offset: timedelta
+
+
+@dataclass(frozen=True)
+class BinPlan:
+    """
+    Bins of ``size`` shifted by ``offset`` from the epoch, so that they start on the local
+    boundaries of a location, e.g. at its midnight for daily bins. After each of ``changes``, bins
+    are shifted by its offset instead.
+    """
+    size: timedelta
+    offset: timedelta = timedelta(0)
+    changes: Tuple[OffsetChange, ...] = ()
+
+    @property
+    def aligned_to_epoch(self) -> bool:
+        """Whether the bins are the plain Timestream bins, as kept by the segment cache."""
+        return self.offset == timedelta(0) and len(self.changes) == 0
+
+    def bin(self, column: str = 'time') -> str:
+        """The Timestream expression binning ``column`` into the planned bins."""
+        if len(self.changes) == 0:
+            return _shifted_bin(column, self.size, self.offset)
+        cases = []
+        offset = self.offset
+        for change in self.changes:
+            cases.append(f'WHEN {column} < {_timestamp(change.bin_start)} THEN {_shifted_bin(column, self.size, offset)}')
+            cases.append(f'WHEN {column} < {_timestamp(change.bin_end)} THEN {_timestamp(change.bin_start)}')
+            offset = change.offset
+        return f'CASE {" ".join(cases)} ELSE {_shifted_bin(column, self.size, offset)} END'
+
+
+class TimestreamResolutionPlanner:
+    """
+    Picks the bin size of aggregations from the length of their window, so that each series has
+    at most ``max_points_per_series`` points and long windows are read at a coarser, cheaper,
+    resolution.
+    """
+
+    def __init__(self, max_points_per_series: int = 1500):
+        self.max_points_per_series = max_points_per_series
+
+    def plan(
+        self,
+        start_datetime: datetime,
+        end_datetime: datetime,
+        min_bin_size: timedelta = timedelta(minutes=10),
+        max_bin_size: timedelta = timedelta(hours=2),
+        location_timezone: Optional[str] = None
+    ) -> BinPlan:
+        """
+        Returns the finest bins of at least ``min_bin_size`` fitting the point budget, up to
+        ``max_bin_size``. The default maximum stays below the 4 hours from which charts show a
+        gap between two readings.
+
+        With ``location_timezone``, bins are aligned to the location's local time, also across
+        the changes of its UTC offset within the window.
+        """
+        window = end_datetime - start_datetime
+        candidates = [size for size in BIN_SIZES if min_bin_size <= size <= max_bin_size]
+        size = next(
+            (size for size in candidates if window / size <= self.max_points_per_series),
+            candidates[-1] if len(candidates) > 0 else min_bin_size
+        )
+        if location_timezone is None:
+            return BinPlan(size)
+        tz = ZoneInfo(location_timezone)
+        # Timestream bins are aligned to the epoch, i.e. to UTC midnight
+        start_offset = _utc_offset(start_datetime, tz) % size
+        offset = start_offset
+        changes = []
+        for change_datetime in _utc_offset_changes(start_datetime, end_datetime, tz):
+            new_offset = _utc_offset(change_datetime, tz) % size
+            if new_offset == offset:
+                continue
+            changes.append(OffsetChange(
+                bin_start=change_datetime - (change_datetime - EPOCH + offset) % size,
+                bin_end=change_datetime + (EPOCH - change_datetime - new_offset) % size,
+                offset=new_offset
+            ))
+            offset = new_offset
+        return BinPlan(size, start_offset, tuple(changes))
+
+    def fixed(
+        self,
+        bin_size: timedelta,
+        start_datetime: datetime,
+        end_datetime: datetime,
+        location_timezone: Optional[str] = None
+    ) -> BinPlan:
+        """Plans bins of exactly ``bin_size``, aligned as by ``plan``."""
+        return self.plan(start_datetime, end_datetime, bin_size, bin_size, location_timezone)
+
+
+def _utc_offset(value: datetime, tz: ZoneInfo) -> timedelta:
+    return value.astimezone(tz).utcoffset() or timedelta(0)
+
+
+def _utc_offset_changes(start_datetime: datetime, end_datetime: datetime, tz: ZoneInfo) -> List[datetime]:
+    """The first instants on a new UTC offset in the window, assuming at most one change a day."""
+    changes = []
+    before = start_datetime
+    while before < end_datetime:
+        after = min(before + timedelta(days=1), end_datetime)
+        if _utc_offset(after, tz) != _utc_offset(before, tz):
+            low, high = before, after
+            while high - low > timedelta(seconds=1):
+                middle = low + (high - low) / 2
+                if _utc_offset(middle, tz) == _utc_offset(before, tz):
+                    low = middle
+                else:
+                    high = middle
+            changes.append(high.replace(microsecond=0))
+        before = after
+    return changes
@@ -0,0 +1,183 @@
+import hashlib
+from collections import defaultdict
+from collections.abc import Callable, Sequence
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Final, List, Set, Tuple
+
+from app.px.pxmetrics import PxMetrics, metrics as default_metrics
+from app.v1.cache.cache import Cache
+from app.v1.timestream.query_result_cache import compress_rows, decompress_rows, normalize_query
+from app.v1.timestream.timestream_client import TimestreamClient
+from app.v1.timestream.utils import parse_timestream_datetime
+
+
+_KEY_PREFIX: Final = 'timestream::segment::'
+_EPOCH: Final = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_SERIES_PLACEHOLDER: Final = '__series__'
+_TIME_CONDITION_PLACEHOLDER: Final = '__time_condition__'
+
+BuildQuery = Callable[[Sequence[str], str], str]
+TimeRange = Tuple[datetime, datetime]
+
+
+def _time_condition(ranges: Sequence[TimeRange]) -> str:
+    return '(' + ' OR '.join(f"time BETWEEN '{start}' AND '{end}'" for start, end in ranges) + ')'
+
+
+def _merge_adjacent(ranges: Sequence[TimeRange]) -> List[TimeRange]:
+    merged: List[TimeRange] = []
+    for start, end in sorted(ranges):
+        if merged and start - merged[-1][1] <= timedelta(microseconds=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+class TimestreamSegmentCache:
+    """
+    Serves ``BIN(time, ...)`` aggregations over long windows, e.g. "the last 7 days", mostly from
+    cached segments so that refreshing a chart only re-aggregates its trailing, still open, bins.
+
+    The window is split at ``segment_size`` boundaries, aligned to the epoch like Timestream's
+    bins. Segments that lie entirely within the window and ended more than ``settle_delay`` ago
+    are closed and cached per series for ``ttl_seconds``, or ``empty_ttl_seconds`` when a series
+    has no rows in a segment, as its readings may still be on their way from an offline gateway.
+    The partial segments at either end and
+    the segments still receiving measurements are queried every time, together with the closed
+    segments missing from the cache, in a single query. As bins never straddle segments, the
+    stitched rows are the same as those of a single query over the whole window.
+    """
+
+    def __init__(
+        self,
+        cache: Cache,
+        segment_size: timedelta = timedelta(days=1),
+        settle_delay: timedelta = timedelta(hours=6),
+        ttl_seconds: int = int(timedelta(days=8).total_seconds()),
+        empty_ttl_seconds: int = int(timedelta(hours=1).total_seconds()),
+        clock: Callable[[], datetime] = lambda: datetime.now(tz=timezone.utc),
+        metrics: PxMetrics = default_metrics,
+    ):
+        self._cache = cache
+        self._segment_size = segment_size
+        self._settle_delay = settle_delay
+        self._ttl_seconds = ttl_seconds
+        self._empty_ttl_seconds = empty_ttl_seconds
+        self._clock = clock
+        self._metrics = metrics
+
+    def _floor(self, value: datetime) -> datetime:
+        return value - (value - _EPOCH) % self._segment_size
+
+    def _ceil(self, value: datetime) -> datetime:
+        floored = self._floor(value)
+        return floored if floored == value else floored + self._segment_size
+
+    def _key(self, template: str, series: str, segment_start: datetime) -> str:
+        return f'{_KEY_PREFIX}{template}::{series}::{segment_start.isoformat()}'
+
+    def query(
+        self,
+        client: TimestreamClient,
+        build_query: BuildQuery,
+        series: Sequence[str],
+        start_datetime: datetime,
+        end_datetime: datetime,
+        bin_size: timedelta,
+        row_series: Callable[[List[str]], str],
+        sort_key: Callable[[List[str]], Tuple[str, ...]],
+        bin_column: int = 1
+    ) -> List[List[str]]:
+        """
+        Returns the rows of ``build_query(series, time_condition)`` for the inclusive window
+        ``[start_datetime, end_datetime]``, sorted by ``sort_key``.
+
+        ``build_query`` must filter its rows with the given time condition and aggregate them
+        by ``BIN(time, bin_size)``, the bin being in ``bin_column``. ``row_series`` tells which
+        of ``series`` a row belongs to.
+        """
+        def _query_whole_window() -> List[List[str]]:
+            return client.query(
+                build_query(series, _time_condition([(start_datetime, end_datetime)])),
+                window_end=end_datetime
+            )
+
+        if (
+            len(series) == 0
+            or start_datetime.tzinfo is None
+            or end_datetime.tzinfo is None
+            or self._segment_size % bin_size != timedelta(0)
+        ):
+            return _query_whole_window()
+
+        first_closed = self._ceil(start_datetime)
+        end_of_closed = self._floor(min(end_datetime + timedelta(microseconds=1), self._clock() - self._settle_delay))
+        if end_of_closed <= first_closed:
+            return _query_whole_window()
+
+        segments: List[datetime] = []
+        segment_start = first_closed
+        while segment_start < end_of_closed:
+            segments.append(segment_start)
+            segment_start += self._segment_size
+
+        template = hashlib.sha256(
+            normalize_query(build_query([_SERIES_PLACEHOLDER], _TIME_CONDITION_PLACEHOLDER)).encode()
+        ).hexdigest()
+        keys = [(series_name, segment) for series_name in series for segment in segments]
+        cached: Dict[Tuple[str, datetime], List[List[str]]] = {}
+        for key, compressed in zip(keys, self._cache.mget([self._key(template, *key) for key in keys])):
+            if compressed is not None:
+                cached[key] = decompress_rows(compressed)[0]
+        self._metrics.increment('timestream.segment_cache.hit', len(cached))
+        self._metrics.increment('timestream.segment_cache.miss', len(keys) - len(cached))
+        # A segment missing for any of the series is queried for all of them
+        missing_segments: Set[datetime] = {segment for series_name, segment in keys if (series_name, segment) not in cached}
+        cached_rows = [
+            row
+            for (_, segment), segment_rows in cached.items()
+            if segment not in missing_segments
+            for row in segment_rows
+        ]
+
+        ranges: List[TimeRange] = [
+            (segment, segment + self._segment_size - timedelta(microseconds=1))
+            for segment in missing_segments
+        ]
+        if start_datetime < first_closed:
+            ranges.append((start_datetime, first_closed - timedelta(microseconds=1)))
+        if end_of_closed <= end_datetime:
+            ranges.append((end_of_closed, end_datetime))
+        if len(ranges) == 0:
+            return sorted(cached_rows, key=sort_key)
+
+        rows = client.query(build_query(series, _time_condition(_merge_adjacent(ranges))), window_end=end_datetime)
+
+        fetched_segments: Dict[Tuple[str, datetime], List[List[str]]] = defaultdict(list)
+        live_rows: List[List[str]] = []
+        for row in rows:
+            segment = self._floor(parse_timestream_datetime(row[bin_column]))
+            if segment in missing_segments:
+                fetched_segments[(row_series(row), segment)].append(row)
+            else:
+                live_rows.append(row)
+        # Series without data in a segment are cached too, but not for long, so that they are not
+        # queried on every refresh
+        segment_keys = {
+            self._key(template, series_name, segment): fetched_segments.get((series_name, segment), [])
+            for series_name in series
+            for segment in missing_segments
+        }
+        self._cache.mset(
+            {key: compress_rows(segment_rows)[0] for key, segment_rows in segment_keys.items()},
+            {
+                key: self._ttl_seconds if len(segment_rows) > 0 else self._empty_ttl_seconds
+                for key, segment_rows in segment_keys.items()
+            }
+        )
+
+        return sorted(
+            cached_rows + [row for segment_rows in fetched_segments.values() for row in segment_rows] + live_rows,
+            key=sort_key
+        )
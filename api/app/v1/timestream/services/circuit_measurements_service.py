@@ -1,63 +1,88 @@
 from datetime import datetime, timedelta
-from typing import List
+from typing import Iterator, List, Optional, Sequence, Tuple
 from uuid import UUID
 
 
+from app.v1.electricity_monitoring.schemas.circuit_energy_rollup import CircuitHourlyEnergyRollup
+from app.v1.timestream.columns import ColumnType
+from app.v1.timestream.resolution_planner import TimestreamResolutionPlanner
 from app.v1.timestream.schemas.circuit_energy_usage import CircuitEnergyUsage
 from app.v1.timestream.schemas.circuit_measurement import CircuitAggregatedMeasurement
 from app.v1.timestream.schemas.energy_usage import EnergyUsage
 from app.v1.timestream.schemas.grouped_circuit_energy_usage_mesaure import GroupedCircuitEnergyUsageMeasure
 from app.v1.timestream.schemas.phase_power import PhasePower
 from app.v1.timestream.timestream_client import TimestreamClient
-from app.v1.timestream.utils import parse_timestream_datetime
 from app.v1.electricity_dashboards.schemas.energy_load_curve_electric_widget import EnergyLoadCurveElectricWidgetGroupByUnit
 
 
 class TimestreamElectricityCircuitMeasurementsService:
 
-    def __init__(self, database: str, table: str, client: TimestreamClient):
+    def __init__(
+        self,
+        database: str,
+        table: str,
+        client: TimestreamClient,
+        resolution_planner: Optional[TimestreamResolutionPlanner] = None
+    ):
         self.database = database
         self.table = table
         self.client = client
+        self.resolution_planner = resolution_planner or TimestreamResolutionPlanner()
     
     def get_aggregated_measurements_for_circuits(
         self,
         circuit_ids: List[UUID],
         start_datetime: datetime,
         end_datetime: datetime,
-        aggregation_interval: timedelta = timedelta(minutes=10)
+        aggregation_interval: Optional[timedelta] = None,
+        location_timezone: Optional[str] = None
     ) -> List[CircuitAggregatedMeasurement]:
+        """Without ``aggregation_interval``, it is planned from the length of the window."""
         if len(circuit_ids) == 0:
             return []
-        if aggregation_interval.total_seconds() < 60:
+        if aggregation_interval is not None and aggregation_interval.total_seconds() < 60:
             raise ValueError('aggregation_interval must be at least 1 minute')
-        
-        bin_minutes = round(aggregation_interval.total_seconds() / 60.0)
+
+        if aggregation_interval is None:
+            # Usage is not drawn as a line with gaps, so bins may grow up to a day
+            plan = self.resolution_planner.plan(
+                start_datetime,
+                end_datetime,
+                max_bin_size=timedelta(days=1),
+                location_timezone=location_timezone
+            )
+        else:
+            plan = self.resolution_planner.fixed(aggregation_interval, start_datetime, end_datetime, location_timezone)
 
         query = f"""
             SELECT
                 measure_name,
-                BIN(time, {bin_minutes}m),
+                {plan.bin()},
                 SUM(ABS(watt)) AS sum_watt,
                 SUM(ABS(watt) * period_s / 3600 / 1000 * money_per_kwh * 100) AS sum_cost_cents
             FROM "{self.database}"."{self.table}"
             WHERE measure_name in ({",".join(f"'{circuit_id!s}'" for circuit_id in circuit_ids)})
             AND time BETWEEN '{start_datetime}'
                          AND '{end_datetime}'
-            GROUP BY measure_name, BIN(time, {bin_minutes}m)
-            ORDER BY measure_name, BIN(time, {bin_minutes}m)
+            GROUP BY measure_name, {plan.bin()}
+            ORDER BY measure_name, {plan.bin()}
         """
-        timestream_data = self.client.query(query)
+        timestream_data = self.client.query_columns(
+            query,
+            [ColumnType.UUID, ColumnType.TIMESTAMP, ColumnType.DOUBLE, ColumnType.DOUBLE],
+            window_end=end_datetime
+        )
 
+        # The columns are already decoded, so the models are built without validating them again
         return [
-            CircuitAggregatedMeasurement(
-                circuit_id=UUID(row[0]),
-                measurement_datetime=parse_timestream_datetime(row[1]),
-                aggregation_interval=aggregation_interval,
-                sum_watts=float(row[2]),
-                sum_cost_cents=round(float(row[3]))
+            CircuitAggregatedMeasurement.model_construct(
+                circuit_id=circuit_id,
+                measurement_datetime=measurement_datetime,
+                aggregation_interval=plan.size,
+                sum_watts=sum_watts,
+                sum_cost_cents=round(sum_cost_cents)
             )
-            for row in timestream_data
+            for circuit_id, measurement_datetime, sum_watts, sum_cost_cents in timestream_data.rows()
         ]
     
     def get_energy_table_circuits_energy(
@@ -77,7 +102,7 @@ class TimestreamElectricityCircuitMeasurementsService:
                         AND '{end_datetime}'
             GROUP BY measure_name
         """
-        timestream_data = self.client.query(query)
+        timestream_data = self.client.query(query, window_end=end_datetime)
         measures = [
             CircuitEnergyUsage(
                 circuit_id=UUID(row[0]),
@@ -90,6 +115,49 @@ class TimestreamElectricityCircuitMeasurementsService:
         ]
         return measures
     
+    def get_total_energy_for_windows(
+        self,
+        circuit_ids: List[UUID],
+        windows: Sequence[Tuple[datetime, datetime]]
+    ) -> List[EnergyUsage]:
+        """
+        Returns the energy used by all of ``circuit_ids`` together within each ``(start, end)``
+        window, inclusive, in one query. Windows must not overlap.
+        """
+        if len(windows) == 0:
+            return []
+        sorted_windows = sorted(windows)
+        if any(previous[1] >= current[0] for previous, current in zip(sorted_windows, sorted_windows[1:])):
+            raise ValueError('windows must not overlap')
+        if len(circuit_ids) == 0:
+            return [EnergyUsage(kwh=0.0, money=0.0) for _ in windows]
+
+        window_conditions = [f"time BETWEEN '{start}' AND '{end}'" for start, end in windows]
+        window_cases = " ".join(f"WHEN {condition} THEN {index}" for index, condition in enumerate(window_conditions))
+        query = f"""
+            SELECT
+                window_index,
+                SUM( ABS(watt) ) / 3600 / 1000 AS kwh,
+                SUM( ABS(watt) * money_per_kwh ) / 3600 / 1000 AS money
+            FROM (
+                SELECT
+                    CASE {window_cases} END AS window_index,
+                    watt,
+                    money_per_kwh
+                FROM "{self.database}"."{self.table}"
+                WHERE measure_name in ({",".join(f"'{circuit_id!s}'" for circuit_id in circuit_ids)})
+                AND time BETWEEN '{sorted_windows[0][0]}'
+                            AND '{sorted_windows[-1][1]}'
+                AND ({" OR ".join(window_conditions)})
+            )
+            GROUP BY window_index
+        """
+        timestream_data = self.client.query(query, window_end=sorted_windows[-1][1])
+        usages = [EnergyUsage(kwh=0.0, money=0.0) for _ in windows]
+        for row in timestream_data:
+            usages[int(row[0])] = EnergyUsage(kwh=float(row[1]), money=float(row[2]))
+        return usages
+
     def get_grouped_circuits_energy(
         self,
         circuit_ids: List[UUID],
@@ -115,22 +183,77 @@ class TimestreamElectricityCircuitMeasurementsService:
             GROUP BY measure_name, BIN(local_time, {binning})
             ORDER BY BIN(local_time, {binning})
         """
-        timestream_data = self.client.query(query)
+        timestream_data = self.client.query_columns(
+            query,
+            [ColumnType.UUID, ColumnType.TIMESTAMP, ColumnType.DOUBLE, ColumnType.DOUBLE],
+            window_end=end_datetime
+        )
+        # The columns are already decoded, so the models are built without validating them again
         measures = [
-            GroupedCircuitEnergyUsageMeasure(
-                start=parse_timestream_datetime(row[1]),
-                usage=CircuitEnergyUsage(
-                    circuit_id=UUID(row[0]),
-                    usage=EnergyUsage(
-                        kwh=float(row[2]),
-                        money=float(row[3])
+            GroupedCircuitEnergyUsageMeasure.model_construct(
+                start=start,
+                usage=CircuitEnergyUsage.model_construct(
+                    circuit_id=circuit_id,
+                    usage=EnergyUsage.model_construct(
+                        kwh=kwh,
+                        money=money
                     )
                 )
             )
-            for row in timestream_data
+            for circuit_id, start, kwh, money in timestream_data.rows()
         ]
         return measures
     
+    def get_hourly_circuits_energy_rollups(
+        self,
+        circuit_ids: List[UUID],
+        start_datetime: datetime,
+        end_datetime: datetime
+    ) -> List[CircuitHourlyEnergyRollup]:
+        return [
+            rollup
+            for rollups in self.iter_hourly_circuits_energy_rollups(circuit_ids, start_datetime, end_datetime)
+            for rollup in rollups
+        ]
+
+    def iter_hourly_circuits_energy_rollups(
+        self,
+        circuit_ids: List[UUID],
+        start_datetime: datetime,
+        end_datetime: datetime
+    ) -> Iterator[List[CircuitHourlyEnergyRollup]]:
+        """Yields the hourly rollups of the circuits one Timestream result page at a time."""
+        if len(circuit_ids) == 0:
+            return
+        query = f"""
+            SELECT
+                measure_name,
+                BIN(local_time, 1h) AS local_hour_start,
+                BIN(local_time, 1h) + (MIN(time) - MIN(local_time)) AS hour_start,
+                SUM( ABS(watt) ) / 3600 / 1000 AS kwh,
+                SUM( ABS(watt) * money_per_kwh ) / 3600 / 1000 AS money
+            FROM "{self.database}"."{self.table}"
+            WHERE measure_name in ({",".join(f"'{circuit_id!s}'" for circuit_id in circuit_ids)})
+            AND time BETWEEN '{start_datetime}'
+                        AND '{end_datetime}'
+            GROUP BY measure_name, BIN(local_time, 1h)
+        """
+        # Read once by the rollup job, so streamed rather than kept in the result cache
+        for timestream_data in self.client.iter_query_columns(
+            query,
+            [ColumnType.UUID, ColumnType.TIMESTAMP, ColumnType.TIMESTAMP, ColumnType.DOUBLE, ColumnType.DOUBLE]
+        ):
+            yield [
+                CircuitHourlyEnergyRollup(
+                    circuit_id=circuit_id,
+                    local_hour_start=local_hour_start.replace(tzinfo=None),
+                    hour_start=hour_start,
+                    kwh=kwh,
+                    money=money
+                )
+                for circuit_id, local_hour_start, hour_start, kwh, money in timestream_data.rows()
+            ]
+
     def get_phase_power(
         self,
         sensor_duids: List[str],
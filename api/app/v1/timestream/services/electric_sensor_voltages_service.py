@@ -37,3 +37,37 @@ class TimestreamElectricSensorVoltagesService:
             for row in timestream_data
         ]
         return rows
+
+    def get_latest_pes_voltages_for_electric_sensors(
+        self,
+        sensor_duids: List[str]
+    ) -> List[ElectricSensorVoltages]:
+        """
+        Like ``get_pes_voltages_for_electric_sensors`` but aggregated in the query, so there is
+        one row per sensor with its latest voltages from the last hour.
+        """
+        if len(sensor_duids) == 0:
+            return []
+        sensor_duids_str = ",".join(f"'{sensor_duid}'" for sensor_duid in sensor_duids)
+        query = f"""
+            SELECT
+                measure_name,
+                MAX_BY(volt_A, time) AS volt_A,
+                MAX_BY(volt_B, time) AS volt_B,
+                MAX_BY(volt_C, time) AS volt_C
+            FROM "{self.database}"."{self.table}"
+            WHERE measure_name in ({sensor_duids_str})
+                AND time > ago(1h)
+            GROUP BY measure_name
+        """
+        timestream_data = self.client.query(query)
+        rows = [
+            ElectricSensorVoltages(
+                sensor_duid=row[0],
+                volt_A=float(row[1]),
+                volt_B=float(row[2]),
+                volt_C=float(row[3])
+            )
+            for row in timestream_data
+        ]
+        return rows
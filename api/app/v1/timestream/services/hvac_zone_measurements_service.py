@@ -1,57 +1,77 @@
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, Optional, Sequence
 from uuid import UUID
 
+from app.v1.timestream.columns import ColumnType, decode_columns
+from app.v1.timestream.resolution_planner import TimestreamResolutionPlanner
 from app.v1.timestream.schemas.control_zone_measurement import ControlZoneAggregatedMeasurement
 from app.v1.timestream.schemas.control_zone_trends import ControlZoneTemperatureReading, ControlZoneTrendReading
+from app.v1.timestream.segment_cache import TimestreamSegmentCache
 from app.v1.timestream.timestream_client import TimestreamClient
-from app.v1.timestream.utils import parse_timestream_datetime
 
 
 class TimestreamHvacZoneMeasurementsService:
 
-    def __init__(self, database: str, table: str, client: TimestreamClient):
+    def __init__(
+        self,
+        database: str,
+        table: str,
+        client: TimestreamClient,
+        segment_cache: Optional[TimestreamSegmentCache] = None,
+        resolution_planner: Optional[TimestreamResolutionPlanner] = None
+    ):
         self.database = database
         self.table = table
         self.client = client
+        self.segment_cache = segment_cache
+        self.resolution_planner = resolution_planner or TimestreamResolutionPlanner()
     
     def get_aggregated_control_zone_measurements(
         self,
         hvac_widget_ids: List[UUID],
         start_datetime: datetime,
         end_datetime: datetime,
-        aggregation_interval: timedelta = timedelta(minutes=10)
+        aggregation_interval: Optional[timedelta] = None,
+        location_timezone: Optional[str] = None
     ) -> List[ControlZoneAggregatedMeasurement]:
+        """Without ``aggregation_interval``, it is planned from the length of the window."""
         if len(hvac_widget_ids) == 0:
             return []
-        if aggregation_interval.total_seconds() < 60:
+        if aggregation_interval is not None and aggregation_interval.total_seconds() < 60:
             raise ValueError('aggregation_interval must be at least 1 minute')
-        
-        bin_minutes = round(aggregation_interval.total_seconds() / 60.0)
+
+        if aggregation_interval is None:
+            plan = self.resolution_planner.plan(start_datetime, end_datetime, location_timezone=location_timezone)
+        else:
+            plan = self.resolution_planner.fixed(aggregation_interval, start_datetime, end_datetime, location_timezone)
 
         query = f"""
             SELECT
                 measure_name,
-                BIN(time, {bin_minutes}m),
+                {plan.bin()},
                 AVG(CAST(reading AS double))
             FROM "{self.database}"."{self.table}"
             WHERE measure_name in ({",".join(f"'{hvac_widget_id!s}'" for hvac_widget_id in hvac_widget_ids)})
             AND telemetry = 'room-temperatureC'
             AND time BETWEEN '{start_datetime}'
                         AND '{end_datetime}'
-            GROUP BY measure_name, BIN(time, {bin_minutes}m)
-            ORDER BY measure_name, BIN(time, {bin_minutes}m)
+            GROUP BY measure_name, {plan.bin()}
+            ORDER BY measure_name, {plan.bin()}
         """
-        timestream_data = self.client.query(query)
+        timestream_data = self.client.query_columns(
+            query,
+            [ColumnType.UUID, ColumnType.TIMESTAMP, ColumnType.DOUBLE],
+            window_end=end_datetime
+        )
 
         return [
             ControlZoneAggregatedMeasurement(
-                hvac_widget_id=UUID(row[0]),
-                measurement_datetime=parse_timestream_datetime(row[1]),
-                aggregation_interval=aggregation_interval,
-                average_temperature_c=row[2]
+                hvac_widget_id=hvac_widget_id,
+                measurement_datetime=measurement_datetime,
+                aggregation_interval=plan.size,
+                average_temperature_c=average_temperature_c
             )
-            for row in timestream_data
+            for hvac_widget_id, measurement_datetime, average_temperature_c in timestream_data.rows()
         ]
 
     
@@ -59,29 +79,53 @@ class TimestreamHvacZoneMeasurementsService:
         self,
         hvac_widget_ids: List[UUID],
         start_datetime: datetime,
-        end_datetime: datetime
+        end_datetime: datetime,
+        location_timezone: Optional[str] = None
     ) -> List[ControlZoneTrendReading]:
-        query = f"""
-        SELECT
-            measure_name,
-            BIN(time, 10m),
-            AVG(CAST(reading AS double))
-        FROM "{self.database}"."{self.table}"
-        WHERE measure_name in ({",".join(f"'{hvac_widget_id!s}'" for hvac_widget_id in hvac_widget_ids)})
-          AND telemetry = 'room-temperatureC'
-          AND time BETWEEN '{start_datetime}'
-                       AND '{end_datetime}'
-        GROUP BY measure_name, BIN(time, 10m)
-        ORDER BY measure_name, BIN(time, 10m)
-        """
-        timestream_data = self.client.query(query)
+        plan = self.resolution_planner.plan(start_datetime, end_datetime, location_timezone=location_timezone)
+
+        def _build_query(measure_names: Sequence[str], time_condition: str) -> str:
+            return f"""
+            SELECT
+                measure_name,
+                {plan.bin()},
+                AVG(CAST(reading AS double))
+            FROM "{self.database}"."{self.table}"
+            WHERE measure_name in ({",".join(f"'{measure_name}'" for measure_name in measure_names)})
+              AND telemetry = 'room-temperatureC'
+              AND {time_condition}
+            GROUP BY measure_name, {plan.bin()}
+            ORDER BY measure_name, {plan.bin()}
+            """
+
+        measure_names = [str(hvac_widget_id) for hvac_widget_id in hvac_widget_ids]
+        # Bins shifted to local time straddle the segments, which are aligned to the epoch
+        if self.segment_cache is not None and plan.aligned_to_epoch:
+            timestream_data = self.segment_cache.query(
+                self.client,
+                _build_query,
+                series=measure_names,
+                start_datetime=start_datetime,
+                end_datetime=end_datetime,
+                bin_size=plan.size,
+                row_series=lambda row: row[0],
+                sort_key=lambda row: (row[0], row[1])
+            )
+        else:
+            timestream_data = self.client.query(
+                _build_query(measure_names, f"time BETWEEN '{start_datetime}' AND '{end_datetime}'"),
+                window_end=end_datetime
+            )
         measures = [
             ControlZoneTrendReading(
-                zone=UUID(row[0]),
-                measure_datetime=parse_timestream_datetime(row[1]),
-                temperature_c=float(row[2])
+                zone=zone,
+                measure_datetime=measure_datetime,
+                temperature_c=temperature_c
             )
-            for row in timestream_data
+            for zone, measure_datetime, temperature_c in decode_columns(
+                timestream_data,
+                [ColumnType.UUID, ColumnType.TIMESTAMP, ColumnType.DOUBLE]
+            ).rows()
         ]
         return measures
     
@@ -89,33 +133,55 @@ class TimestreamHvacZoneMeasurementsService:
         self,
         hvac_widget_id: UUID,
         start_datetime: datetime,
-        end_datetime: datetime
+        end_datetime: datetime,
+        location_timezone: Optional[str] = None
     ) -> List[ControlZoneTemperatureReading]:
-        query = f"""
-            SELECT
-                telemetry,
-                BIN(time, 10m),
-                AVG(CAST(reading AS DOUBLE)) as reading
-            FROM "{self.database}"."{self.table}"
-            WHERE measure_name = '{hvac_widget_id!s}'
-            AND telemetry in (
-                'room-temperatureC',
-                'thermostat-setpointC',
-                'auto-heating-setpointC',
-                'auto-cooling-setpointC'
+        plan = self.resolution_planner.plan(start_datetime, end_datetime, location_timezone=location_timezone)
+
+        def _build_query(measure_names: Sequence[str], time_condition: str) -> str:
+            return f"""
+                SELECT
+                    telemetry,
+                    {plan.bin()},
+                    AVG(CAST(reading AS DOUBLE)) as reading
+                FROM "{self.database}"."{self.table}"
+                WHERE measure_name = '{measure_names[0]}'
+                AND telemetry in (
+                    'room-temperatureC',
+                    'thermostat-setpointC',
+                    'auto-heating-setpointC',
+                    'auto-cooling-setpointC'
+                )
+                AND {time_condition}
+                GROUP BY telemetry, {plan.bin()}
+                ORDER BY telemetry, {plan.bin()}
+            """
+
+        if self.segment_cache is not None and plan.aligned_to_epoch:
+            timestream_data = self.segment_cache.query(
+                self.client,
+                _build_query,
+                series=[str(hvac_widget_id)],
+                start_datetime=start_datetime,
+                end_datetime=end_datetime,
+                bin_size=plan.size,
+                row_series=lambda _: str(hvac_widget_id),
+                sort_key=lambda row: (row[0], row[1])
+            )
+        else:
+            timestream_data = self.client.query(
+                _build_query([str(hvac_widget_id)], f"time BETWEEN '{start_datetime}' AND '{end_datetime}'"),
+                window_end=end_datetime
             )
-            AND time BETWEEN '{start_datetime}'
-                        AND '{end_datetime}'
-            GROUP BY telemetry, BIN(time, 10m)
-            ORDER BY telemetry, BIN(time, 10m)
-        """
-        timestream_data = self.client.query(query)
         readings = [
             ControlZoneTemperatureReading(
-                telemetry=row[0],
-                measure_datetime=parse_timestream_datetime(row[1]),
-                reading=float(row[2])
+                telemetry=telemetry,
+                measure_datetime=measure_datetime,
+                reading=reading
             )
-            for row in timestream_data
+            for telemetry, measure_datetime, reading in decode_columns(
+                timestream_data,
+                [ColumnType.VARCHAR, ColumnType.TIMESTAMP, ColumnType.DOUBLE]
+            ).rows()
         ]
         return readings
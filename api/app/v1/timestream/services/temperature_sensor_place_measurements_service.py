@@ -1,59 +1,96 @@
 import logging
 
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, Optional, Sequence
 from uuid import UUID
 
+from app.v1.timestream.columns import ColumnType, decode_columns
+from app.v1.timestream.resolution_planner import TimestreamResolutionPlanner
 from app.v1.timestream.schemas.temperature_sensor_place_measurement import TemperatureSensorPlaceAggregatedMeasurement
+from app.v1.timestream.segment_cache import TimestreamSegmentCache
 from app.v1.timestream.timestream_client import TimestreamClient
-from app.v1.timestream.utils import parse_timestream_datetime
 
 
 class TimestreamTemperatureSensorPlaceMeasurementsService:
 
-    def __init__(self, database: str, table: str, client: TimestreamClient):
+    def __init__(
+        self,
+        database: str,
+        table: str,
+        client: TimestreamClient,
+        segment_cache: Optional[TimestreamSegmentCache] = None,
+        resolution_planner: Optional[TimestreamResolutionPlanner] = None
+    ):
         self.database = database
         self.table = table
         self.client = client
+        self.segment_cache = segment_cache
+        self.resolution_planner = resolution_planner or TimestreamResolutionPlanner()
 
     def get_aggregated_measurements_for_temperature_sensor_places(
         self,
         temperature_sensor_place_ids: List[UUID],
         start_datetime: datetime,
         end_datetime: datetime,
-        aggregation_interval: timedelta = timedelta(minutes=10)
+        aggregation_interval: Optional[timedelta] = None,
+        location_timezone: Optional[str] = None
     ) -> List[TemperatureSensorPlaceAggregatedMeasurement]:
+        """Without ``aggregation_interval``, it is planned from the length of the window."""
         if len(temperature_sensor_place_ids) == 0:
             return []
-        if aggregation_interval.total_seconds() < 60:
+        if aggregation_interval is not None and aggregation_interval.total_seconds() < 60:
             raise ValueError('aggregation_interval must be at least 1 minute')
-        
-        bin_minutes = round(aggregation_interval.total_seconds() / 60.0)
-
-        query = f"""
-            SELECT
-                measure_name,
-                BIN(time, {bin_minutes}m),
-                AVG(temperature_c),
-                AVG(relative_humidity)
-            FROM "{self.database}"."{self.table}"
-            WHERE measure_name in ({",".join([f"'{place_id!s}'" for place_id in temperature_sensor_place_ids])})
-            AND time BETWEEN '{start_datetime}'
-                         AND '{end_datetime}'
-            GROUP BY measure_name, BIN(time, {bin_minutes}m)
-            ORDER BY measure_name, BIN(time, {bin_minutes}m)
-        """
-        logging.info(f"Querying Timestream with query: {query}")
-
-        timestream_data = self.client.query(query)
+
+        if aggregation_interval is None:
+            plan = self.resolution_planner.plan(start_datetime, end_datetime, location_timezone=location_timezone)
+        else:
+            plan = self.resolution_planner.fixed(aggregation_interval, start_datetime, end_datetime, location_timezone)
+
+        def _build_query(measure_names: Sequence[str], time_condition: str) -> str:
+            query = f"""
+                SELECT
+                    measure_name,
+                    {plan.bin()},
+                    AVG(temperature_c),
+                    AVG(relative_humidity)
+                FROM "{self.database}"."{self.table}"
+                WHERE measure_name in ({",".join([f"'{measure_name}'" for measure_name in measure_names])})
+                AND {time_condition}
+                GROUP BY measure_name, {plan.bin()}
+                ORDER BY measure_name, {plan.bin()}
+            """
+            logging.info(f"Querying Timestream with query: {query}")
+            return query
+
+        measure_names = [str(place_id) for place_id in temperature_sensor_place_ids]
+        # Bins shifted to local time straddle the segments, which are aligned to the epoch
+        if self.segment_cache is not None and plan.aligned_to_epoch:
+            timestream_data = self.segment_cache.query(
+                self.client,
+                _build_query,
+                series=measure_names,
+                start_datetime=start_datetime,
+                end_datetime=end_datetime,
+                bin_size=plan.size,
+                row_series=lambda row: row[0],
+                sort_key=lambda row: (row[0], row[1])
+            )
+        else:
+            timestream_data = self.client.query(
+                _build_query(measure_names, f"time BETWEEN '{start_datetime}' AND '{end_datetime}'"),
+                window_end=end_datetime
+            )
 
         return [
             TemperatureSensorPlaceAggregatedMeasurement(
-                temperature_sensor_place_id=UUID(row[0]),
-                measurement_datetime=parse_timestream_datetime(row[1]),
-                aggregation_interval=aggregation_interval,
-                average_temperature_c=row[2],
-                average_relative_humidity=row[3]
+                temperature_sensor_place_id=temperature_sensor_place_id,
+                measurement_datetime=measurement_datetime,
+                aggregation_interval=plan.size,
+                average_temperature_c=average_temperature_c,
+                average_relative_humidity=average_relative_humidity
             )
-            for row in timestream_data
+            for temperature_sensor_place_id, measurement_datetime, average_temperature_c, average_relative_humidity in decode_columns(
+                timestream_data,
+                [ColumnType.UUID, ColumnType.TIMESTAMP, ColumnType.DOUBLE, ColumnType.DOUBLE]
+            ).rows()
         ]
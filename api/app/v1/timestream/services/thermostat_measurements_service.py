@@ -2,9 +2,9 @@ from datetime import datetime, timedelta
 from typing import List
 from uuid import UUID
 
+from app.v1.timestream.columns import ColumnType
 from app.v1.timestream.schemas.thermostat_measurement import ThermostatAggregatedMeasurement
 from app.v1.timestream.timestream_client import TimestreamClient
-from app.v1.timestream.utils import parse_timestream_datetime
 
 
 class TimestreamThermostatMeasurementsService:
@@ -39,14 +39,18 @@ class TimestreamThermostatMeasurementsService:
             GROUP BY thermostat, BIN(time, {bin_minutes}m)
             ORDER BY thermostat, BIN(time, {bin_minutes}m)
         """
-        timestream_data = self.client.query(query)
+        timestream_data = self.client.query_columns(
+            query,
+            [ColumnType.UUID, ColumnType.TIMESTAMP, ColumnType.DOUBLE],
+            window_end=end_datetime
+        )
         
         return [
             ThermostatAggregatedMeasurement(
-                thermostat_duid=UUID(row[0]),
-                measure_datetime=parse_timestream_datetime(row[1]),
+                thermostat_duid=thermostat_duid,
+                measure_datetime=measure_datetime,
                 aggregation_interval=aggregation_interval,
-                average_temperature_c=float(row[2])
+                average_temperature_c=average_temperature_c
             )
-            for row in timestream_data
+            for thermostat_duid, measure_datetime, average_temperature_c in timestream_data.rows()
         ]
@@ -1,28 +1,255 @@
-from typing import List
+import hashlib
+import threading
+from collections import deque
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, wait
+from datetime import datetime
+from types import TracebackType
+from typing import Deque, Dict, List, Optional, Tuple, Type, TypeVar
 
 from mypy_boto3_timestream_query import TimestreamQueryClient
+from mypy_boto3_timestream_query.type_defs import QueryResponsePaginatorTypeDef
+
+from app.px.pxmetrics import metrics
+from app.v1.cache.single_flight_cache import SingleFlightCache
+from app.v1.timestream.columns import ColumnType, TimestreamColumns, decode_columns
+from app.v1.timestream.query_result_cache import TimestreamQueryResultCache, normalize_query
+
+
+T = TypeVar('T')
+
+
+class TimestreamQueryFanOut:
+    """
+    Runs the independent queries of a request concurrently on a shared executor, with at most
+    ``max_concurrency`` of them running at once. Used as a context manager, which waits for every
+    submitted call on exit:
+
+        with timestream_client.fan_out() as fan_out:
+            frequency = fan_out.submit(lambda: pes_averages_service.get_phase_frequency(duid))
+            power = fan_out.submit(lambda: circuit_measurements_service.get_phase_power(duids, pins))
+        frequency.result(), power.result()
+
+    Calls not started yet are cancelled if the block raises.
+    """
+
+    def __init__(self, executor: Executor, max_concurrency: int):
+        self._executor = executor
+        self._max_concurrency = max(1, max_concurrency)
+        self._lock = threading.Lock()
+        self._pending: Deque[Tuple[Callable[[], object], Future]] = deque()
+        self._running = 0
+        self._futures: List[Future] = []
+
+    def submit(self, call: Callable[[], T]) -> 'Future[T]':
+        future: Future[T] = Future()
+        with self._lock:
+            self._pending.append((call, future))
+            self._futures.append(future)
+        metrics.increment('timestream.fan_out')
+        self._start_pending()
+        return future
+
+    def _start_pending(self) -> None:
+        to_start: List[Tuple[Callable[[], object], Future]] = []
+        with self._lock:
+            while self._pending and self._running < self._max_concurrency:
+                to_start.append(self._pending.popleft())
+                self._running += 1
+        for call, future in to_start:
+            self._executor.submit(self._run, call, future)
+
+    def _run(self, call: Callable[[], object], future: Future) -> None:
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(call())
+                except BaseException as error:
+                    future.set_exception(error)
+        finally:
+            with self._lock:
+                self._running -= 1
+            self._start_pending()
+
+    def __enter__(self) -> 'TimestreamQueryFanOut':
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType]
+    ) -> None:
+        if exc_type is not None:
+            for future in self._futures:
+                future.cancel()
+        wait(self._futures)
 
 
 class TimestreamClient:
+    """
+    Thin wrapper around the boto3 ``timestream-query`` client.
+
+    A single instance is shared by the whole process (see ``get_timestream_client``) so that the
+    underlying HTTPS connection pool, resolved credentials and endpoint-discovery cache are reused
+    across requests; boto3 clients are safe to share between threads. The same goes for the
+    thread pool ``fan_out`` runs queries on, which should not have more workers than the boto3
+    client has connections.
+
+    Identical queries issued concurrently, e.g. by several users looking at the same dashboard,
+    share a single execution and its result. With a ``shared_cache`` this also holds across
+    workers: the result is kept in it for ``shared_cache_ttl_seconds`` and other workers wait for
+    it rather than run the query too. Results may be shared, so callers must not modify them.
 
-    def __init__(self, query_client: TimestreamQueryClient):
+    Callers that know the end of the time window a query reads pass it as ``window_end``, which
+    lets ``result_cache`` keep the results of windows in the past (see
+    ``TimestreamQueryResultCache``).
+    """
+
+    def __init__(
+        self,
+        query_client: TimestreamQueryClient,
+        max_workers: int = 16,
+        max_concurrency_per_fan_out: int = 4,
+        shared_cache: Optional[SingleFlightCache] = None,
+        shared_cache_ttl_seconds: int = 5,
+        result_cache: Optional[TimestreamQueryResultCache] = None
+    ):
         self.query_client = query_client
-    
-    def query(self, query: str) -> List[List[str]]:
+        self.max_concurrency_per_fan_out = max_concurrency_per_fan_out
+        self.shared_cache = shared_cache
+        self.shared_cache_ttl_seconds = shared_cache_ttl_seconds
+        self.result_cache = result_cache
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='timestream')
+        self._in_flight_lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+
+    def fan_out(self, max_concurrency: Optional[int] = None) -> TimestreamQueryFanOut:
+        return TimestreamQueryFanOut(self._executor, max_concurrency or self.max_concurrency_per_fan_out)
+
+    def query(self, query: str, window_end: Optional[datetime] = None) -> List[List[str]]:
+        fingerprint = _fingerprint(query)
+        with self._in_flight_lock:
+            future: Optional[Future[List[List[str]]]] = self._in_flight.get(fingerprint)
+            is_leader = future is None
+            if future is None:
+                future = self._in_flight[fingerprint] = Future()
+        if not is_leader:
+            metrics.increment('timestream.query.coalesced')
+            return future.result()
+
+        try:
+            data = self._execute(fingerprint, query, window_end)
+            future.set_result(data)
+            return data
+        except BaseException as error:
+            future.set_exception(error)
+            raise
+        finally:
+            with self._in_flight_lock:
+                del self._in_flight[fingerprint]
+
+    def query_columns(
+        self,
+        query: str,
+        column_types: Sequence[ColumnType],
+        window_end: Optional[datetime] = None
+    ) -> TimestreamColumns:
+        """
+        Like ``query``, with the result decoded column by column into typed lists, ``column_types``
+        being the types of the columns the query selects.
+        """
+        return decode_columns(self.query(query, window_end=window_end), column_types)
+
+    def _execute(self, fingerprint: str, query: str, window_end: Optional[datetime]) -> List[List[str]]:
+        def _timed_query() -> List[List[str]]:
+            with metrics.timer('timestream.query'):
+                return self._query(query)
+
+        def _shared_query() -> List[List[str]]:
+            if self.shared_cache is None:
+                return _timed_query()
+            return self.shared_cache.get_or_compute(
+                key=f'timestream::query::{fingerprint}',
+                compute=_timed_query,
+                ttl_seconds=self.shared_cache_ttl_seconds
+            )
+
+        if self.result_cache is None:
+            return _shared_query()
+        return self.result_cache.get_or_query(fingerprint, window_end, _shared_query)
+
+    def _query(self, query: str) -> List[List[str]]:
         paginator = self.query_client.get_paginator('query')
         try:
             # TODO: Double check that this logic is correct
             data: List[List[str]] = []
             for page in paginator.paginate(QueryString=query):
-                data.extend([
-                    [
-                        column['ScalarValue']
-                        for column in row['Data']
-                    ]
-                    for row in page['Rows']
-                ])
+                data.extend(_rows_of_page(page))
             return data
         except Exception as error:
-            if 'At least two points are required in the timeseries' in str(error):
+            if _is_no_data_error(error):
                 return []
             raise
+
+    def iter_query(self, query: str, prefetch: bool = True) -> Iterator[List[List[str]]]:
+        """
+        Yields the rows of ``query`` page by page, as Timestream returns them, so that large
+        results can be processed with bounded memory. With ``prefetch``, the next page is fetched
+        on the client's thread pool while the caller processes the current one.
+
+        Pages are not coalesced nor cached like the results of ``query``.
+        """
+        pages = iter(self.query_client.get_paginator('query').paginate(QueryString=query))
+
+        def _next_page() -> Optional[List[List[str]]]:
+            with metrics.timer('timestream.query.page'):
+                try:
+                    page = next(pages, None)
+                except Exception as error:
+                    if _is_no_data_error(error):
+                        return None
+                    raise
+            return None if page is None else _rows_of_page(page)
+
+        if not prefetch:
+            while (rows := _next_page()) is not None:
+                yield rows
+            return
+
+        next_rows = self._executor.submit(_next_page)
+        try:
+            while (rows := next_rows.result()) is not None:
+                next_rows = self._executor.submit(_next_page)
+                yield rows
+        finally:
+            # When the caller stops early, the page being prefetched, if any, is dropped
+            next_rows.cancel()
+
+    def iter_query_columns(
+        self,
+        query: str,
+        column_types: Sequence[ColumnType],
+        prefetch: bool = True
+    ) -> Iterator[TimestreamColumns]:
+        """Like ``iter_query``, with each page decoded as by ``query_columns``."""
+        for rows in self.iter_query(query, prefetch=prefetch):
+            yield decode_columns(rows, column_types)
+
+
+def _rows_of_page(page: QueryResponsePaginatorTypeDef) -> List[List[str]]:
+    return [
+        [
+            column['ScalarValue']
+            for column in row['Data']
+        ]
+        for row in page['Rows']
+    ]
+
+
+def _is_no_data_error(error: Exception) -> bool:
+    return 'At least two points are required in the timeseries' in str(error)
+
+
+def _fingerprint(query: str) -> str:
+    return hashlib.sha256(normalize_query(query).encode()).hexdigest()
@@ -1,23 +1,137 @@
 
-from datetime import datetime, timedelta
+from collections.abc import Callable, Hashable, Iterable, Iterator, Sequence
+from datetime import datetime, timedelta, tzinfo
 from dateutil.relativedelta import relativedelta
-from typing import List, Tuple
+from itertools import count, pairwise
+from typing import Dict, List, Optional, Tuple, TypeVar
+
+
+T = TypeVar('T')
+K = TypeVar('K', bound=Hashable)
+P = TypeVar('P')
+
+GAP_THRESHOLD = timedelta(hours=4)
 
 
 def parse_timestream_datetime(timestream_datetime: str) -> datetime:
     return datetime.fromisoformat(f"{timestream_datetime[:-3]}+00:00")
 
 
-def generate_intervals(period_start: datetime, period_end: datetime, step: relativedelta) -> List[Tuple[datetime, datetime]]:
-    intervals = []
-    i = 1
-    current_interval = (period_start, period_start + step - timedelta(microseconds=1))
-    while current_interval[1] < period_end:
-        intervals.append(current_interval)
-        current_interval = (
-            period_start + step * i,
-            period_start + step * (i + 1) - timedelta(microseconds=1)
+def _fixed_step(step: relativedelta) -> Optional[timedelta]:
+    # Steps of months or years, or setting absolute fields, vary in length
+    if step.years or step.months or step.leapdays or step.weekday is not None or any(
+        field is not None
+        for field in (step.year, step.month, step.day, step.hour, step.minute, step.second, step.microsecond)
+    ):
+        return None
+    return timedelta(days=step.days, hours=step.hours, minutes=step.minutes, seconds=step.seconds, microseconds=step.microseconds)
+
+
+def _interval_starts(period_start: datetime, step: relativedelta, tz: Optional[tzinfo]) -> Iterator[datetime]:
+    fixed_step = _fixed_step(step)
+    if fixed_step is not None and (tz is None or fixed_step < timedelta(days=1)):
+        start = period_start
+        while True:
+            yield start
+            start += fixed_step
+    elif tz is None:
+        for index in count():
+            yield period_start + step * index
+    else:
+        # Days, months and years follow the location's wall clock, e.g. a day lasts 23 hours when DST starts
+        local_start = period_start.astimezone(tz).replace(tzinfo=None)
+        for index in count():
+            yield (local_start + step * index).replace(tzinfo=tz).astimezone(period_start.tzinfo)
+
+
+def generate_intervals(
+    period_start: datetime,
+    period_end: datetime,
+    step: relativedelta,
+    tz: Optional[tzinfo] = None
+) -> Iterator[Tuple[datetime, datetime]]:
+    """
+    Lazily yields the inclusive ``(start, end)`` intervals of ``step`` from ``period_start``,
+    the last one ending at ``period_end``.
+
+    Steps of a fixed length are simply added up. With ``tz``, steps of a day or more are taken on
+    its local time, so that intervals keep starting at local midnight across DST changes.
+    """
+    starts = _interval_starts(period_start, step, tz)
+    start = next(starts)
+    for next_start in starts:
+        end = next_start - timedelta(microseconds=1)
+        if end >= period_end:
+            break
+        yield start, end
+        start = next_start
+    yield start, period_end
+
+
+def group_series(readings: Iterable[T], key: Callable[[T], K], timestamp: Callable[[T], datetime]) -> Dict[K, List[T]]:
+    """
+    Groups ``readings`` by ``key``, in order of first appearance, each series sorted by
+    ``timestamp``. Unlike ``itertools.groupby``, the readings need not be sorted by series.
+    """
+    series: Dict[K, List[T]] = {}
+    for reading in readings:
+        series_key = key(reading)
+        if series_key in series:
+            series[series_key].append(reading)
+        else:
+            series[series_key] = [reading]
+    for series_readings in series.values():
+        # Series usually come sorted from Timestream, for which sorting is linear
+        series_readings.sort(key=timestamp)
+    return series
+
+
+def mark_gaps(
+    timestamps: Sequence[datetime],
+    values: Sequence[Optional[float]],
+    point: Callable[[datetime, Optional[float]], P],
+    gap_threshold: timedelta = GAP_THRESHOLD
+) -> List[P]:
+    """
+    Builds the points of a sorted series, with a pair of ``None`` points, one second after and
+    before its neighbours, wherever consecutive readings are more than ``gap_threshold`` apart, so
+    that charts do not draw a line across the gap.
+    """
+    points = list(map(point, timestamps, values))
+    gaps = [
+        index
+        for index, (previous, current) in enumerate(pairwise(timestamps))
+        if current - previous > gap_threshold
+    ]
+    if len(gaps) == 0:
+        return points
+
+    marked: List[P] = []
+    start = 0
+    for index in gaps:
+        marked.extend(points[start:index + 1])
+        marked.append(point(timestamps[index] + timedelta(seconds=1), None))
+        marked.append(point(timestamps[index + 1] - timedelta(seconds=1), None))
+        start = index + 1
+    marked.extend(points[start:])
+    return marked
+
+
+def series_with_gaps(
+    readings: Iterable[T],
+    key: Callable[[T], K],
+    timestamp: Callable[[T], datetime],
+    value: Callable[[T], Optional[float]],
+    point: Callable[[datetime, Optional[float]], P],
+    gap_threshold: timedelta = GAP_THRESHOLD
+) -> Dict[K, List[P]]:
+    """Groups ``readings`` as by ``group_series`` and marks the gaps of each series as by ``mark_gaps``."""
+    return {
+        series_key: mark_gaps(
+            [timestamp(reading) for reading in series_readings],
+            [value(reading) for reading in series_readings],
+            point,
+            gap_threshold
         )
-        i += 1
-    intervals.append((current_interval[0], period_end))
-    return intervals
+        for series_key, series_readings in group_series(readings, key, timestamp).items()
+    }
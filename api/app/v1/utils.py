@@ -1,4 +1,6 @@
-from datetime import datetime, timezone
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Tuple
+from zoneinfo import ZoneInfo
 from passlib.context import CryptContext
 
 context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
@@ -13,3 +15,10 @@ def convert_to_utc(dt: datetime) -> datetime:
     if dt.tzinfo is None:
         return dt.replace(tzinfo=timezone.utc)
     return dt.astimezone(timezone.utc)
+
+
+def local_day_window(day: date, tz: ZoneInfo) -> Tuple[datetime, datetime]:
+    """The inclusive UTC bounds of ``day`` in ``tz``, which may last 23 or 25 hours around DST changes."""
+    start = datetime.combine(day, time.min, tz)
+    end = datetime.combine(day + timedelta(days=1), time.min, tz) - timedelta(microseconds=1)
+    return start.astimezone(timezone.utc), end.astimezone(timezone.utc)
@@ -1,18 +1,20 @@
 from uuid import UUID
 from datetime import datetime
 from math import sqrt
-from itertools import chain, groupby
-from typing import Dict, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Path, status
+from itertools import chain
+from typing import Dict, List, Optional, Sequence
+from zoneinfo import ZoneInfo
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
 from pydantic import Field
 
 from app.v1.auth.helpers.user_access_grants_helper import UserAccessGrantsHelper
-from app.v1.dependencies import get_access_token_data, get_electricity_dashboards_service, get_energy_consumption_breakdown_electric_widgets_service, get_energy_load_curve_electric_widgets_service, get_locations_service, get_circuits_service, get_clamps_service, get_electric_panels_service, get_electric_sensors_service, get_panel_system_health_electric_widgets_service, get_timestream_electric_sensor_voltages_service, get_timestream_electricity_circuit_measurements_service, get_timestream_pes_averages_service, get_user_access_grants_helper
+from app.v1.dependencies import get_access_token_data, get_circuit_energy_service, get_electricity_dashboards_service, get_energy_consumption_breakdown_electric_widgets_service, get_energy_load_curve_electric_widgets_service, get_locations_service, get_circuits_service, get_clamps_service, get_electric_panels_service, get_electric_sensors_service, get_panel_system_health_electric_widgets_service, get_timestream_client, get_timestream_electric_sensor_voltages_service, get_timestream_electricity_circuit_measurements_service, get_timestream_pes_averages_service, get_user_access_grants_helper
 from app.v1.electricity_dashboards.services.electricity_dashboards_service import ElectricityDashboardsService
 from app.v1.electricity_monitoring.schemas.circuit import CircuitTypeEnum
 from app.v1.electricity_monitoring.schemas.clamp import Clamp, ClampPhaseEnum
 from app.v1.electricity_monitoring.schemas.electric_panel import ElectricPanel
 from app.v1.electricity_monitoring.schemas.electric_sensor import ElectricSensor
+from app.v1.electricity_monitoring.services.circuit_energy import CircuitEnergyService
 from app.v1.electricity_monitoring.services.circuits import CircuitsService
 from app.v1.electricity_monitoring.services.clamps import ClampsService
 from app.v1.electricity_monitoring.services.electric_panels import ElectricPanelsService
@@ -20,12 +22,13 @@ from app.v1.electricity_monitoring.services.electric_sensors import ElectricSens
 from app.v1.locations.schemas.location import Location
 from app.v1.locations.services.locations import LocationsService
 from app.v1.schemas import AccessTokenData
+from app.v1.timestream.downsampling import buckets
 from app.v1.timestream.schemas.circuit_energy_usage import CircuitEnergyUsage
-from app.v1.timestream.schemas.energy_usage import EnergyUsage
 from app.v1.timestream.schemas.grouped_circuit_energy_usage_mesaure import GroupedCircuitEnergyUsageMeasure
 from app.v1.timestream.services.circuit_measurements_service import TimestreamElectricityCircuitMeasurementsService
 from app.v1.timestream.services.electric_sensor_voltages_service import TimestreamElectricSensorVoltagesService
 from app.v1.timestream.services.pes_averages_service import TimestreamPesAveragesService
+from app.v1.timestream.timestream_client import TimestreamClient
 from app.v1.timestream.utils import generate_intervals
 from app.v1.utils import convert_to_utc
 from app.v1.electricity_dashboards.schemas.electricity_dashboard import ElectricityDashboard
@@ -35,6 +38,7 @@ from app.v1.electricity_dashboards.schemas.energy_load_curve_electric_widget imp
 from app.v1.electricity_dashboards.services.energy_load_curve_electric_widgets_service import EnergyLoadCurveElectricWidgetsService
 from app.v1.electricity_dashboards.schemas.panel_system_health_electric_widget import GetPanelSystemHealthElectricWidgetDataResponse, GetPanelSystemHealthElectricWidgetDataResponseData, GetPanelSystemHealthElectricWidgetResponse, GetPanelSystemHealthElectricWidgetResponseData, PanelSystemHealthElectricWidget, PanelSystemHealthElectricWidgetElectricPanel, PanelSystemHealthElectricWidgetPhase
 from app.v1.electricity_dashboards.services.panel_system_health_electric_widgets_service import PanelSystemHealthElectricWidgetsService
+from app.v1.electricity_dashboards.energy_pivot import CircuitEnergyPivot
 from app.v1.electricity_dashboards.utils import pin_number_from_port
 
 
@@ -152,7 +156,7 @@ def get_energy_consumption_breakdown_electric_widget_data(
     period_end: datetime,
     widget: EnergyConsumptionBreakdownElectricWidget = Depends(_get_energy_consumption_breakdown_widget),
     circuits_service: CircuitsService = Depends(get_circuits_service),
-    timestream_electric_circuit_measurements_service: TimestreamElectricityCircuitMeasurementsService = Depends(get_timestream_electricity_circuit_measurements_service),
+    circuit_energy_service: CircuitEnergyService = Depends(get_circuit_energy_service),
     electricity_dashboards_service: ElectricityDashboardsService = Depends(get_electricity_dashboards_service)
 ):
     period_start = convert_to_utc(period_start)
@@ -169,55 +173,30 @@ def get_energy_consumption_breakdown_electric_widget_data(
     mains_ids = [main.circuit_id for main in mains]
     branch_circuit_ids = [branch.circuit_id for branch in branch_circuits]
 
-    energy_usage_result: List[CircuitEnergyUsage] = timestream_electric_circuit_measurements_service.get_energy_table_circuits_energy(
+    energy_usage_result: List[CircuitEnergyUsage] = circuit_energy_service.get_energy_table_circuits_energy(
         circuit_ids=list(chain(mains_ids, branch_circuit_ids)),
         start_datetime=period_start,
         end_datetime=period_end
     )
 
-    total_mains = EnergyUsage(
-        kwh=0.0,
-        money=0.0    
-    )
-    total_of_devices = EnergyUsage(
-        kwh=0.0,
-        money=0.0    
-    )
-
-    breakdown_map: Dict[UUID, EnergyUsage] = {}
+    # The whole period is a single group
+    pivot = CircuitEnergyPivot([period_start], mains_ids, branch_circuit_ids)
     for circuit in energy_usage_result:
-        if circuit.circuit_id in mains_ids:
-            total_mains.kwh += circuit.usage.kwh
-            total_mains.money += circuit.usage.money
-        else:
-            total_of_devices.kwh += circuit.usage.kwh
-            total_of_devices.money += circuit.usage.money
-            breakdown_map[circuit.circuit_id] = EnergyUsage(
-                kwh=circuit.usage.kwh,
-                money=circuit.usage.money
-            )
-    
-    device_breakdowns: List[EnergyConsumptionDevice] = []
-    for branch_circuit in branch_circuits:
-        breakdown = breakdown_map.get(branch_circuit.circuit_id)
-        if breakdown is not None:
-            device_breakdown = EnergyConsumptionDevice(
-                id=branch_circuit.circuit_id,
-                name=branch_circuit.name,
-                kwh=breakdown.kwh,
-                cost=breakdown.money,
-                percentage_of_total=(breakdown.kwh / total_mains.kwh) if total_mains.kwh != 0.0 else 0.0
-            )
-        else:
-            device_breakdown = EnergyConsumptionDevice(
-                id=branch_circuit.circuit_id,
-                name=branch_circuit.name,
-                kwh=0.0,
-                cost=0.0,
-                percentage_of_total=0.0
-            )
-        device_breakdowns.append(device_breakdown)
-    
+        pivot.add(0, circuit)
+    total_mains = pivot.mains_usage()
+    total_of_devices = pivot.branches_usage()
+
+    device_breakdowns = [
+        EnergyConsumptionDevice(
+            id=branch_circuit.circuit_id,
+            name=branch_circuit.name,
+            kwh=breakdown.kwh,
+            cost=breakdown.money,
+            percentage_of_total=(breakdown.kwh / total_mains.kwh) if total_mains.kwh != 0.0 else 0.0
+        )
+        for branch_circuit, breakdown in zip(branch_circuits, pivot.branch_usages())
+    ]
+
     untracked_consumption = UntrackedConsumptionData(
         kwh=total_mains.kwh - total_of_devices.kwh,
         cost=total_mains.money - total_of_devices.money,
@@ -234,6 +213,20 @@ def get_energy_consumption_breakdown_electric_widget_data(
     )
 
 
+def _merge_load_curve_groups(groups: Sequence[EnergyLoadCurveGroup]) -> EnergyLoadCurveGroup:
+    # Energy adds up, so consecutive groups are merged into one instead of being sampled
+    circuits_kwh: Dict[UUID, float] = {}
+    for group in groups:
+        for group_data in group.data:
+            circuits_kwh[group_data.id] = circuits_kwh.get(group_data.id, 0.0) + group_data.kwh
+    return EnergyLoadCurveGroup(
+        start=groups[0].start,
+        mains_kwh=sum(group.mains_kwh for group in groups),
+        others_kwh=sum(group.others_kwh for group in groups),
+        data=[EnergyLoadCurveGroupData(id=circuit_id, kwh=kwh) for circuit_id, kwh in circuits_kwh.items()]
+    )
+
+
 @router.get('/energy-load-curve/{id}/data',
             dependencies=[Depends(_authorize_token_for_energy_load_curve_widget)],
             response_model=None)
@@ -242,10 +235,12 @@ def get_energy_load_curve_electric_widget_data(
     period_end: datetime,
     group_size: int,
     group_unit: EnergyLoadCurveElectricWidgetGroupByUnit,
+    max_points: Optional[int] = Query(default=None, ge=1),
     widget: EnergyLoadCurveElectricWidget = Depends(_get_energy_load_curve_widget),
     circuits_service: CircuitsService = Depends(get_circuits_service),
-    timestream_electric_circuit_measurements_service: TimestreamElectricityCircuitMeasurementsService = Depends(get_timestream_electricity_circuit_measurements_service),
-    electricity_dashboards_service: ElectricityDashboardsService = Depends(get_electricity_dashboards_service)
+    circuit_energy_service: CircuitEnergyService = Depends(get_circuit_energy_service),
+    electricity_dashboards_service: ElectricityDashboardsService = Depends(get_electricity_dashboards_service),
+    locations_service: LocationsService = Depends(get_locations_service)
 ):
     period_start = convert_to_utc(period_start)
     period_end = convert_to_utc(period_end)
@@ -261,7 +256,7 @@ def get_energy_load_curve_electric_widget_data(
     mains_ids = [main.circuit_id for main in mains]
     branch_circuit_ids = [branch.circuit_id for branch in branch_circuits]
 
-    results: List[GroupedCircuitEnergyUsageMeasure] = timestream_electric_circuit_measurements_service.get_grouped_circuits_energy(
+    results: List[GroupedCircuitEnergyUsageMeasure] = circuit_energy_service.get_grouped_circuits_energy(
         circuit_ids=list(chain(mains_ids, branch_circuit_ids)),
         start_datetime=period_start,
         end_datetime=period_end,
@@ -269,45 +264,52 @@ def get_energy_load_curve_electric_widget_data(
         group_by_size=group_size
     )
 
-    available_groups: Dict[datetime, List[CircuitEnergyUsage]] = {}
-    for (group_start, grouped_circuits) in groupby(results, key=lambda group: group.start):
-        available_groups[group_start] = [reading.usage for reading in grouped_circuits]
-
-    intervals = generate_intervals(period_start, period_end, step=group_unit.as_relativedelta(group_size))
-    grouped_results = {inverval[0]: available_groups.get(inverval[0], []) for inverval in intervals}
-
-    groups: List[EnergyLoadCurveGroup] = []
-    for group_start, circuits in grouped_results.items():
-        group_data: List[EnergyLoadCurveGroupData] = []
-        total_mains: float = 0.0
-        total_circuits: float = 0.0
-        for circuit in circuits:
-            if circuit.circuit_id in mains_ids:
-                total_mains += circuit.usage.kwh
-            else:
-                group_data.append(
-                    EnergyLoadCurveGroupData(
-                        id=circuit.circuit_id,
-                        kwh=circuit.usage.kwh
-                    )
-                )
-                total_circuits += circuit.usage.kwh
-        
-        groups.append(
-            EnergyLoadCurveGroup(
-                start=group_start,
-                mains_kwh=total_mains,
-                others_kwh=total_mains - total_circuits,
-                data=group_data
-            )
+    location = _get_location(electricity_dashboard.location_id, locations_service)
+    intervals = generate_intervals(
+        period_start,
+        period_end,
+        step=group_unit.as_relativedelta(group_size),
+        tz=ZoneInfo(location.timezone)
+    )
+
+    pivot = CircuitEnergyPivot([group_start for group_start, _ in intervals], mains_ids, branch_circuit_ids)
+
+    # Both the groups and the results are sorted by start, so they are merged in a single pass
+    results.sort(key=lambda group: group.start)
+    result_index = 0
+    for group, group_start in enumerate(pivot.group_starts):
+        while result_index < len(results) and results[result_index].start < group_start:
+            result_index += 1
+        while result_index < len(results) and results[result_index].start == group_start:
+            pivot.add(group, results[result_index].usage)
+            result_index += 1
+
+    groups = [
+        EnergyLoadCurveGroup(
+            start=group_start,
+            mains_kwh=mains_kwh,
+            others_kwh=mains_kwh - branches_kwh,
+            data=[
+                EnergyLoadCurveGroupData(id=circuit_id, kwh=kwh)
+                for circuit_id, kwh in pivot.group_branches_kwh(group)
+            ]
         )
-    
+        for group, (group_start, mains_kwh, branches_kwh) in enumerate(zip(pivot.group_starts, pivot.mains_kwh(), pivot.branches_kwh()))
+    ]
+
+    if max_points is not None and len(groups) > max_points:
+        merged_groups = buckets(groups, max_points)
+        group_size *= len(merged_groups[0])
+        groups = [_merge_load_curve_groups(bucket) for bucket in merged_groups]
+
     return GetEnergyLoadCurveElectricWidgetResponse(
         code='200',
         message='success',
         data=GetEnergyLoadCurveElectricWidgetResponseData(
             devices={branch_circuit.circuit_id: branch_circuit.name for branch_circuit in branch_circuits},
-            groups=groups
+            groups=groups,
+            group_size=group_size,
+            group_unit=group_unit
         )
     )
 
@@ -360,6 +362,7 @@ def get_panel_system_health_electric_widget_data(
     timestream_electric_circuit_measurements_service: TimestreamElectricityCircuitMeasurementsService = Depends(get_timestream_electricity_circuit_measurements_service),
     timestream_electric_sensor_voltages_service: TimestreamElectricSensorVoltagesService = Depends(get_timestream_electric_sensor_voltages_service),
     timestream_pes_averages_service: TimestreamPesAveragesService = Depends(get_timestream_pes_averages_service),
+    timestream_client: TimestreamClient = Depends(get_timestream_client),
     electricity_dashboards_service: ElectricityDashboardsService = Depends(get_electricity_dashboards_service)
 ):
     electricity_dashboard = _get_electricity_dashboard(
@@ -406,11 +409,26 @@ def get_panel_system_health_electric_widget_data(
     
     phases: List[ClampPhaseEnum] = sorted(phase_to_clamps_map.keys(), key=lambda phase: phase.value)
 
-    system_frequency = timestream_pes_averages_service.get_phase_frequency(sensor_duid=electric_sensors[0].duid)
-
     sensor_duids: List[str] = list({sensor.duid for sensor in electric_sensors})
+    clamp_pins: List[int] = list({
+        pin_number_from_port(clamp.port_name, clamp.port_pin)
+        for clamps in phase_to_clamps_map.values()
+        for clamp in clamps
+    })
 
-    sensor_phase_voltage_list = timestream_electric_sensor_voltages_service.get_pes_voltages_for_electric_sensors(sensor_duids=sensor_duids)
+    with timestream_client.fan_out() as fan_out:
+        system_frequency_future = fan_out.submit(
+            lambda: timestream_pes_averages_service.get_phase_frequency(sensor_duid=electric_sensors[0].duid)
+        )
+        sensor_phase_voltage_list_future = fan_out.submit(
+            lambda: timestream_electric_sensor_voltages_service.get_latest_pes_voltages_for_electric_sensors(sensor_duids=sensor_duids)
+        )
+        sensor_pin_power_list_future = fan_out.submit(
+            lambda: timestream_electric_circuit_measurements_service.get_phase_power(sensor_duids=sensor_duids, clamp_pins=clamp_pins)
+        )
+    system_frequency = system_frequency_future.result()
+    sensor_phase_voltage_list = sensor_phase_voltage_list_future.result()
+    sensor_pin_power_list = sensor_pin_power_list_future.result()
     sensor_phase_voltage_map = {
         electric_sensor_voltages.sensor_duid: electric_sensor_voltages
         for electric_sensor_voltages in sensor_phase_voltage_list
@@ -422,13 +440,6 @@ def get_panel_system_health_electric_widget_data(
         if (voltage := getattr(sensor_phase_voltage_map.get(clamp_id_to_sensor_duid_map[phase_to_clamps_map[phase][0].clamp_id], {}), f'volt_{phase.value}', None)) is not None
     }
 
-    clamp_pins: List[int] = list({
-        pin_number_from_port(clamp.port_name, clamp.port_pin)
-        for clamps in phase_to_clamps_map.values()
-        for clamp in clamps
-    })
-
-    sensor_pin_power_list = timestream_electric_circuit_measurements_service.get_phase_power(sensor_duids=sensor_duids, clamp_pins=clamp_pins)
 
     pin_power_map: Dict[str, Dict[int, float]] = {}
     for sensor_pin_power in sensor_pin_power_list:
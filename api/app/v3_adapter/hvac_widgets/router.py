@@ -1,9 +1,9 @@
 from datetime import datetime, timedelta, timezone
-from itertools import chain, groupby
+from itertools import chain
 from typing import Dict, Final, List, Optional, Union, assert_never
 from uuid import UUID
 from zoneinfo import ZoneInfo
-from fastapi import APIRouter, Depends, HTTPException, Path, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
 
 from app.utils import celsius_to_farenheit_int
 from app.v1.auth.helpers.user_access_grants_helper import UserAccessGrantsHelper
@@ -20,6 +20,7 @@ from app.v1.dependencies import (
     get_nodes_service,
     get_temperature_sensor_places_service,
     get_thermostats_service,
+    get_timestream_client,
     get_timestream_hvac_zone_measurements_service,
     get_timestream_temperature_sensor_place_measurements_service,
     get_user_access_grants_helper
@@ -36,10 +37,11 @@ from app.v1.hvac.services.thermostats import ThermostatsService
 from app.v1.hvac_dashboards.schemas.control_zone_hvac_widget import (
     ControlZoneHvacWidget,
     ControlZoneHvacWidgetUpdate,
-    ControlZoneTemperaturePlaceType
+    ControlZoneTemperaturePlaceType,
+    VirtualDeviceState
 )
 from app.v1.hvac_dashboards.schemas.hvac_dashboard import HvacDashboard
-from app.v1.hvac_dashboards.schemas.hvac_hold import HvacHoldCreate
+from app.v1.hvac_dashboards.schemas.hvac_hold import HvacHold, HvacHoldCreate
 from app.v1.hvac_dashboards.services.control_zone_hvac_widgets_service import ControlZoneHvacWidgetsService
 from app.v1.hvac_dashboards.services.hvac_dashboards_service import HvacDashboardsService
 from app.v1.locations.schemas.location import Location
@@ -48,10 +50,12 @@ from app.v1.mesh_network.services.gateways import GatewaysService
 from app.v1.mesh_network.services.nodes import NodesService
 from app.v1.schemas import AccessTokenData
 from app.v1.temperature_monitoring.services.temperature_sensor_places import TemperatureSensorPlacesService
-from app.v1.timestream.schemas.control_zone_trends import ControlZoneTemperatureReading, ControlZoneTrendReading
+from app.v1.timestream.downsampling import lttb
 from app.v1.timestream.schemas.temperature_sensor_place_measurement import TemperatureSensorPlaceAggregatedMeasurement
 from app.v1.timestream.services.hvac_zone_measurements_service import TimestreamHvacZoneMeasurementsService
 from app.v1.timestream.services.temperature_sensor_place_measurements_service import TimestreamTemperatureSensorPlaceMeasurementsService
+from app.v1.timestream.timestream_client import TimestreamClient
+from app.v1.timestream.utils import series_with_gaps
 from app.v1.utils import convert_to_utc
 from app.v3_adapter.hvac_widgets.schemas.control_zone import (
     ControlZoneWidgetHvacHoldData,
@@ -60,6 +64,7 @@ from app.v3_adapter.hvac_widgets.schemas.control_zone import (
     GetControlZoneHvacWidgetDataResponse,
     GetControlZoneHvacWidgetDataResponseData,
     GetControlZoneResponse,
+    GetControlZonesHvacWidgetDataResponse,
     GetControlZoneResponseData,
     PostControlZoneHvacHoldRequestBody,
     PostControlZoneHvacHoldResponse,
@@ -336,36 +341,14 @@ def get_control_zone(
     )
 
 
-@router.get(
-    '/control-zones/{id}/data',
-    dependencies=[Depends(_authorize_token_for_control_zone_widget_read)],
-    response_model=GetControlZoneHvacWidgetDataResponse,
-)
-def get_control_zone_data(
-    widget: ControlZoneHvacWidget = Depends(_get_control_zone_hvac_widget),
-    control_zone_hvac_widgets_service: ControlZoneHvacWidgetsService = Depends(get_control_zone_hvac_widgets_service),
-    thermostats_service: ThermostatsService = Depends(get_thermostats_service),
-    hvac_holds_service: HvacHoldsService = Depends(get_hvac_holds_service),
-    hvac_dashboards_service: HvacDashboardsService = Depends(get_hvac_dashboards_service),
-    locations_service: LocationsService = Depends(get_locations_service)
-):
-    hvac_dashboard = hvac_dashboards_service.get_hvac_dashboard(widget.hvac_dashboard_id)
-    if hvac_dashboard is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='HVAC Dashboard not found')
-    location = locations_service.get_location(hvac_dashboard.location_id)
-    if location is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Location not found')
-
-    thermostat = thermostats_service.get_thermostat_for_hvac_zone(widget.hvac_zone_id)
-    if thermostat is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Thermostat not found for widget')
-    
+def _get_control_zone_data(
+    widget: ControlZoneHvacWidget,
+    thermostat_status: VirtualDeviceState,
+    hvac_hold: Optional[HvacHold],
+    location: Location
+) -> GetControlZoneHvacWidgetDataResponseData:
     current_schedule = widget.get_schedule_for_day_of_week(datetime.now(tz=timezone.utc).weekday())
     
-    thermostat_status = control_zone_hvac_widgets_service.get_virtual_device_state(thermostat.duid)
-
-    hvac_hold = hvac_holds_service.get_latest_active_hvac_hold_for_control_zone_hvac_widget(widget.hvac_widget_id)
-
     hvac_hold_since = None
     hvac_hold_author = None
     thermostat_auto_setpoints = None
@@ -415,31 +398,104 @@ def get_control_zone_data(
         elif thermostat_status.hvac_mode == ThermostatHvacMode.COOLING:
             hvac_status = HvacMode.COOLING
 
+    return GetControlZoneHvacWidgetDataResponseData(
+        id=widget.hvac_widget_id,
+        name=widget.name,
+        thermostat_status=thermostat_status.keypad_lockout,
+        hvac_status=hvac_status,
+        zone_air=thermostat_status.room_temperature_c,
+        supply_air=None,
+        set_point=thermostat_status.thermostat_setpoint_c,
+        current_schedule=ControlZoneWidgetScheduleData(
+            id=current_schedule.hvac_schedule_id,
+            name=current_schedule.name
+        ) if current_schedule is not None else None,
+        hvac_hold_since=hvac_hold_since.astimezone(tz=ZoneInfo(location.timezone)) if hvac_hold_since is not None else None,
+        hvac_hold_author=hvac_hold_author,
+        auto_mode=thermostat_status.auto_mode,
+        auto_setpoint_heating_c=thermostat_auto_setpoints[0] if thermostat_auto_setpoints is not None else None,
+        auto_setpoint_cooling_c=thermostat_auto_setpoints[1] if thermostat_auto_setpoints is not None else None,
+        last_reading=thermostat_status.activity
+    )
+
+
+@router.get(
+    '/control-zones/{id}/data',
+    dependencies=[Depends(_authorize_token_for_control_zone_widget_read)],
+    response_model=GetControlZoneHvacWidgetDataResponse,
+)
+def get_control_zone_data(
+    widget: ControlZoneHvacWidget = Depends(_get_control_zone_hvac_widget),
+    control_zone_hvac_widgets_service: ControlZoneHvacWidgetsService = Depends(get_control_zone_hvac_widgets_service),
+    thermostats_service: ThermostatsService = Depends(get_thermostats_service),
+    hvac_holds_service: HvacHoldsService = Depends(get_hvac_holds_service),
+    hvac_dashboards_service: HvacDashboardsService = Depends(get_hvac_dashboards_service),
+    locations_service: LocationsService = Depends(get_locations_service)
+):
+    hvac_dashboard = hvac_dashboards_service.get_hvac_dashboard(widget.hvac_dashboard_id)
+    if hvac_dashboard is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='HVAC Dashboard not found')
+    location = locations_service.get_location(hvac_dashboard.location_id)
+    if location is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Location not found')
+
+    thermostat = thermostats_service.get_thermostat_for_hvac_zone(widget.hvac_zone_id)
+    if thermostat is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Thermostat not found for widget')
+    
+    thermostat_status = control_zone_hvac_widgets_service.get_virtual_device_state(thermostat.duid)
+    hvac_hold = hvac_holds_service.get_latest_active_hvac_hold_for_control_zone_hvac_widget(widget.hvac_widget_id)
 
     return GetControlZoneHvacWidgetDataResponse(
         code='200',
         message='Success',
-        data=GetControlZoneHvacWidgetDataResponseData(
-            id=widget.hvac_widget_id,
-            name=widget.name,
-            thermostat_status=thermostat_status.keypad_lockout,
-            hvac_status=hvac_status,
-            zone_air=thermostat_status.room_temperature_c,
-            supply_air=None,
-            set_point=thermostat_status.thermostat_setpoint_c,
-            current_schedule=ControlZoneWidgetScheduleData(
-                id=current_schedule.hvac_schedule_id,
-                name=current_schedule.name
-            ) if current_schedule is not None else None,
-            hvac_hold_since=hvac_hold_since.astimezone(tz=ZoneInfo(location.timezone)) if hvac_hold_since is not None else None,
-            hvac_hold_author=hvac_hold_author,
-            auto_mode=thermostat_status.auto_mode,
-            auto_setpoint_heating_c=thermostat_auto_setpoints[0] if thermostat_auto_setpoints is not None else None,
-            auto_setpoint_cooling_c=thermostat_auto_setpoints[1] if thermostat_auto_setpoints is not None else None,
-            last_reading=thermostat_status.activity
-        )
+        data=_get_control_zone_data(widget, thermostat_status, hvac_hold, location)
     )
-    
+
+
+@router.get(
+    '/control-zone-statuses/{id}/data',
+    dependencies=[Depends(_authorize_token_for_hvac_dashboard_read)],
+    response_model=GetControlZonesHvacWidgetDataResponse,
+)
+def get_control_zone_statuses_data(
+    dashboard: HvacDashboard = Depends(_get_hvac_dashboard),
+    control_zone_hvac_widgets_service: ControlZoneHvacWidgetsService = Depends(get_control_zone_hvac_widgets_service),
+    thermostats_service: ThermostatsService = Depends(get_thermostats_service),
+    hvac_holds_service: HvacHoldsService = Depends(get_hvac_holds_service),
+    locations_service: LocationsService = Depends(get_locations_service)
+):
+    location = _get_location(dashboard.location_id, locations_service)
+    widgets = control_zone_hvac_widgets_service.get_control_zone_hvac_widgets_for_hvac_dashboard(dashboard.hvac_dashboard_id)
+
+    # The thermostats, holds and states of all the zones are read at once instead of zone by zone
+    thermostats = thermostats_service.get_thermostats_for_hvac_zones([widget.hvac_zone_id for widget in widgets])
+    widget_thermostats = [
+        (widget, thermostats[widget.hvac_zone_id])
+        for widget in widgets
+        if widget.hvac_zone_id in thermostats
+    ]
+    hvac_holds = hvac_holds_service.get_latest_active_hvac_holds_for_control_zone_hvac_widgets(
+        [widget.hvac_widget_id for widget, _ in widget_thermostats]
+    )
+    thermostat_statuses = control_zone_hvac_widgets_service.get_virtual_device_states(
+        [thermostat.duid for _, thermostat in widget_thermostats]
+    )
+
+    return GetControlZonesHvacWidgetDataResponse(
+        code='200',
+        message='Success',
+        data=[
+            _get_control_zone_data(
+                widget,
+                thermostat_statuses[thermostat.duid],
+                hvac_holds.get(widget.hvac_widget_id),
+                location
+            )
+            for widget, thermostat in widget_thermostats
+        ]
+    )
+
 
 @router.post(
     '/control-zones/{id}/hvac-holds',
@@ -593,9 +649,11 @@ def post_control_zone_hvac_hold(
 def get_control_zone_trend_data(
     period_start: datetime,
     period_end: datetime,
+    max_points: Optional[int] = Query(default=None, ge=3),
     dashboard: HvacDashboard = Depends(_get_hvac_dashboard),
     control_zone_hvac_widgets_service: ControlZoneHvacWidgetsService = Depends(get_control_zone_hvac_widgets_service),
     timestream_hvac_zone_measurements_service: TimestreamHvacZoneMeasurementsService = Depends(get_timestream_hvac_zone_measurements_service),
+    locations_service: LocationsService = Depends(get_locations_service),
 ):
     period_start = convert_to_utc(period_start)
     period_end = convert_to_utc(period_end)
@@ -611,10 +669,12 @@ def get_control_zone_trend_data(
             )
         )
     
+    location = _get_location(dashboard.location_id, locations_service)
     trends_data = timestream_hvac_zone_measurements_service.get_control_zone_trends(
         hvac_widget_ids=[widget.hvac_widget_id for widget in widgets],
         start_datetime=period_start,
-        end_datetime=period_end
+        end_datetime=period_end,
+        location_timezone=location.timezone
     )
 
     zone_names_map: Dict[UUID, str] = {
@@ -623,37 +683,23 @@ def get_control_zone_trend_data(
     }
 
     zone_trends = []
-    zones_data = {
-        zone: list(readings)
-        for zone, readings in groupby(trends_data, key=lambda x: x.zone)
-    }
+    zones_data = series_with_gaps(
+        trends_data,
+        key=lambda reading: reading.zone,
+        timestamp=lambda reading: reading.measure_datetime,
+        value=lambda reading: reading.temperature_c,
+        point=ZoneReading
+    )
     for zone, zone_name in zone_names_map.items():
-        normalized_zone_readings: List[ZoneReading] = []
-        if (zone_readings := zones_data.get(zone)) is not None:
-            previous: Optional[ControlZoneTrendReading] = None
-            for current in zone_readings:
-                current_zone_reading = ZoneReading(
-                    current.measure_datetime,
-                    current.temperature_c
-                )
-                if previous is not None and current.measure_datetime - previous.measure_datetime > timedelta(hours=4):
-                    normalized_zone_readings.extend(
-                        (
-                            ZoneReading(
-                                previous.measure_datetime + timedelta(seconds=1),
-                                None
-                            ),
-                            ZoneReading(
-                                current.measure_datetime - timedelta(seconds=1),
-                                None
-                            ),
-                            current_zone_reading
-                        
-                        )
-                    )
-                else:
-                    normalized_zone_readings.append(current_zone_reading)
-                previous = current
+        normalized_zone_readings = zones_data.get(zone, [])
+        if max_points is not None:
+            # After the gaps are marked, as the spacing of the kept readings may exceed the gap threshold
+            normalized_zone_readings = lttb(
+                normalized_zone_readings,
+                max_points,
+                x=lambda reading: reading.timestamp,
+                y=lambda reading: reading.temperature_c
+            )
         zone_trends.append(
             ZoneTrendData(
                 zone=zone,
@@ -710,6 +756,8 @@ def get_control_zone_temperatures_data(
     temperature_sensor_places_service: TemperatureSensorPlacesService = Depends(get_temperature_sensor_places_service),
     timestream_temperature_sensor_measurements_service: TimestreamTemperatureSensorPlaceMeasurementsService = Depends(get_timestream_temperature_sensor_place_measurements_service),
     timestream_hvac_zone_measurements_service: TimestreamHvacZoneMeasurementsService = Depends(get_timestream_hvac_zone_measurements_service),
+    timestream_client: TimestreamClient = Depends(get_timestream_client),
+    locations_service: LocationsService = Depends(get_locations_service),
 ):
     period_start = convert_to_utc(period_start)
     period_end = convert_to_utc(period_end)
@@ -723,40 +771,60 @@ def get_control_zone_temperatures_data(
     # TODO: Update with check for autochangeover feature toggle
     autochangeover_enabled = False
 
-    trends_data = timestream_hvac_zone_measurements_service.get_control_zone_readings(
-        hvac_widget_id=widget.hvac_widget_id,
-        start_datetime=period_start,
-        end_datetime=period_end
-    )
+    # Temperature place readings, listed input duct first, then output duct, then room
+    temperature_places_by_id = {
+        temperature_place.temperature_sensor_place_id: temperature_place
+        for temperature_place in temperature_sensor_places_service.get_temperature_sensor_places(
+            list({link.temperature_place_id for link in widget.temperature_place_links})
+        )
+    }
+    temperature_places = [
+        temperature_places_by_id[link.temperature_place_id]
+        for place_type in (ControlZoneTemperaturePlaceType.INPUT_DUCT, ControlZoneTemperaturePlaceType.OUTPUT_DUCT, ControlZoneTemperaturePlaceType.ROOM)
+        for link in widget.temperature_place_links
+        if link.control_zone_temperature_place_type == place_type and link.temperature_place_id in temperature_places_by_id
+    ]
+
+    location = _get_location(dashboard.location_id, locations_service)
+
+    # The zone trends and the place readings are independent, so they are queried concurrently
+    temperature_places_historical_readings: List[TemperatureSensorPlaceAggregatedMeasurement] = []
+    with timestream_client.fan_out() as fan_out:
+        trends_data_future = fan_out.submit(
+            lambda: timestream_hvac_zone_measurements_service.get_control_zone_readings(
+                hvac_widget_id=widget.hvac_widget_id,
+                start_datetime=period_start,
+                end_datetime=period_end,
+                location_timezone=location.timezone
+            )
+        )
+        if len(temperature_places) > 0:
+            temperature_places_historical_readings_future = fan_out.submit(
+                lambda: timestream_temperature_sensor_measurements_service.get_aggregated_measurements_for_temperature_sensor_places(
+                    temperature_sensor_place_ids=[
+                        temperature_place.temperature_sensor_place_id
+                        for temperature_place in temperature_places
+                    ],
+                    start_datetime=period_start,
+                    end_datetime=period_end,
+                    location_timezone=location.timezone
+                )
+            )
+    trends_data = trends_data_future.result()
+    if len(temperature_places) > 0:
+        temperature_places_historical_readings.extend(temperature_places_historical_readings_future.result())
+
     zone_trends: List[ZoneTemperatureData] = []
-    for telemetry, zone_readings in groupby(trends_data, key=lambda x: x.telemetry):
+    for telemetry, normalized_zone_readings in series_with_gaps(
+        trends_data,
+        key=lambda reading: reading.telemetry,
+        timestamp=lambda reading: reading.measure_datetime,
+        value=lambda reading: reading.reading,
+        point=ZoneTemperatureReading
+    ).items():
         if not autochangeover_enabled and telemetry in ('auto-heating-setpointC', 'auto-cooling-setpointC'):
             continue
-        previous_control_zone_reading: Optional[ControlZoneTemperatureReading] = None
-        normalized_zone_readings: List[ZoneTemperatureReading] = []
-        for current_zr in zone_readings:
-            current_zone_reading = ZoneTemperatureReading(
-                current_zr.measure_datetime,
-                current_zr.reading
-            )
-            if previous_control_zone_reading is not None and current_zr.measure_datetime - previous_control_zone_reading.measure_datetime > timedelta(hours=4):
-                normalized_zone_readings.extend(
-                    (
-                        ZoneTemperatureReading(
-                            previous_control_zone_reading.measure_datetime + timedelta(seconds=1),
-                            None
-                        ),
-                        ZoneTemperatureReading(
-                            current_zr.measure_datetime - timedelta(seconds=1),
-                            None
-                        ),
-                        current_zone_reading
-                    )
-                )
-            else:
-                normalized_zone_readings.append(current_zone_reading)
-            previous_control_zone_reading = current_zr
-        
+
         match telemetry:
             case 'room-temperatureC':
                 place_name = f'{widget.name} (Zone Temperature)'
@@ -781,69 +849,18 @@ def get_control_zone_temperatures_data(
             )
         )
     
-    # Temperature place readings
-    input_duct_temperature_place_ids = [
-        link.temperature_place_id
-        for link in widget.temperature_place_links
-        if link.control_zone_temperature_place_type == ControlZoneTemperaturePlaceType.INPUT_DUCT
-    ]
-    output_duct_temperature_place_ids = [
-        link.temperature_place_id
-        for link in widget.temperature_place_links
-        if link.control_zone_temperature_place_type == ControlZoneTemperaturePlaceType.OUTPUT_DUCT
-    ]
-    room_temperature_place_ids = [
-        link.temperature_place_id
-        for link in widget.temperature_place_links
-        if link.control_zone_temperature_place_type == ControlZoneTemperaturePlaceType.ROOM
-    ]
-
-    input_duct_temperature_places = temperature_sensor_places_service.get_temperature_sensor_places(input_duct_temperature_place_ids)
-    output_duct_temperature_places = temperature_sensor_places_service.get_temperature_sensor_places(output_duct_temperature_place_ids)
-    room_temperature_places = temperature_sensor_places_service.get_temperature_sensor_places(room_temperature_place_ids)
-    temperature_places = list(chain(input_duct_temperature_places, output_duct_temperature_places, room_temperature_places))
-    
-    temperature_places_historical_readings: List[TemperatureSensorPlaceAggregatedMeasurement] = []
-    if len(temperature_places) > 0:
-        temperature_places_historical_readings.extend(timestream_temperature_sensor_measurements_service.get_aggregated_measurements_for_temperature_sensor_places(
-            temperature_sensor_place_ids=[
-                temperature_place.temperature_sensor_place_id
-                for temperature_place in temperature_places
-            ],
-            start_datetime=period_start,
-            end_datetime=period_end,
-            aggregation_interval=timedelta(minutes=10)
-        ))
     temperature_places_map = {
         place.temperature_sensor_place_id: place.name
         for place in temperature_places
     }
     temperature_place_readings: List[ZoneTemperatureData] = []
-    for place_id, place_readings in groupby(temperature_places_historical_readings, key=lambda x: x.temperature_sensor_place_id):
-        previous_temperature_place_reading: Optional[TemperatureSensorPlaceAggregatedMeasurement] = None
-        normalized_place_readings: List[ZoneTemperatureReading] = []
-        for current_pr in place_readings:
-            current_zone_reading = ZoneTemperatureReading(
-                current_pr.measurement_datetime,
-                current_pr.average_temperature_c
-            )
-            if previous_temperature_place_reading is not None and current_pr.measurement_datetime - previous_temperature_place_reading.measurement_datetime > timedelta(hours=4):
-                normalized_place_readings.extend(
-                    (
-                        ZoneTemperatureReading(
-                            previous_temperature_place_reading.measurement_datetime + timedelta(seconds=1),
-                            None
-                        ),
-                        ZoneTemperatureReading(
-                            current_pr.measurement_datetime - timedelta(seconds=1),
-                            None
-                        ),
-                        current_zone_reading
-                    )
-                )
-            else:
-                normalized_place_readings.append(current_zone_reading)
-            previous_temperature_place_reading = current_pr
+    for place_id, normalized_place_readings in series_with_gaps(
+        temperature_places_historical_readings,
+        key=lambda reading: reading.temperature_sensor_place_id,
+        timestamp=lambda reading: reading.measurement_datetime,
+        value=lambda reading: reading.average_temperature_c,
+        point=ZoneTemperatureReading
+    ).items():
         temperature_place_readings.append(
             ZoneTemperatureData(
                 id=place_id,
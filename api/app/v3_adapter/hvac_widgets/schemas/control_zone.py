@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional, Union
+from typing import List, Optional, Union
 from uuid import UUID
 
 from pydantic import BaseModel, field_validator
@@ -87,6 +87,10 @@ class GetControlZoneHvacWidgetDataResponse(BaseResponse):
     data: GetControlZoneHvacWidgetDataResponseData
 
 
+class GetControlZonesHvacWidgetDataResponse(BaseResponse):
+    data: List[GetControlZoneHvacWidgetDataResponseData]
+
+
 class PostControlZoneHvacHoldRequestBody(BaseModel):
     @field_validator('mode', mode='before')
     def validate_mode(cls, value):
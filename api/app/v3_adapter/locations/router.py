@@ -12,15 +12,17 @@ from app.v1.auth.schemas.organization_access_grant import OrganizationAccessGran
 from app.v1.auth.schemas.per_location_role import PerLocationRole
 from app.v1.auth.services.user_location_access_grants import UserLocationAccessGrantsService
 from app.v1.auth.services.user_organization_access_grants import UserOrganizationAccessGrantsService
-from app.v1.cache.cache import Cache
+from app.v1.cache.single_flight_cache import SingleFlightCache
 from app.v1.dependencies import (
     get_access_token_data,
     get_dp_pes_service,
     get_electricity_dashboards_service,
     get_hvac_dashboards_service,
-    get_location_aggregated_data_cache,
+    get_location_aggregated_data_single_flight_cache,
     get_location_electricity_prices_service,
+    get_location_energy_usage_service,
     get_location_time_of_use_rates_service,
+    get_circuit_energy_service,
     get_circuits_service,
     get_location_operating_hours_service,
     get_locations_service,
@@ -28,13 +30,14 @@ from app.v1.dependencies import (
     get_temperature_sensor_place_alerts_service,
     get_user_location_access_grants_service,
     get_user_organization_access_grants_service,
-    get_timestream_electricity_circuit_measurements_service,
     get_user_access_grants_helper
 )
 from app.v1.dp_pes.service import DpPesService
 from app.v1.electricity_dashboards.services.electricity_dashboards_service import ElectricityDashboardsService
 from app.v1.electricity_monitoring.schemas.circuit import CircuitTypeEnum
+from app.v1.electricity_monitoring.services.circuit_energy import CircuitEnergyService
 from app.v1.electricity_monitoring.services.circuits import CircuitsService
+from app.v1.electricity_monitoring.services.location_energy_usage import LocationEnergyUsageService
 from app.v1.hvac_dashboards.services.hvac_dashboards_service import HvacDashboardsService
 from app.v1.locations.schemas.location import Location
 from app.v1.locations.schemas.location_electricity_price import LocationElectricityPriceCreate
@@ -46,7 +49,7 @@ from app.v1.locations.services.location_time_of_use_rates import LocationTimeOfU
 from app.v1.locations.services.locations import LocationsService
 from app.v1.schemas import AccessTokenData, DayOfWeek
 from app.v1.temperature_monitoring.services.temperature_sensor_place_alerts import TemperatureSensorPlaceAlertsService
-from app.v1.timestream.services.circuit_measurements_service import TimestreamElectricityCircuitMeasurementsService
+from app.v1.utils import local_day_window
 from app.v3_adapter.locations.schemas import (
     DeleteLocationRolesResponse,
     ExtendedOperatingHours,
@@ -653,42 +656,31 @@ def patch_location_time_of_use_rate(
 def get_location_electricity_usage_mtd(
     location: Location = Depends(_get_location),
     circuits_service: CircuitsService = Depends(get_circuits_service),
-    timestream_electricity_circuit_measurements_service: TimestreamElectricityCircuitMeasurementsService = Depends(get_timestream_electricity_circuit_measurements_service),
-    location_aggregated_data_cache: Cache = Depends(get_location_aggregated_data_cache),
+    location_energy_usage_service: LocationEnergyUsageService = Depends(get_location_energy_usage_service),
+    location_aggregated_data_cache: SingleFlightCache = Depends(get_location_aggregated_data_single_flight_cache),
 ):
     local_now: datetime = datetime.now(tz=ZoneInfo(location.timezone))
     current_hour: datetime = local_now.replace(minute=0, second=0, microsecond=0).astimezone(timezone.utc)
     current_month_start: datetime = local_now.replace(day=1, hour=0, minute=0, second=0, microsecond=0).astimezone(timezone.utc)
 
-    cache_key = f"locations::{location.location_id!s}::electricity-usage-mtd::{current_month_start.isoformat()}"
-    cached_total_usage = location_aggregated_data_cache.get(key=cache_key)
-    
-    if cached_total_usage is not None:
-        return GetLocationElectricityUsageMtdResponse(
-            data=GetLocationElectricityUsageMtdResponseData(
-                kwh=cached_total_usage
-            ),
-            code='200',
-            message='success'
+    def _get_total_usage() -> float:
+        location_mains = circuits_service.get_circuits_of_type_for_location(location.location_id, CircuitTypeEnum.main)
+        if len(location_mains) == 0:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='no_mains_available')
+        return location_energy_usage_service.get_month_to_date_kwh(
+            location_id=location.location_id,
+            location_timezone=location.timezone,
+            circuit_ids=[circuit.circuit_id for circuit in location_mains],
+            end_datetime=current_hour
         )
 
-    location_mains = circuits_service.get_circuits_of_type_for_location(location.location_id, CircuitTypeEnum.main)
-    if len(location_mains) == 0:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='no_mains_available')
-    
-    usage_records = timestream_electricity_circuit_measurements_service.get_energy_table_circuits_energy(
-        circuit_ids=[circuit.circuit_id for circuit in location_mains],
-        start_datetime=current_month_start,
-        end_datetime=current_hour
+    total_usage = location_aggregated_data_cache.get_or_compute(
+        key=f"locations::{location.location_id!s}::electricity-usage-mtd::{current_month_start.isoformat()}",
+        compute=_get_total_usage,
+        ttl_seconds=int(timedelta(hours=1).total_seconds()),
+        stale_for_seconds=int(timedelta(minutes=15).total_seconds())
     )
-    total_usage = sum([usage_record.usage.kwh for usage_record in usage_records])
-    
-    location_aggregated_data_cache.set(
-        key=cache_key,
-        value=total_usage,
-        expire_in_seconds=int(timedelta(hours=1).total_seconds())
-    )
-    
+
     return GetLocationElectricityUsageMtdResponse(
         data=GetLocationElectricityUsageMtdResponseData(
             kwh=total_usage
@@ -724,35 +716,13 @@ def get_location_alerts(
 def get_location_usage_change(
     location: Location = Depends(_get_location),
     circuits_service: CircuitsService = Depends(get_circuits_service),
-    location_aggregated_data_cache: Cache = Depends(get_location_aggregated_data_cache),
-    timestream_electricity_circuit_measurements_service: TimestreamElectricityCircuitMeasurementsService = Depends(get_timestream_electricity_circuit_measurements_service),
+    location_aggregated_data_cache: SingleFlightCache = Depends(get_location_aggregated_data_single_flight_cache),
+    circuit_energy_service: CircuitEnergyService = Depends(get_circuit_energy_service),
 ):
     location_mains = circuits_service.get_circuits_of_type_for_location(location.location_id, CircuitTypeEnum.main)
     if len(location_mains) == 0:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='no_mains_available')
 
-    def _get_electricity_usage_for_period(
-        start_datetime: datetime,
-        end_datetime: datetime
-    ) -> float:
-        cache_key = f"locations::{location.location_id!s}::usage-change::{start_datetime.isoformat()}"
-        cached_usage = location_aggregated_data_cache.get(key=cache_key)
-        if cached_usage is None:
-            usage_records = timestream_electricity_circuit_measurements_service.get_energy_table_circuits_energy(
-                circuit_ids=[circuit.circuit_id for circuit in location_mains],
-                start_datetime=start_datetime,
-                end_datetime=end_datetime
-            )
-            usage = sum([usage_record.usage.kwh for usage_record in usage_records])
-            location_aggregated_data_cache.set(
-                key=cache_key,
-                value=usage,
-                expire_in_seconds=int(timedelta(days=8).total_seconds())
-            )
-        else:
-            usage = float(cached_usage)
-        return usage
-
     local_now: datetime = datetime.now(tz=ZoneInfo(location.timezone))
     yesterday_end: datetime = local_now - timedelta(days=1)
 
@@ -760,13 +730,27 @@ def get_location_usage_change(
         (yesterday_end - timedelta(days=6)).replace(hour=0, minute=0, second=0, microsecond=0),
          yesterday_end.replace(hour=23, minute=59, second=59, microsecond=999999)
     )
-    current_week_usage = _get_electricity_usage_for_period(current_week_period[0].astimezone(tz=timezone.utc), current_week_period[1].astimezone(tz=timezone.utc))
-
     previous_week_period = (
         current_week_period[0] - timedelta(days=7),
         current_week_period[1] - timedelta(days=7)
     )
-    previous_week_usage = _get_electricity_usage_for_period(previous_week_period[0].astimezone(tz=timezone.utc), previous_week_period[1].astimezone(tz=timezone.utc))
+    periods = [
+        (period[0].astimezone(tz=timezone.utc), period[1].astimezone(tz=timezone.utc))
+        for period in (current_week_period, previous_week_period)
+    ]
+
+    def _get_electricity_usage_for_periods(indexes: List[int]) -> List[float]:
+        usages = circuit_energy_service.get_total_energy_for_windows(
+            circuit_ids=[circuit.circuit_id for circuit in location_mains],
+            windows=[periods[index] for index in indexes]
+        )
+        return [usage.kwh for usage in usages]
+
+    current_week_usage, previous_week_usage = location_aggregated_data_cache.get_or_compute_many(
+        keys=[f"locations::{location.location_id!s}::usage-change::{period[0].isoformat()}" for period in periods],
+        compute=_get_electricity_usage_for_periods,
+        ttl_seconds=int(timedelta(days=8).total_seconds())
+    )
 
     return GetLocationUsageChangeResponse(
         data=GetLocationUsageChangeResponseData(
@@ -786,45 +770,36 @@ def get_location_usage_change(
 def get_location_energy_usage_trend(
     location: Location = Depends(_get_location),
     circuits_service: CircuitsService = Depends(get_circuits_service),
-    location_aggregated_data_cache: Cache = Depends(get_location_aggregated_data_cache),
-    timestream_electricity_circuit_measurements_service: TimestreamElectricityCircuitMeasurementsService = Depends(get_timestream_electricity_circuit_measurements_service),
+    location_aggregated_data_cache: SingleFlightCache = Depends(get_location_aggregated_data_single_flight_cache),
+    circuit_energy_service: CircuitEnergyService = Depends(get_circuit_energy_service),
 ):
     location_mains = circuits_service.get_circuits_of_type_for_location(location.location_id, CircuitTypeEnum.main)
     if len(location_mains) == 0:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='no_mains_available')
     
-    def _get_electricity_usage_for_period(
-        start_datetime: datetime,
-        end_datetime: datetime
-    ) -> float:
-        cache_key = f"locations::{location.location_id!s}::energy-usage-trend::{start_datetime}"
-        cached_usage = location_aggregated_data_cache.get(key=cache_key)
-        if cached_usage is None:
-            usage_records = timestream_electricity_circuit_measurements_service.get_energy_table_circuits_energy(
-                circuit_ids=[circuit.circuit_id for circuit in location_mains],
-                start_datetime=start_datetime,
-                end_datetime=end_datetime
-            )
-            usage = sum([usage_record.usage.kwh for usage_record in usage_records])
-            location_aggregated_data_cache.set(
-                key=cache_key,
-                value=usage,
-                expire_in_seconds=int(timedelta(days=4).total_seconds())
-            )
-        else:
-            usage = float(cached_usage)
-        return usage
+    location_tz = ZoneInfo(location.timezone)
+    yesterday = datetime.now(tz=location_tz).date() - timedelta(days=1)
+
+    # Each window is its own local day, as days around DST changes do not last 24 hours
+    periods = [
+        local_day_window(yesterday - timedelta(days=days_ago), location_tz)
+        for days_ago in (2, 1, 0)
+    ]
 
-    yesterday_local: datetime = datetime.now(tz=ZoneInfo(location.timezone)).replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=1)
-    yesterday_start_local = yesterday_local.replace(hour=0, minute=0, second=0, microsecond=0)
-    yesterday_end_local = yesterday_local.replace(hour=23, minute=59, second=59, microsecond=999999)
-    yesterday_start = yesterday_start_local.astimezone(timezone.utc)
-    yesterday_end = yesterday_end_local.astimezone(timezone.utc)
+    def _get_electricity_usage_for_periods(indexes: List[int]) -> List[float]:
+        usages = circuit_energy_service.get_total_energy_for_windows(
+            circuit_ids=[circuit.circuit_id for circuit in location_mains],
+            windows=[periods[index] for index in indexes]
+        )
+        return [usage.kwh for usage in usages]
 
+    usages = location_aggregated_data_cache.get_or_compute_many(
+        keys=[f"locations::{location.location_id!s}::energy-usage-trend::{period[0]}" for period in periods],
+        compute=_get_electricity_usage_for_periods,
+        ttl_seconds=int(timedelta(days=4).total_seconds())
+    )
     datapoints: List[Tuple[datetime, float]] = [
-        (yesterday_start - timedelta(days=2), _get_electricity_usage_for_period(yesterday_start - timedelta(days=2), yesterday_end - timedelta(days=2))),
-        (yesterday_start - timedelta(days=1), _get_electricity_usage_for_period(yesterday_start - timedelta(days=1), yesterday_end - timedelta(days=1))),
-        (yesterday_start, _get_electricity_usage_for_period(yesterday_start, yesterday_end))
+        (period[0], usage) for period, usage in zip(periods, usages)
     ]
 
     return GetLocationEnergyUsageTrendResponse(
@@ -576,9 +576,9 @@ def get_organization_alerts(
         for temperature_sensor_place in temperature_sensor_places
     }
 
-    current_temperature_place_temps: Dict[UUID, Optional[TemperatureSensorPlaceReading]] = {}
-    for temperature_sensor_place in temperature_sensor_places:
-        current_temperature_place_temps[temperature_sensor_place.temperature_sensor_place_id] = temperature_sensor_place_readings_service.get_latest_activity_for_temperature_sensor_place(temperature_sensor_place.temperature_sensor_place_id)
+    current_temperature_place_temps: Dict[UUID, Optional[TemperatureSensorPlaceReading]] = temperature_sensor_place_readings_service.get_latest_activity_for_temperature_sensor_places(
+        list(temperature_sensor_places_map.keys())
+    )
     
     response_data_items: List[GetOrganizationAlertsResponseDataItem] = []
     for alert in temperature_sensor_place_alerts:
@@ -1,7 +1,7 @@
-from datetime import datetime, timedelta
-from itertools import groupby
+from datetime import datetime
+from typing import Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Path, status
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, status
 
 
 from app.v1.auth.helpers.user_access_grants_helper import UserAccessGrantsHelper
@@ -27,7 +27,9 @@ from app.v1.schemas import AccessTokenData
 from app.v1.temperature_monitoring.services.temperature_sensor_place_readings import TemperatureSensorPlaceReadingsService
 from app.v1.temperature_monitoring.services.temperature_sensor_places import TemperatureSensorPlacesService
 from app.v1.temperature_monitoring.services.temperature_sensors import TemperatureSensorsService
+from app.v1.timestream.downsampling import lttb
 from app.v1.timestream.services.temperature_sensor_place_measurements_service import TimestreamTemperatureSensorPlaceMeasurementsService
+from app.v1.timestream.utils import group_series
 from app.v1.utils import convert_to_utc
 from app.v1.temperature_dashboards.schemas.temperature_dashboard import TemperatureDashboard
 from app.v1.temperature_dashboards.services.temperature_dashboards_service import TemperatureDashboardsService
@@ -129,24 +131,39 @@ def get_temperature_historic_graph_data(
     id: UUID,
     period_start_dt: datetime,
     period_end_dt: datetime,
+    max_points: Optional[int] = Query(default=None, ge=3),
     temperature_unit_widgets_service: TemperatureUnitWidgetsService = Depends(get_temperature_unit_widgets_service),
-    timestream_temperature_sensor_place_measurements_service: TimestreamTemperatureSensorPlaceMeasurementsService = Depends(get_timestream_temperature_sensor_place_measurements_service)
+    timestream_temperature_sensor_place_measurements_service: TimestreamTemperatureSensorPlaceMeasurementsService = Depends(get_timestream_temperature_sensor_place_measurements_service),
+    dashboard: TemperatureDashboard = Depends(_get_temperature_dashboard),
+    locations_service: LocationsService = Depends(get_locations_service)
 ):
     period_start_dt = convert_to_utc(period_start_dt)
     period_end_dt = convert_to_utc(period_end_dt)
     
     temperature_unit_widgets = temperature_unit_widgets_service.get_temperature_unit_widgets_for_temperature_dashboard(id)
     temperature_sensor_place_ids = [widget.temperature_sensor_place_id for widget in temperature_unit_widgets]
+    location = _get_location(location_id=dashboard.location_id, locations_service=locations_service)
     temperature_place_measurements = timestream_temperature_sensor_place_measurements_service.get_aggregated_measurements_for_temperature_sensor_places(
         temperature_sensor_place_ids=temperature_sensor_place_ids,
         start_datetime=period_start_dt,
         end_datetime=period_end_dt,
-        aggregation_interval=timedelta(minutes=10)
+        location_timezone=location.timezone
     )
 
     sorted_readings = []
-    for temperature_place_id, measurements in groupby(temperature_place_measurements, key=lambda m: m.temperature_sensor_place_id):
-        for measurement in measurements:
+    for temperature_place_id, place_measurements in group_series(
+        temperature_place_measurements,
+        key=lambda measurement: measurement.temperature_sensor_place_id,
+        timestamp=lambda measurement: measurement.measurement_datetime
+    ).items():
+        if max_points is not None:
+            place_measurements = lttb(
+                place_measurements,
+                max_points,
+                x=lambda measurement: measurement.measurement_datetime,
+                y=lambda measurement: measurement.average_temperature_c
+            )
+        for measurement in place_measurements:
             sorted_readings.append(
                 TemperatureHistoricGraphReading(
                     place=str(temperature_place_id),
@@ -0,0 +1,82 @@
+import argparse
+import random
+import timeit
+from datetime import datetime, timedelta, timezone
+from itertools import groupby
+from typing import Dict, List, Optional
+from uuid import UUID, uuid4
+
+from app.v1.timestream.schemas.control_zone_trends import ControlZoneTrendReading
+from app.v1.timestream.utils import series_with_gaps
+from app.v3_adapter.hvac_widgets.schemas.control_zone_trend import ZoneReading
+
+
+def make_readings(zones: int, days: int) -> List[ControlZoneTrendReading]:
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    random.seed(0)
+    readings: List[ControlZoneTrendReading] = []
+    for zone in sorted(uuid4() for _ in range(zones)):
+        outage_until = -1
+        for bin_index in range(days * 24 * 6):
+            # Zones go offline for 6 hours about once every ten days
+            if random.random() < 1 / (10 * 24 * 6):
+                outage_until = bin_index + 36
+            if bin_index < outage_until:
+                continue
+            readings.append(ControlZoneTrendReading.model_construct(
+                zone=zone,
+                measure_datetime=start + timedelta(minutes=10 * bin_index),
+                temperature_c=20.0 + random.random()
+            ))
+    return readings
+
+
+def mark_gaps_per_reading(readings: List[ControlZoneTrendReading]) -> Dict[UUID, List[ZoneReading]]:
+    # How get_control_zone_trend_data used to mark the gaps
+    zones_data = {
+        zone: list(zone_readings)
+        for zone, zone_readings in groupby(readings, key=lambda x: x.zone)
+    }
+    normalized: Dict[UUID, List[ZoneReading]] = {}
+    for zone, zone_readings in zones_data.items():
+        normalized_zone_readings: List[ZoneReading] = []
+        previous: Optional[ControlZoneTrendReading] = None
+        for current in zone_readings:
+            current_zone_reading = ZoneReading(current.measure_datetime, current.temperature_c)
+            if previous is not None and current.measure_datetime - previous.measure_datetime > timedelta(hours=4):
+                normalized_zone_readings.extend((
+                    ZoneReading(previous.measure_datetime + timedelta(seconds=1), None),
+                    ZoneReading(current.measure_datetime - timedelta(seconds=1), None),
+                    current_zone_reading
+                ))
+            else:
+                normalized_zone_readings.append(current_zone_reading)
+            previous = current
+        normalized[zone] = normalized_zone_readings
+    return normalized
+
+
+def mark_gaps_per_series(readings: List[ControlZoneTrendReading]) -> Dict[UUID, List[ZoneReading]]:
+    return series_with_gaps(
+        readings,
+        key=lambda reading: reading.zone,
+        timestamp=lambda reading: reading.measure_datetime,
+        value=lambda reading: reading.temperature_c,
+        point=ZoneReading
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compares the gap marking of the zone trends before and after series_with_gaps')
+    parser.add_argument('--zones', type=int, default=50)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    readings = make_readings(args.zones, args.days)
+    assert mark_gaps_per_reading(readings) == mark_gaps_per_series(readings)
+
+    print(f'{len(readings)} readings of {args.zones} zones over {args.days} days')
+    for name, normalize in (('per reading', mark_gaps_per_reading), ('per series', mark_gaps_per_series)):
+        best = min(timeit.repeat(lambda: normalize(readings), number=1, repeat=args.repeat))
+        print(f'{name}: {best * 1000:.1f} ms')
@@ -0,0 +1,79 @@
+import argparse
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from uuid import UUID
+
+from app.sqlalchemy_session import SessionLocal
+from app.v1.dependencies import (
+    TIMESTREAM_RESULT_CACHE_SETTLE_DELAY_S,
+    get_timestream_client,
+    get_timestream_electricity_circuit_measurements_service
+)
+from app.v1.electricity_monitoring.repositories.circuit_energy_rollups_repository import PostgresCircuitEnergyRollupsRepository
+from app.v1.electricity_monitoring.repositories.circuits_repository import PostgresCircuitsRepository
+from app.v1.electricity_monitoring.repositories.electric_panels_repository import PostgresElectricPanelsRepository
+from app.v1.electricity_monitoring.services.circuit_energy_rollups import CircuitEnergyRollupsService
+from app.v1.electricity_monitoring.services.circuits import CircuitsService
+from app.v1.locations.repositories.locations_repository import PostgresLocationsRepository
+from app.v1.locations.schemas.location import Location
+from app.v1.locations.services.locations import LocationsService
+
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def roll_up(location_ids: Optional[List[UUID]], backfill_days: int, lag_minutes: int) -> None:
+    with SessionLocal() as session:
+        locations_service = LocationsService(locations_repository=PostgresLocationsRepository(session))
+        circuits_service = CircuitsService(
+            circuits_repository=PostgresCircuitsRepository(session),
+            electric_panels_repository=PostgresElectricPanelsRepository(session)
+        )
+        circuit_energy_rollups_service = CircuitEnergyRollupsService(
+            circuit_energy_rollups_repository=PostgresCircuitEnergyRollupsRepository(session),
+            circuit_measurements_service=get_timestream_electricity_circuit_measurements_service(get_timestream_client())
+        )
+
+        locations: List[Location]
+        if location_ids is None:
+            locations = locations_service.filter_by()
+        else:
+            locations = [location for location_id in location_ids if (location := locations_service.get_location(location_id)) is not None]
+
+        now = datetime.now(tz=timezone.utc)
+        for location in locations:
+            circuits = circuits_service.get_circuits_for_location(location.location_id)
+            logger.info(f'Rolling up energy of {len(circuits)} circuits for location {location.location_id}')
+            try:
+                circuit_energy_rollups_service.roll_up_location_circuits(
+                    circuit_ids=[circuit.circuit_id for circuit in circuits],
+                    location_timezone=location.timezone,
+                    backfill_from=now - timedelta(days=backfill_days),
+                    roll_up_until=now - timedelta(minutes=lag_minutes)
+                )
+            except Exception:
+                session.rollback()
+                logger.exception(f'Failed to roll up energy for location {location.location_id}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Backfills and tops up the hourly and daily circuit energy rollups from Timestream')
+    parser.add_argument('--location-id', type=UUID, action='append', dest='location_ids', help='Only roll up these locations (repeatable)')
+    parser.add_argument('--backfill-days', type=int, default=90, help='How far back to start for circuits never rolled up')
+    parser.add_argument(
+        '--lag-minutes',
+        type=int,
+        default=TIMESTREAM_RESULT_CACHE_SETTLE_DELAY_S // 60,
+        help='How long to wait for late measurements before rolling up an hour, the Timestream settle delay by default'
+    )
+    parser.add_argument('--interval-seconds', type=int, default=0, help='Keep running, rolling up every this many seconds')
+    args = parser.parse_args()
+
+    while True:
+        roll_up(args.location_ids, args.backfill_days, args.lag_minutes)
+        if args.interval_seconds <= 0:
+            break
+        time.sleep(args.interval_seconds)
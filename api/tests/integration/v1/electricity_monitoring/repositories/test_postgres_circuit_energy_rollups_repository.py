@@ -0,0 +1,76 @@
+from datetime import date, datetime, timezone
+from uuid import uuid4
+
+from sqlalchemy.orm import Session
+
+from app.v1.electricity_monitoring.repositories.circuit_energy_rollups_repository import PostgresCircuitEnergyRollupsRepository
+from app.v1.electricity_monitoring.repositories.circuits_repository import PostgresCircuitsRepository
+from app.v1.electricity_monitoring.schemas.circuit import CircuitCreate, CircuitTypeEnum
+from app.v1.electricity_monitoring.schemas.circuit_energy_rollup import CircuitEnergyRollupProgress, CircuitHourlyEnergyRollup
+
+
+def _create_circuit(db_session_for_tests: Session):
+    return PostgresCircuitsRepository(db_session_for_tests).create(CircuitCreate(
+        name='Test Circuit',
+        electric_panel_id=uuid4(),
+        type=CircuitTypeEnum.main
+    ))
+
+
+def _hourly_rollup(circuit_id, hour: int, kwh: float) -> CircuitHourlyEnergyRollup:
+    # America/New_York, UTC-5
+    return CircuitHourlyEnergyRollup(
+        circuit_id=circuit_id,
+        hour_start=datetime(2024, 1, 1, hour, tzinfo=timezone.utc),
+        local_hour_start=datetime(2024, 1, 1, hour) - (datetime(2024, 1, 1, 5) - datetime(2024, 1, 1)),
+        kwh=kwh,
+        money=kwh / 10
+    )
+
+
+def test_save_hourly_rollups_upserts(db_session_for_tests: Session):
+    repository = PostgresCircuitEnergyRollupsRepository(db_session_for_tests)
+    circuit = _create_circuit(db_session_for_tests)
+
+    repository.save_hourly_rollups([_hourly_rollup(circuit.circuit_id, 5, 1.0), _hourly_rollup(circuit.circuit_id, 6, 2.0)])
+    repository.save_hourly_rollups([_hourly_rollup(circuit.circuit_id, 6, 3.0)])
+
+    rollups = repository.get_hourly_rollups([circuit.circuit_id], datetime(2024, 1, 1, tzinfo=timezone.utc), datetime(2024, 1, 2, tzinfo=timezone.utc))
+    assert [rollup.kwh for rollup in rollups] == [1.0, 3.0]
+    usages = repository.sum_hourly_rollups([circuit.circuit_id], datetime(2024, 1, 1, 5, tzinfo=timezone.utc), datetime(2024, 1, 1, 6, tzinfo=timezone.utc))
+    assert [(usage.circuit_id, usage.usage.kwh) for usage in usages] == [(circuit.circuit_id, 1.0)]
+
+
+def test_refresh_daily_rollups_sums_local_days(db_session_for_tests: Session):
+    repository = PostgresCircuitEnergyRollupsRepository(db_session_for_tests)
+    circuit = _create_circuit(db_session_for_tests)
+    # 04:00 UTC is still the 31st in New York
+    repository.save_hourly_rollups([_hourly_rollup(circuit.circuit_id, hour, 1.0) for hour in (4, 5, 6)])
+
+    repository.refresh_daily_rollups([circuit.circuit_id], 'America/New_York', date(2023, 12, 31), date(2024, 1, 1))
+
+    rollups = repository.get_daily_rollups([circuit.circuit_id], date(2023, 12, 31), date(2024, 1, 1))
+    assert [(rollup.day, rollup.day_start, rollup.kwh) for rollup in rollups] == [
+        (date(2023, 12, 31), datetime(2023, 12, 31, 5, tzinfo=timezone.utc), 1.0),
+        (date(2024, 1, 1), datetime(2024, 1, 1, 5, tzinfo=timezone.utc), 2.0),
+    ]
+    usages = repository.sum_daily_rollups([circuit.circuit_id], date(2023, 12, 31), date(2024, 1, 1))
+    assert [usage.usage.kwh for usage in usages] == [3.0]
+
+
+def test_save_progress_upserts(db_session_for_tests: Session):
+    repository = PostgresCircuitEnergyRollupsRepository(db_session_for_tests)
+    circuit = _create_circuit(db_session_for_tests)
+    progress = CircuitEnergyRollupProgress(
+        circuit_id=circuit.circuit_id,
+        timezone='America/New_York',
+        hourly_rolled_up_until=datetime(2024, 1, 1, 6, tzinfo=timezone.utc),
+        daily_rolled_up_until=datetime(2024, 1, 1, 5, tzinfo=timezone.utc)
+    )
+
+    repository.save_progress([progress])
+    repository.save_progress([progress.model_copy(update={'hourly_rolled_up_until': datetime(2024, 1, 1, 7, tzinfo=timezone.utc)})])
+
+    assert repository.get_progress([circuit.circuit_id, uuid4()]) == {
+        circuit.circuit_id: progress.model_copy(update={'hourly_rolled_up_until': datetime(2024, 1, 1, 7, tzinfo=timezone.utc)})
+    }
@@ -134,3 +134,33 @@ def test_delete_thermostat_deletes_thermostat(db_session_for_tests: Session):
     service.delete_thermostat(thermostats.thermostat_id)
     thermostat_model = service.get_thermostat_by_id(thermostats.thermostat_id)
     assert thermostat_model is None
+
+
+def test_get_thermostats_for_hvac_zones_maps_zones_to_their_thermostat(db_session_for_tests: Session):
+    service = ThermostatsService(
+        thermostats_repository=PostgresThermostatsRepository(db_session_for_tests)
+    )
+
+    thermostats = [
+        service.create_thermostat(ThermostatCreate(
+            name=f'Test Thermostat {index}',
+            duid=f'123456789{index}',
+            modbus_address=index,
+            model=ThermostatModelEnum.v1,
+            node_id=uuid4(),
+            hvac_zone_id=uuid4()
+        ))
+        for index in range(3)
+    ]
+    hvac_zone_without_thermostat_id = uuid4()
+
+    thermostats_by_zone = service.get_thermostats_for_hvac_zones([
+        thermostats[0].hvac_zone_id,
+        thermostats[2].hvac_zone_id,
+        hvac_zone_without_thermostat_id
+    ])
+
+    assert thermostats_by_zone == {
+        thermostats[0].hvac_zone_id: thermostats[0],
+        thermostats[2].hvac_zone_id: thermostats[2],
+    }
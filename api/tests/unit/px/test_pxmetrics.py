@@ -0,0 +1,61 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.px.pxmetrics import PxMetrics
+
+
+def test_counters_accumulate():
+    metrics = PxMetrics()
+
+    metrics.increment('cache.hit')
+    metrics.increment('cache.hit', 2)
+    metrics.increment('cache.miss', 0.5)
+
+    assert metrics.snapshot()['counters'] == {'cache.hit': 3, 'cache.miss': 0.5}
+
+
+def test_timer_records_count_total_average_and_max():
+    metrics = PxMetrics()
+
+    with patch('app.px.pxmetrics.time.perf_counter', side_effect=[10.0, 10.5, 20.0, 21.5]):
+        with metrics.timer('query'):
+            pass
+        with metrics.timer('query'):
+            pass
+
+    assert metrics.snapshot()['timings'] == {'query': {'count': 2, 'total_s': 2.0, 'avg_s': 1.0, 'max_s': 1.5}}
+
+
+def test_timer_records_blocks_that_raise():
+    metrics = PxMetrics()
+
+    with pytest.raises(ValueError):
+        with metrics.timer('query'):
+            raise ValueError()
+
+    assert metrics.snapshot()['timings']['query']['count'] == 1
+
+
+def test_gauges_are_evaluated_on_snapshot():
+    metrics = PxMetrics()
+    state = {'size': 1}
+    metrics.register_gauge('pool', lambda: dict(state))
+
+    state['size'] = 2
+
+    assert metrics.snapshot()['gauges'] == {'pool': {'size': 2}}
+    metrics.unregister_gauge('pool')
+    metrics.unregister_gauge('pool')
+    assert metrics.snapshot()['gauges'] == {}
+
+
+def test_reset_clears_counters_and_timings_but_keeps_gauges():
+    metrics = PxMetrics()
+    metrics.increment('cache.hit')
+    metrics.observe('query', 1.0)
+    metrics.register_gauge('pool', lambda: {'size': 1})
+
+    metrics.reset()
+
+    assert metrics.snapshot() == {'counters': {}, 'timings': {}, 'gauges': {'pool': {'size': 1}}}
@@ -0,0 +1,91 @@
+from app.v1.cache.in_memory_cache import InMemoryCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_get_returns_values_as_strings():
+    cache = InMemoryCache()
+    cache.set('int', 1)
+    cache.set('float', 1.5)
+    assert cache.get('int') == '1'
+    assert cache.get('float') == '1.5'
+    assert cache.get('missing') is None
+
+
+def test_set_expires_keys_after_ttl():
+    clock = _Clock()
+    cache = InMemoryCache(clock=clock)
+    cache.set('key', 'value', expire_in_seconds=10)
+    clock.now = 9.9
+    assert cache.get('key') == 'value'
+    clock.now = 10
+    assert cache.get('key') is None
+
+
+def test_mset_applies_per_key_ttls():
+    clock = _Clock()
+    cache = InMemoryCache(clock=clock)
+    cache.mset({'a': 1, 'b': 2, 'c': 3}, expire_in_seconds={'a': 5, 'b': 60})
+    clock.now = 30
+    assert cache.mget(['a', 'b', 'c', 'd']) == [None, '2', '3', None]
+
+
+def test_mset_applies_single_ttl_to_every_key():
+    clock = _Clock()
+    cache = InMemoryCache(clock=clock)
+    cache.mset({'a': 1, 'b': 2}, expire_in_seconds=5)
+    clock.now = 5
+    assert cache.mget(['a', 'b']) == [None, None]
+
+
+def test_hash_reads():
+    cache = InMemoryCache()
+    cache.hset('hash', {'a': 1, 'b': 'two'})
+    assert cache.hget('hash', 'a') == '1'
+    assert cache.hmget('hash', ['b', 'missing']) == ['two', None]
+    assert cache.hmget('missing', ['a']) == [None]
+    assert cache.hgetall('hash') == {'a': '1', 'b': 'two'}
+    assert cache.hgetall_many(['hash', 'missing']) == [{'a': '1', 'b': 'two'}, None]
+    assert cache.hget_many([('hash', 'b'), ('missing', 'a')]) == ['two', None]
+
+
+def test_pipeline_returns_results_in_order():
+    cache = InMemoryCache()
+    cache.hset('hash', {'a': 1})
+    with cache.pipeline() as pipeline:
+        pipeline.set('key', 'value').get('key').hget('hash', 'a').hmget('hash', ['a', 'b']).hgetall('missing')
+        assert pipeline.execute() == [True, 'value', '1', ['1', None], None]
+        assert pipeline.execute() == []
+
+
+def test_delete_removes_keys():
+    cache = InMemoryCache()
+    cache.set('a', 1)
+    cache.hset('b', {'c': 1})
+    assert cache.delete('a', 'b', 'missing') == 2
+    assert cache.get('a') is None
+    assert cache.hgetall('b') is None
+
+
+def test_set_if_absent_only_sets_missing_or_expired_keys():
+    clock = _Clock()
+    cache = InMemoryCache(clock=clock)
+    assert cache.set_if_absent('key', 'first', expire_in_seconds=10) is True
+    assert cache.set_if_absent('key', 'second') is False
+    assert cache.get('key') == 'first'
+    clock.now = 10
+    assert cache.set_if_absent('key', 'third') is True
+    assert cache.get('key') == 'third'
+
+
+def test_delete_returns_number_of_existing_keys():
+    cache = InMemoryCache()
+    cache.mset({'a': 1, 'b': 2})
+    assert cache.delete('a', 'b', 'missing') == 2
+    assert cache.mget(['a', 'b']) == [None, None]
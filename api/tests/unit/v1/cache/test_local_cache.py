@@ -0,0 +1,66 @@
+from app.v1.cache.local_cache import LocalCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_only_keys_in_a_namespace_are_cached():
+    local_cache = LocalCache({'locations::*': 60})
+    local_cache.set('locations::1', ('get',), 'value', local_cache.generation())
+    local_cache.set('other::1', ('get',), 'value', local_cache.generation())
+    assert local_cache.get('locations::1', ('get',)) == 'value'
+    assert local_cache.get('other::1', ('get',)) is LocalCache.MISSING
+
+
+def test_entries_expire_after_namespace_ttl():
+    clock = _Clock()
+    local_cache = LocalCache({'locations::*': 60, '*::fan::mode': 5}, clock=clock)
+    local_cache.set('locations::1', ('get',), 'value', local_cache.generation())
+    local_cache.set('duid::fan::mode', ('hget', 'value'), '1', local_cache.generation())
+    clock.now = 5
+    assert local_cache.get('locations::1', ('get',)) == 'value'
+    assert local_cache.get('duid::fan::mode', ('hget', 'value')) is LocalCache.MISSING
+
+
+def test_least_recently_used_keys_are_evicted():
+    local_cache = LocalCache({'*': 60}, max_keys=2)
+    local_cache.set('a', ('get',), 'a', local_cache.generation())
+    local_cache.set('b', ('get',), 'b', local_cache.generation())
+    local_cache.get('a', ('get',))
+    local_cache.set('c', ('get',), 'c', local_cache.generation())
+    assert local_cache.get('a', ('get',)) == 'a'
+    assert local_cache.get('b', ('get',)) is LocalCache.MISSING
+    assert local_cache.stats()['evictions'] == 1
+
+
+def test_invalidate_drops_every_read_of_a_key():
+    local_cache = LocalCache({'*': 60})
+    local_cache.set('hash', ('hget', 'a'), '1', local_cache.generation())
+    local_cache.set('hash', ('hgetall',), {'a': '1'}, local_cache.generation())
+    local_cache.invalidate('hash')
+    assert local_cache.get('hash', ('hget', 'a')) is LocalCache.MISSING
+    assert local_cache.get('hash', ('hgetall',)) is LocalCache.MISSING
+
+
+def test_set_is_dropped_when_invalidated_since_generation_was_taken():
+    local_cache = LocalCache({'*': 60})
+    generation = local_cache.generation()
+    local_cache.invalidate('key')
+    local_cache.set('key', ('get',), 'stale', generation)
+    assert local_cache.get('key', ('get',)) is LocalCache.MISSING
+
+
+def test_stats_count_hits_and_misses_per_namespace():
+    local_cache = LocalCache({'locations::*': 60, '*::auto::*': 5})
+    local_cache.get('locations::1', ('get',))
+    local_cache.set('locations::1', ('get',), None, local_cache.generation())
+    local_cache.get('locations::1', ('get',))
+    assert local_cache.stats()['namespaces'] == {
+        'locations::*': {'hits': 1, 'misses': 1},
+        '*::auto::*': {'hits': 0, 'misses': 0},
+    }
@@ -0,0 +1,55 @@
+from unittest.mock import MagicMock
+
+from app.v1.cache.local_cache import LocalCache
+from app.v1.cache.redis_cache import RedisCache
+
+
+def _redis_mock() -> MagicMock:
+    redis_mock = MagicMock()
+    redis_mock.pipeline.return_value.__enter__.return_value = redis_mock.pipeline_mock
+    return redis_mock
+
+
+def test_mget_reads_every_key_in_one_call():
+    redis_mock = _redis_mock()
+    redis_mock.mget.return_value = ['1', None]
+    cache = RedisCache(redis_mock)
+
+    assert cache.mget(['a', 'b']) == ['1', None]
+    redis_mock.mget.assert_called_once_with(['a', 'b'])
+    assert cache.mget([]) == []
+    redis_mock.mget.assert_called_once()
+
+
+def test_mget_only_reads_keys_missing_from_local_cache():
+    redis_mock = _redis_mock()
+    redis_mock.mget.side_effect = [['1', '2'], ['3']]
+    cache = RedisCache(redis_mock, local_cache=LocalCache({'a': 60, 'b': 60}))
+
+    assert cache.mget(['a', 'b']) == ['1', '2']
+    assert cache.mget(['b', 'c', 'a']) == ['2', '3', '1']
+    assert redis_mock.mget.call_args.args == (['c'],)
+
+
+def test_hget_many_pipelines_the_fields():
+    redis_mock = _redis_mock()
+    redis_mock.pipeline_mock.execute.return_value = ['1', None]
+    cache = RedisCache(redis_mock)
+
+    assert cache.hget_many([('duid::fan::mode', 'value'), ('duid::hvac::mode', 'value')]) == ['1', None]
+    redis_mock.pipeline.assert_called_once_with(transaction=False)
+    assert [call.args for call in redis_mock.pipeline_mock.hget.call_args_list] == [
+        ('duid::fan::mode', 'value'),
+        ('duid::hvac::mode', 'value'),
+    ]
+
+
+def test_hget_many_only_fetches_fields_missing_from_local_cache():
+    redis_mock = _redis_mock()
+    redis_mock.pipeline_mock.execute.side_effect = [['1'], ['2']]
+    cache = RedisCache(redis_mock, local_cache=LocalCache({'*::mode': 60}))
+
+    assert cache.hget_many([('fan::mode', 'value')]) == ['1']
+    assert cache.hget_many([('fan::mode', 'value'), ('hvac::mode', 'value')]) == ['1', '2']
+    assert redis_mock.pipeline_mock.hget.call_args.args == ('hvac::mode', 'value')
+    assert redis_mock.pipeline_mock.hget.call_count == 2
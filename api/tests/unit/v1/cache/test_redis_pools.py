@@ -0,0 +1,70 @@
+from unittest.mock import patch
+
+import pytest
+from redis.connection import Connection
+
+from app.px.pxmetrics import PxMetrics
+from app.v1.cache.redis_pools import RedisConnectionPools
+
+
+@pytest.fixture
+def pools():
+    pools = RedisConnectionPools('localhost', 6379, max_connections=4)
+    # Connections are lent without reaching a server
+    with patch.object(Connection, 'connect'), patch.object(Connection, 'can_read', return_value=False):
+        yield pools
+    pools.close()
+
+
+def test_pools_are_created_lazily_and_shared_per_database(pools):
+    assert pools.stats() == {}
+
+    pool = pools.get_pool(1)
+
+    assert pools.get_pool(1) is pool
+    assert pools.get_pool(2) is not pool
+    assert pools.get_client(1).connection_pool is pool
+    assert pool.max_connections == 4
+    assert pool.connection_kwargs['db'] == 1
+
+
+def test_stats_count_created_idle_and_in_use_connections(pools):
+    pool = pools.get_pool(0)
+    pools.get_pool(3)
+
+    first = pool.get_connection('GET')
+    second = pool.get_connection('GET')
+    pool.release(first)
+
+    assert pools.stats() == {
+        'db0': {'max_connections': 4, 'created': 2, 'idle': 1, 'in_use': 1},
+        'db3': {'max_connections': 4, 'created': 0, 'idle': 0, 'in_use': 0},
+    }
+    # Idle connections are reused before new ones are created
+    pool.get_connection('GET')
+    assert pools.stats()['db0'] == {'max_connections': 4, 'created': 2, 'idle': 0, 'in_use': 2}
+    pool.release(second)
+
+
+def test_close_disconnects_and_forgets_pools(pools):
+    pool = pools.get_pool(0)
+    connection = pool.get_connection('GET')
+    pool.release(connection)
+
+    with patch.object(Connection, 'disconnect') as disconnect_mock:
+        pools.close()
+
+    disconnect_mock.assert_called_once()
+    assert pools.stats() == {}
+    assert pools.get_pool(0) is not pool
+
+
+def test_registered_stats_are_reported_as_a_gauge(pools):
+    metrics = PxMetrics()
+    pools.get_pool(0)
+
+    pools.register_metrics(metrics)
+    assert metrics.snapshot()['gauges'] == {'redis_connection_pools': pools.stats()}
+
+    pools.unregister_metrics(metrics)
+    assert metrics.snapshot()['gauges'] == {}
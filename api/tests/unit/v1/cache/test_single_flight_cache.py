@@ -0,0 +1,161 @@
+import json
+
+import pytest
+
+from app.px.pxmetrics import PxMetrics
+from app.v1.cache.in_memory_cache import InMemoryCache
+from app.v1.cache.single_flight_cache import SingleFlightCache
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+class _Compute:
+    def __init__(self, value: float, clock: _Clock, duration_seconds: float = 0.0) -> None:
+        self.value = value
+        self.calls = 0
+        self._clock = clock
+        self._duration_seconds = duration_seconds
+
+    def __call__(self) -> float:
+        self.calls += 1
+        self._clock.now += self._duration_seconds
+        return self.value
+
+
+@pytest.fixture
+def clock() -> _Clock:
+    return _Clock()
+
+
+@pytest.fixture
+def cache(clock: _Clock) -> InMemoryCache:
+    return InMemoryCache(clock=clock)
+
+
+def _single_flight_cache(cache: InMemoryCache, clock: _Clock, random_value: float = 0.0) -> SingleFlightCache:
+    return SingleFlightCache(
+        cache,
+        lock_timeout_seconds=30,
+        wait_timeout_seconds=1.0,
+        poll_interval_seconds=0.1,
+        clock=clock,
+        sleep=clock.sleep,
+        random_=lambda: random_value,
+        metrics=PxMetrics(),
+    )
+
+
+def test_computes_once_and_serves_cached_value(cache, clock):
+    single_flight_cache = _single_flight_cache(cache, clock)
+    compute = _Compute(12.5, clock)
+
+    assert single_flight_cache.get_or_compute('key', compute, ttl_seconds=60) == 12.5
+    assert single_flight_cache.get_or_compute('key', compute, ttl_seconds=60) == 12.5
+    assert compute.calls == 1
+    assert cache.get('key::lock') is None
+
+
+def test_serves_stale_value_while_lock_is_held(cache, clock):
+    single_flight_cache = _single_flight_cache(cache, clock)
+    single_flight_cache.get_or_compute('key', _Compute(1.0, clock), ttl_seconds=60, stale_for_seconds=60)
+    clock.now += 61
+    cache.set_if_absent('key::lock', 1, 30)
+
+    compute = _Compute(2.0, clock)
+    assert single_flight_cache.get_or_compute('key', compute, ttl_seconds=60, stale_for_seconds=60) == 1.0
+    assert compute.calls == 0
+
+
+def test_lock_holder_refreshes_stale_value(cache, clock):
+    single_flight_cache = _single_flight_cache(cache, clock)
+    single_flight_cache.get_or_compute('key', _Compute(1.0, clock), ttl_seconds=60, stale_for_seconds=60)
+    clock.now += 61
+
+    assert single_flight_cache.get_or_compute('key', _Compute(2.0, clock), ttl_seconds=60, stale_for_seconds=60) == 2.0
+    assert json.loads(cache.get('key'))['value'] == 2.0
+
+
+def test_refreshes_early_based_on_compute_time(cache, clock):
+    _single_flight_cache(cache, clock).get_or_compute('key', _Compute(1.0, clock, duration_seconds=10), ttl_seconds=60)
+    clock.now += 50
+
+    # -10s * log(1 - 0.9) is ~23s of jitter, which puts the value past its expiry
+    early = _single_flight_cache(cache, clock, random_value=0.9)
+    assert early.get_or_compute('key', _Compute(2.0, clock), ttl_seconds=60) == 2.0
+
+    clock.now += 50
+    # -0s * log(1 - 0) adds no jitter, so the refreshed value is still fresh
+    not_early = _single_flight_cache(cache, clock, random_value=0.0)
+    assert not_early.get_or_compute('key', _Compute(3.0, clock), ttl_seconds=60) == 2.0
+
+
+def test_waits_for_lock_holder_on_cold_miss(cache, clock):
+    single_flight_cache = _single_flight_cache(cache, clock)
+    cache.set_if_absent('key::lock', 1, 30)
+
+    def sleep(seconds: float) -> None:
+        clock.now += seconds
+        # The lock holder finishes while we wait
+        cache.set('key', json.dumps({'value': 5.0, 'stale_at': clock.now + 60, 'compute_seconds': 1.0}))
+
+    single_flight_cache._sleep = sleep
+    compute = _Compute(6.0, clock)
+    assert single_flight_cache.get_or_compute('key', compute, ttl_seconds=60) == 5.0
+    assert compute.calls == 0
+
+
+def test_computes_after_wait_timeout(cache, clock):
+    single_flight_cache = _single_flight_cache(cache, clock)
+    cache.set_if_absent('key::lock', 1, 30)
+    compute = _Compute(6.0, clock)
+
+    assert single_flight_cache.get_or_compute('key', compute, ttl_seconds=60) == 6.0
+    assert compute.calls == 1
+    # The lock belongs to someone else, so it is left alone
+    assert cache.get('key::lock') == '1'
+
+
+def test_releases_lock_when_compute_fails(cache, clock):
+    single_flight_cache = _single_flight_cache(cache, clock)
+
+    def compute() -> float:
+        raise RuntimeError('failed')
+
+    with pytest.raises(RuntimeError):
+        single_flight_cache.get_or_compute('key', compute, ttl_seconds=60)
+    assert cache.get('key::lock') is None
+
+
+def test_ignores_values_in_other_formats(cache, clock):
+    single_flight_cache = _single_flight_cache(cache, clock)
+    cache.set('key', 12.5)
+
+    assert single_flight_cache.get_or_compute('key', _Compute(13.0, clock), ttl_seconds=60) == 13.0
+
+
+def test_get_or_compute_many_only_computes_missing_keys(cache, clock):
+    single_flight_cache = _single_flight_cache(cache, clock)
+    single_flight_cache.get_or_compute('b', _Compute(2.0, clock), ttl_seconds=60)
+    cache.set_if_absent('c::lock', 1, 30)
+    cache.set('c', json.dumps({'value': 3.0, 'stale_at': clock.now - 1, 'compute_seconds': 1.0}))
+    computed_indexes = []
+
+    def compute(indexes):
+        computed_indexes.append(indexes)
+        return [10.0 + index for index in indexes]
+
+    assert single_flight_cache.get_or_compute_many(['a', 'b', 'c', 'd'], compute, ttl_seconds=60) == [10.0, 2.0, 3.0, 13.0]
+    # One compute for both misses, the stale value is served while someone else refreshes it
+    assert computed_indexes == [[0, 3]]
+    assert json.loads(cache.get('d'))['value'] == 13.0
+    assert cache.get('a::lock') is None
+    assert cache.get('c::lock') == '1'
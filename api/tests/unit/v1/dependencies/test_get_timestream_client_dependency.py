@@ -0,0 +1,34 @@
+from unittest.mock import Mock, patch
+
+import pytest
+
+from app.v1.dependencies import get_timestream_client
+
+
+@pytest.fixture
+def boto3_client_mock():
+    get_timestream_client.cache_clear()
+    with patch('app.v1.dependencies.boto3.client', return_value=Mock()) as boto3_client_mock:
+        yield boto3_client_mock
+    get_timestream_client.cache_clear()
+
+
+def test_get_timestream_client_is_memoised(boto3_client_mock):
+    timestream_client = get_timestream_client()
+
+    assert get_timestream_client() is timestream_client
+    boto3_client_mock.assert_called_once()
+    assert timestream_client.query_client is boto3_client_mock.return_value
+
+
+def test_get_timestream_client_configures_pool_timeouts_and_retries(boto3_client_mock):
+    get_timestream_client()
+
+    kwargs = boto3_client_mock.call_args.kwargs
+    assert kwargs['service_name'] == 'timestream-query'
+    config = kwargs['config']
+    assert config.max_pool_connections == 50
+    assert config.connect_timeout == 5
+    assert config.read_timeout == 30
+    assert config.retries == {'max_attempts': 3, 'mode': 'standard'}
+    assert config.endpoint_discovery_enabled is True
@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock
+from uuid import uuid4
+
+from app.v1.cache.in_memory_cache import InMemoryCache
+from app.v1.devices.repositories.location_devices_repository import LocationDevice, LocationDevicesRepository, LocationGateway
+from app.v1.devices.services.device_status_service import DeviceStatusService
+
+
+def test_get_location_statuses_loads_devices_of_all_locations_at_once():
+    location_id, other_location_id, empty_location_id = uuid4(), uuid4(), uuid4()
+    location_devices_repository = Mock(spec=LocationDevicesRepository)
+    location_devices_repository.get_devices_for_locations.return_value = {
+        location_id: [LocationDevice(device_duid='device-1', location_id=location_id)],
+        other_location_id: [LocationDevice(device_duid='device-2', location_id=other_location_id)],
+        empty_location_id: [],
+    }
+    location_devices_repository.get_gateways_for_locations.return_value = {
+        location_id: [LocationGateway(gateway_duid='gateway-1')],
+        other_location_id: [],
+        empty_location_id: [],
+    }
+    now = datetime.now(timezone.utc)
+    cache = InMemoryCache()
+    cache.hset('status::device::device-1', {'last_seen': now.isoformat(), 'rssi': -70, 'snr': 7.5, 'signal_strength': '4'})
+    cache.hset('status::gateway::gateway-1', {'last_seen': (now - timedelta(hours=1)).isoformat()})
+    service = DeviceStatusService(cache, location_devices_repository)
+
+    statuses = service.get_location_statuses([location_id, other_location_id, empty_location_id])
+
+    location_devices_repository.get_devices_for_locations.assert_called_once_with([location_id, other_location_id, empty_location_id])
+    location_devices_repository.get_gateways_for_locations.assert_called_once_with([location_id, other_location_id, empty_location_id])
+    device_status = statuses[location_id].devices['device-1']
+    assert device_status is not None and device_status.status == 'online' and device_status.signal_strength == 4
+    gateway_status = statuses[location_id].gateways['gateway-1']
+    assert gateway_status is not None and gateway_status.status == 'offline'
+    assert statuses[other_location_id].devices == {'device-2': None}
+    assert statuses[other_location_id].gateways == {}
+    assert statuses[empty_location_id].devices == {}
@@ -0,0 +1,32 @@
+from app.v1.dp_pes.client import DpPesClient
+
+
+def _mounted_retry(client: DpPesClient):
+    return client.session.get_adapter('https://dp-pes.example.com/').max_retries
+
+
+def test_retries_connection_errors_but_not_read_timeouts():
+    client = DpPesClient('https://dp-pes.example.com/', 'apikey', max_retries=3)
+
+    retry = _mounted_retry(client)
+
+    assert retry.total == 3
+    assert retry.connect == 3
+    assert retry.read == 0
+    assert client.session.get_adapter('http://dp-pes.example.com/').max_retries is retry
+
+
+def test_retries_get_on_5xx():
+    retry = _mounted_retry(DpPesClient('https://dp-pes.example.com/', 'apikey'))
+
+    assert all(retry.is_retry('GET', status_code) for status_code in (500, 502, 503, 504))
+    assert not retry.is_retry('GET', 404)
+
+
+def test_retries_post_only_on_503():
+    retry = _mounted_retry(DpPesClient('https://dp-pes.example.com/', 'apikey'))
+
+    assert retry.is_retry('POST', 503)
+    assert not any(retry.is_retry('POST', status_code) for status_code in (500, 502, 504))
+    # The policy is kept by the retries urllib3 derives from it
+    assert not retry.increment('POST', '/thermostat/hold').is_retry('POST', 500)
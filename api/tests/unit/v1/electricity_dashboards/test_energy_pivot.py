@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from app.v1.electricity_dashboards.energy_pivot import CircuitEnergyPivot
+from app.v1.timestream.schemas.circuit_energy_usage import CircuitEnergyUsage
+from app.v1.timestream.schemas.energy_usage import EnergyUsage
+
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _usage(circuit_id, kwh: float) -> CircuitEnergyUsage:
+    return CircuitEnergyUsage(circuit_id=circuit_id, usage=EnergyUsage(kwh=kwh, money=kwh / 10))
+
+
+def test_pivot_sums_mains_and_branches_per_group():
+    main, first_branch, second_branch = uuid4(), uuid4(), uuid4()
+    pivot = CircuitEnergyPivot([START, START + timedelta(hours=1)], [main], [first_branch, second_branch])
+
+    pivot.add(0, _usage(main, 10.0))
+    pivot.add(0, _usage(first_branch, 3.0))
+    pivot.add(1, _usage(main, 4.0))
+    pivot.add(1, _usage(second_branch, 1.0))
+    pivot.add(1, _usage(uuid4(), 100.0))
+
+    assert pivot.mains_kwh() == [10.0, 4.0]
+    assert pivot.branches_kwh() == [3.0, 1.0]
+    assert list(pivot.group_branches_kwh(0)) == [(first_branch, 3.0)]
+    assert list(pivot.group_branches_kwh(1)) == [(second_branch, 1.0)]
+
+
+def test_pivot_totals_over_groups():
+    main, branch, idle_branch = uuid4(), uuid4(), uuid4()
+    pivot = CircuitEnergyPivot([START, START + timedelta(hours=1)], [main], [branch, idle_branch])
+    for group in range(2):
+        pivot.add(group, _usage(main, 10.0))
+        pivot.add(group, _usage(branch, 2.0))
+
+    assert pivot.mains_usage() == EnergyUsage(kwh=20.0, money=2.0)
+    assert pivot.branches_usage() == EnergyUsage(kwh=4.0, money=0.4)
+    assert pivot.branch_usages() == [EnergyUsage(kwh=4.0, money=0.4), EnergyUsage(kwh=0.0, money=0.0)]
+
+
+def test_pivot_counts_circuits_listed_as_main_and_branch_as_mains():
+    circuit_id = uuid4()
+    pivot = CircuitEnergyPivot([START], [circuit_id], [circuit_id])
+
+    pivot.add(0, _usage(circuit_id, 5.0))
+
+    assert pivot.mains_kwh() == [5.0]
+    assert pivot.branches_kwh() == [0.0]
+    assert list(pivot.group_branches_kwh(0)) == []
+
+
+def test_pivot_without_groups():
+    pivot = CircuitEnergyPivot([], [uuid4()], [uuid4()])
+
+    assert pivot.branch_usages() == [EnergyUsage(kwh=0.0, money=0.0)]
+    assert pivot.mains_usage() == EnergyUsage(kwh=0.0, money=0.0)
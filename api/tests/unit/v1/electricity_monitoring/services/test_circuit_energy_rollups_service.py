@@ -0,0 +1,126 @@
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import Mock
+from uuid import uuid4
+
+import pytest
+
+from app.v1.electricity_monitoring.repositories.circuit_energy_rollups_repository import CircuitEnergyRollupsRepository
+from app.v1.electricity_monitoring.schemas.circuit_energy_rollup import CircuitEnergyRollupProgress
+from app.v1.electricity_monitoring.services.circuit_energy_rollups import CircuitEnergyRollupsService
+from app.v1.timestream.services.circuit_measurements_service import TimestreamElectricityCircuitMeasurementsService
+
+
+@pytest.fixture
+def circuit_energy_rollups_repository_mock():
+    repository = Mock(spec=CircuitEnergyRollupsRepository)
+    repository.get_progress.return_value = {}
+    return repository
+
+
+@pytest.fixture
+def circuit_measurements_service_mock():
+    service = Mock(spec=TimestreamElectricityCircuitMeasurementsService)
+    service.iter_hourly_circuits_energy_rollups.return_value = iter([])
+    return service
+
+
+def test_roll_up_backfills_in_chunks(circuit_energy_rollups_repository_mock, circuit_measurements_service_mock):
+    circuit_id = uuid4()
+    service = CircuitEnergyRollupsService(circuit_energy_rollups_repository_mock, circuit_measurements_service_mock, chunk_size=timedelta(days=2))
+
+    service.roll_up_location_circuits(
+        circuit_ids=[circuit_id],
+        location_timezone='America/New_York',
+        backfill_from=datetime(2024, 3, 1, 5, 30, tzinfo=timezone.utc),
+        roll_up_until=datetime(2024, 3, 4, 12, 45, tzinfo=timezone.utc)
+    )
+
+    assert [
+        (call.kwargs['start_datetime'], call.kwargs['end_datetime'] + timedelta(microseconds=1))
+        for call in circuit_measurements_service_mock.iter_hourly_circuits_energy_rollups.call_args_list
+    ] == [
+        (datetime(2024, 3, 1, 5, tzinfo=timezone.utc), datetime(2024, 3, 3, 5, tzinfo=timezone.utc)),
+        (datetime(2024, 3, 3, 5, tzinfo=timezone.utc), datetime(2024, 3, 4, 12, tzinfo=timezone.utc)),
+    ]
+    assert [
+        (call.kwargs['first_day'], call.kwargs['last_day'])
+        for call in circuit_energy_rollups_repository_mock.refresh_daily_rollups.call_args_list
+    ] == [(date(2024, 3, 1), date(2024, 3, 2)), (date(2024, 3, 3), date(2024, 3, 4))]
+    assert circuit_energy_rollups_repository_mock.save_progress.call_args_list[-1].args[0] == [
+        CircuitEnergyRollupProgress(
+            circuit_id=circuit_id,
+            timezone='America/New_York',
+            hourly_rolled_up_until=datetime(2024, 3, 4, 12, tzinfo=timezone.utc),
+            daily_rolled_up_until=datetime(2024, 3, 4, 5, tzinfo=timezone.utc)
+        )
+    ]
+
+
+def test_roll_up_resumes_from_least_advanced_circuit(circuit_energy_rollups_repository_mock, circuit_measurements_service_mock):
+    circuit_ids = [uuid4(), uuid4()]
+    circuit_energy_rollups_repository_mock.get_progress.return_value = {
+        circuit_id: CircuitEnergyRollupProgress(
+            circuit_id=circuit_id,
+            timezone='UTC',
+            hourly_rolled_up_until=hourly_rolled_up_until,
+            daily_rolled_up_until=datetime(2024, 3, 4, tzinfo=timezone.utc)
+        )
+        for circuit_id, hourly_rolled_up_until in zip(circuit_ids, [datetime(2024, 3, 4, 9, tzinfo=timezone.utc), datetime(2024, 3, 4, 11, tzinfo=timezone.utc)])
+    }
+    service = CircuitEnergyRollupsService(circuit_energy_rollups_repository_mock, circuit_measurements_service_mock)
+
+    service.roll_up_location_circuits(
+        circuit_ids=circuit_ids,
+        location_timezone='UTC',
+        backfill_from=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        roll_up_until=datetime(2024, 3, 4, 12, 45, tzinfo=timezone.utc)
+    )
+
+    circuit_measurements_service_mock.iter_hourly_circuits_energy_rollups.assert_called_once_with(
+        circuit_ids=circuit_ids,
+        start_datetime=datetime(2024, 3, 4, 9, tzinfo=timezone.utc),
+        end_datetime=datetime(2024, 3, 4, 12, tzinfo=timezone.utc) - timedelta(microseconds=1)
+    )
+
+
+def test_roll_up_does_nothing_when_up_to_date(circuit_energy_rollups_repository_mock, circuit_measurements_service_mock):
+    circuit_id = uuid4()
+    circuit_energy_rollups_repository_mock.get_progress.return_value = {
+        circuit_id: CircuitEnergyRollupProgress(
+            circuit_id=circuit_id,
+            timezone='UTC',
+            hourly_rolled_up_until=datetime(2024, 3, 4, 12, tzinfo=timezone.utc),
+            daily_rolled_up_until=datetime(2024, 3, 4, tzinfo=timezone.utc)
+        )
+    }
+    service = CircuitEnergyRollupsService(circuit_energy_rollups_repository_mock, circuit_measurements_service_mock)
+
+    service.roll_up_location_circuits([circuit_id], 'UTC', datetime(2024, 1, 1, tzinfo=timezone.utc), datetime(2024, 3, 4, 12, 45, tzinfo=timezone.utc))
+
+    circuit_measurements_service_mock.iter_hourly_circuits_energy_rollups.assert_not_called()
+    circuit_energy_rollups_repository_mock.save_progress.assert_not_called()
+
+
+def test_roll_up_moves_circuits_rolled_up_past_the_lag_back(circuit_energy_rollups_repository_mock, circuit_measurements_service_mock):
+    circuit_id = uuid4()
+    circuit_energy_rollups_repository_mock.get_progress.return_value = {
+        circuit_id: CircuitEnergyRollupProgress(
+            circuit_id=circuit_id,
+            timezone='America/New_York',
+            hourly_rolled_up_until=datetime(2024, 3, 4, 12, tzinfo=timezone.utc),
+            daily_rolled_up_until=datetime(2024, 3, 4, 5, tzinfo=timezone.utc)
+        )
+    }
+    service = CircuitEnergyRollupsService(circuit_energy_rollups_repository_mock, circuit_measurements_service_mock)
+
+    service.roll_up_location_circuits([circuit_id], 'America/New_York', datetime(2024, 1, 1, tzinfo=timezone.utc), datetime(2024, 3, 4, 6, 45, tzinfo=timezone.utc))
+
+    circuit_measurements_service_mock.iter_hourly_circuits_energy_rollups.assert_not_called()
+    circuit_energy_rollups_repository_mock.save_progress.assert_called_once_with([
+        CircuitEnergyRollupProgress(
+            circuit_id=circuit_id,
+            timezone='America/New_York',
+            hourly_rolled_up_until=datetime(2024, 3, 4, 6, tzinfo=timezone.utc),
+            daily_rolled_up_until=datetime(2024, 3, 4, 5, tzinfo=timezone.utc)
+        )
+    ])
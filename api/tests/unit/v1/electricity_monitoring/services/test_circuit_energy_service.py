@@ -0,0 +1,191 @@
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import Mock
+from uuid import uuid4
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from app.v1.electricity_dashboards.schemas.energy_load_curve_electric_widget import EnergyLoadCurveElectricWidgetGroupByUnit
+from app.v1.electricity_monitoring.repositories.circuit_energy_rollups_repository import CircuitEnergyRollupsRepository
+from app.v1.electricity_monitoring.schemas.circuit_energy_rollup import CircuitDailyEnergyRollup, CircuitEnergyRollupProgress, CircuitHourlyEnergyRollup
+from app.v1.electricity_monitoring.services.circuit_energy import CircuitEnergyService
+from app.v1.timestream.schemas.circuit_energy_usage import CircuitEnergyUsage
+from app.v1.timestream.schemas.energy_usage import EnergyUsage
+from app.v1.timestream.services.circuit_measurements_service import TimestreamElectricityCircuitMeasurementsService
+
+
+_TIMEZONE = 'America/New_York'
+_TZ = ZoneInfo(_TIMEZONE)
+
+
+def _local(*args) -> datetime:
+    return datetime(*args, tzinfo=_TZ).astimezone(timezone.utc)
+
+
+@pytest.fixture
+def circuit_energy_rollups_repository_mock():
+    return Mock(spec=CircuitEnergyRollupsRepository)
+
+
+@pytest.fixture
+def circuit_measurements_service_mock():
+    return Mock(spec=TimestreamElectricityCircuitMeasurementsService)
+
+
+@pytest.fixture
+def circuit_energy_service(circuit_energy_rollups_repository_mock, circuit_measurements_service_mock):
+    return CircuitEnergyService(circuit_energy_rollups_repository_mock, circuit_measurements_service_mock)
+
+
+def _progress(circuit_id, hourly_rolled_up_until: datetime, daily_rolled_up_until: datetime, tz: str = _TIMEZONE) -> CircuitEnergyRollupProgress:
+    return CircuitEnergyRollupProgress(
+        circuit_id=circuit_id,
+        timezone=tz,
+        hourly_rolled_up_until=hourly_rolled_up_until,
+        daily_rolled_up_until=daily_rolled_up_until
+    )
+
+
+def _hourly_rollup(circuit_id, *local_hour: int, kwh: float = 1.0) -> CircuitHourlyEnergyRollup:
+    return CircuitHourlyEnergyRollup(
+        circuit_id=circuit_id,
+        hour_start=_local(*local_hour),
+        local_hour_start=datetime(*local_hour),
+        kwh=kwh,
+        money=kwh / 10
+    )
+
+
+def test_get_energy_table_circuits_energy_uses_daily_rollups_for_whole_days(circuit_energy_service, circuit_energy_rollups_repository_mock, circuit_measurements_service_mock):
+    circuit_id = uuid4()
+    circuit_energy_rollups_repository_mock.get_progress.return_value = {circuit_id: _progress(circuit_id, _local(2024, 3, 12, 9), _local(2024, 3, 12))}
+
+    circuit_energy_service.get_energy_table_circuits_energy([circuit_id], _local(2024, 3, 4), _local(2024, 3, 11) - timedelta(microseconds=1))
+
+    circuit_energy_rollups_repository_mock.sum_daily_rollups.assert_called_once_with(
+        circuit_ids=[circuit_id],
+        first_day=date(2024, 3, 4),
+        last_day=date(2024, 3, 10)
+    )
+    circuit_measurements_service_mock.get_energy_table_circuits_energy.assert_not_called()
+
+
+def test_get_energy_table_circuits_energy_uses_hourly_rollups_for_whole_hours(circuit_energy_service, circuit_energy_rollups_repository_mock, circuit_measurements_service_mock):
+    circuit_id = uuid4()
+    circuit_energy_rollups_repository_mock.get_progress.return_value = {circuit_id: _progress(circuit_id, _local(2024, 3, 12, 9), _local(2024, 3, 12))}
+
+    circuit_energy_service.get_energy_table_circuits_energy([circuit_id], _local(2024, 3, 1), _local(2024, 3, 12, 9))
+
+    circuit_energy_rollups_repository_mock.sum_hourly_rollups.assert_called_once_with(
+        circuit_ids=[circuit_id],
+        start_datetime=_local(2024, 3, 1),
+        end_datetime=_local(2024, 3, 12, 9)
+    )
+    circuit_measurements_service_mock.get_energy_table_circuits_energy.assert_not_called()
+
+
+@pytest.mark.parametrize('start_datetime, end_datetime, progress_timezones', [
+    # Not rolled up far enough
+    (_local(2024, 3, 1), _local(2024, 3, 12, 10), [_TIMEZONE]),
+    # Not on whole hours
+    (_local(2024, 3, 1, 0, 30), _local(2024, 3, 12, 9), [_TIMEZONE]),
+    (_local(2024, 3, 1), _local(2024, 3, 12, 8, 30), [_TIMEZONE]),
+    # Circuits in different timezones
+    (_local(2024, 3, 1), _local(2024, 3, 12, 9), [_TIMEZONE, 'Europe/Paris']),
+    # Circuit never rolled up
+    (_local(2024, 3, 1), _local(2024, 3, 12, 9), []),
+])
+def test_get_energy_table_circuits_energy_falls_back_to_timestream(circuit_energy_service, circuit_energy_rollups_repository_mock, circuit_measurements_service_mock, start_datetime, end_datetime, progress_timezones):
+    circuit_ids = [uuid4(), uuid4()]
+    circuit_energy_rollups_repository_mock.get_progress.return_value = {
+        circuit_id: _progress(circuit_id, _local(2024, 3, 12, 9), _local(2024, 3, 12), tz)
+        for circuit_id, tz in zip(circuit_ids, progress_timezones * 2 if len(progress_timezones) == 1 else progress_timezones)
+    }
+
+    circuit_energy_service.get_energy_table_circuits_energy(circuit_ids, start_datetime, end_datetime)
+
+    circuit_measurements_service_mock.get_energy_table_circuits_energy.assert_called_once_with(
+        circuit_ids=circuit_ids,
+        start_datetime=start_datetime,
+        end_datetime=end_datetime
+    )
+    circuit_energy_rollups_repository_mock.sum_hourly_rollups.assert_not_called()
+    circuit_energy_rollups_repository_mock.sum_daily_rollups.assert_not_called()
+
+
+def test_get_grouped_circuits_energy_bins_hourly_rollups_like_timestream(circuit_energy_service, circuit_energy_rollups_repository_mock):
+    circuit_id = uuid4()
+    circuit_energy_rollups_repository_mock.get_progress.return_value = {circuit_id: _progress(circuit_id, _local(2024, 3, 12, 9), _local(2024, 3, 12))}
+    circuit_energy_rollups_repository_mock.get_hourly_rollups.return_value = [
+        _hourly_rollup(circuit_id, 2024, 3, 10, hour) for hour in (0, 1, 3, 4, 5)
+    ]
+
+    measures = circuit_energy_service.get_grouped_circuits_energy(
+        [circuit_id], _local(2024, 3, 10), _local(2024, 3, 10, 6) - timedelta(microseconds=1), EnergyLoadCurveElectricWidgetGroupByUnit.hours, 3
+    )
+
+    # DST starts at 02:00 on the 10th, so the 03:00 bin is on UTC-4
+    assert [(measure.start, measure.usage.usage.kwh) for measure in measures] == [
+        (datetime(2024, 3, 10, 5, tzinfo=timezone.utc), 2.0),
+        (datetime(2024, 3, 10, 7, tzinfo=timezone.utc), 3.0),
+    ]
+
+
+def test_get_grouped_circuits_energy_uses_daily_rollups_for_whole_days(circuit_energy_service, circuit_energy_rollups_repository_mock):
+    circuit_ids = [uuid4(), uuid4()]
+    circuit_energy_rollups_repository_mock.get_progress.return_value = {
+        circuit_id: _progress(circuit_id, _local(2024, 3, 12, 9), _local(2024, 3, 12)) for circuit_id in circuit_ids
+    }
+    circuit_energy_rollups_repository_mock.get_daily_rollups.return_value = [
+        CircuitDailyEnergyRollup(circuit_id=circuit_id, day=date(2024, 3, day), day_start=_local(2024, 3, day), kwh=day, money=0.0)
+        for day in (9, 10, 11) for circuit_id in circuit_ids
+    ]
+
+    measures = circuit_energy_service.get_grouped_circuits_energy(
+        circuit_ids, _local(2024, 3, 9), _local(2024, 3, 12) - timedelta(microseconds=1), EnergyLoadCurveElectricWidgetGroupByUnit.days, 1
+    )
+
+    circuit_energy_rollups_repository_mock.get_daily_rollups.assert_called_once_with(
+        circuit_ids=circuit_ids,
+        first_day=date(2024, 3, 9),
+        last_day=date(2024, 3, 11)
+    )
+    assert [(measure.start, measure.usage.circuit_id, measure.usage.usage.kwh) for measure in measures] == [
+        (_local(2024, 3, day), circuit_id, day) for day in (9, 10, 11) for circuit_id in circuit_ids
+    ]
+
+
+def test_get_grouped_circuits_energy_queries_timestream_for_minutes(circuit_energy_service, circuit_energy_rollups_repository_mock, circuit_measurements_service_mock):
+    circuit_id = uuid4()
+
+    circuit_energy_service.get_grouped_circuits_energy(
+        [circuit_id], _local(2024, 3, 10), _local(2024, 3, 11), EnergyLoadCurveElectricWidgetGroupByUnit.minutes, 15
+    )
+
+    circuit_measurements_service_mock.get_grouped_circuits_energy.assert_called_once()
+    circuit_energy_rollups_repository_mock.get_progress.assert_not_called()
+
+
+def test_get_total_energy_for_windows_queries_timestream_once_for_uncovered_windows(circuit_energy_service, circuit_energy_rollups_repository_mock, circuit_measurements_service_mock):
+    circuit_id = uuid4()
+    circuit_energy_rollups_repository_mock.get_progress.return_value = {circuit_id: _progress(circuit_id, _local(2024, 3, 12, 9), _local(2024, 3, 12))}
+    circuit_energy_rollups_repository_mock.sum_daily_rollups.return_value = [
+        CircuitEnergyUsage(circuit_id=circuit_id, usage=EnergyUsage(kwh=4.0, money=0.4))
+    ]
+    circuit_measurements_service_mock.get_total_energy_for_windows.return_value = [
+        EnergyUsage(kwh=1.0, money=0.1), EnergyUsage(kwh=2.0, money=0.2)
+    ]
+    windows = [
+        (_local(2024, 3, 11), _local(2024, 3, 12, 10)),
+        (_local(2024, 3, 10), _local(2024, 3, 11) - timedelta(microseconds=1)),
+        (_local(2024, 3, 12), _local(2024, 3, 12, 10)),
+    ]
+
+    usages = circuit_energy_service.get_total_energy_for_windows([circuit_id], windows)
+
+    assert [usage.kwh for usage in usages] == [1.0, 4.0, 2.0]
+    circuit_energy_rollups_repository_mock.get_progress.assert_called_once()
+    circuit_measurements_service_mock.get_total_energy_for_windows.assert_called_once_with(
+        circuit_ids=[circuit_id],
+        windows=[windows[0], windows[2]]
+    )
@@ -0,0 +1,100 @@
+from datetime import date, datetime, timezone
+from unittest.mock import Mock
+from uuid import uuid4
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from app.v1.cache.in_memory_cache import InMemoryCache
+from app.v1.electricity_monitoring.services.circuit_energy import CircuitEnergyService
+from app.v1.electricity_monitoring.services.location_energy_usage import LocationEnergyUsageService
+from app.v1.timestream.schemas.circuit_energy_usage import CircuitEnergyUsage
+from app.v1.timestream.schemas.energy_usage import EnergyUsage
+from app.v1.timestream.schemas.grouped_circuit_energy_usage_mesaure import GroupedCircuitEnergyUsageMeasure
+
+
+_TIMEZONE = 'America/New_York'
+
+
+def _usage(circuit_id, kwh: float) -> CircuitEnergyUsage:
+    return CircuitEnergyUsage(circuit_id=circuit_id, usage=EnergyUsage(kwh=kwh, money=0.0))
+
+
+def _daily_measure(circuit_id, day: int, kwh: float) -> GroupedCircuitEnergyUsageMeasure:
+    return GroupedCircuitEnergyUsageMeasure(
+        start=datetime(2024, 3, day, tzinfo=ZoneInfo(_TIMEZONE)).astimezone(timezone.utc),
+        usage=_usage(circuit_id, kwh)
+    )
+
+
+@pytest.fixture
+def circuit_energy_service_mock():
+    return Mock(spec=CircuitEnergyService)
+
+
+def test_get_month_to_date_kwh_queries_closed_days_once(circuit_energy_service_mock):
+    circuit_id = uuid4()
+    location_id = uuid4()
+    # The 10th is the DST change, its bin starts at 05:00 UTC on the 10th and 04:00 UTC on the 11th
+    circuit_energy_service_mock.get_grouped_circuits_energy.return_value = [
+        _daily_measure(circuit_id, day, 1.0) for day in range(1, 12)
+    ]
+    circuit_energy_service_mock.get_energy_table_circuits_energy.return_value = [_usage(circuit_id, 0.5)]
+    service = LocationEnergyUsageService(circuit_energy_service_mock, InMemoryCache())
+    end_datetime = datetime(2024, 3, 12, 10, tzinfo=ZoneInfo(_TIMEZONE)).astimezone(timezone.utc)
+
+    assert service.get_month_to_date_kwh(location_id, _TIMEZONE, [circuit_id], end_datetime) == 11.5
+    grouped_call = circuit_energy_service_mock.get_grouped_circuits_energy.call_args.kwargs
+    assert grouped_call['start_datetime'] == datetime(2024, 3, 1, 5, tzinfo=timezone.utc)
+    assert grouped_call['end_datetime'] == datetime(2024, 3, 12, 3, 59, 59, 999999, tzinfo=timezone.utc)
+    today_call = circuit_energy_service_mock.get_energy_table_circuits_energy.call_args.kwargs
+    assert today_call['start_datetime'] == datetime(2024, 3, 12, 4, tzinfo=timezone.utc)
+    assert today_call['end_datetime'] == end_datetime
+
+    circuit_energy_service_mock.get_grouped_circuits_energy.reset_mock()
+    assert service.get_month_to_date_kwh(location_id, _TIMEZONE, [circuit_id], end_datetime) == 11.5
+    circuit_energy_service_mock.get_grouped_circuits_energy.assert_not_called()
+
+
+def test_get_month_to_date_kwh_only_queries_missing_days(circuit_energy_service_mock):
+    circuit_id = uuid4()
+    location_id = uuid4()
+    cache = InMemoryCache()
+    service = LocationEnergyUsageService(circuit_energy_service_mock, cache)
+    cache.mset({service._daily_total_key(location_id, [circuit_id], date(2024, 3, day)): 2.0 for day in (1, 2)})
+    circuit_energy_service_mock.get_grouped_circuits_energy.return_value = [_daily_measure(circuit_id, 3, 1.5)]
+    circuit_energy_service_mock.get_energy_table_circuits_energy.return_value = []
+    end_datetime = datetime(2024, 3, 5, 10, tzinfo=ZoneInfo(_TIMEZONE)).astimezone(timezone.utc)
+
+    # The 4th has no data and counts as zero
+    assert service.get_month_to_date_kwh(location_id, _TIMEZONE, [circuit_id], end_datetime) == 5.5
+    grouped_call = circuit_energy_service_mock.get_grouped_circuits_energy.call_args.kwargs
+    assert grouped_call['start_datetime'] == datetime(2024, 3, 3, 5, tzinfo=timezone.utc)
+    assert cache.get(service._daily_total_key(location_id, [circuit_id], date(2024, 3, 4))) == '0.0'
+    # Totals of another set of circuits are not reused
+    assert cache.get(service._daily_total_key(location_id, [circuit_id, uuid4()], date(2024, 3, 4))) is None
+
+
+def test_get_month_to_date_kwh_on_first_day_of_month(circuit_energy_service_mock):
+    circuit_id = uuid4()
+    circuit_energy_service_mock.get_energy_table_circuits_energy.return_value = [_usage(circuit_id, 0.5), _usage(uuid4(), 0.25)]
+    service = LocationEnergyUsageService(circuit_energy_service_mock, InMemoryCache())
+    end_datetime = datetime(2024, 3, 1, 10, tzinfo=ZoneInfo(_TIMEZONE)).astimezone(timezone.utc)
+
+    assert service.get_month_to_date_kwh(uuid4(), _TIMEZONE, [circuit_id], end_datetime) == 0.75
+    circuit_energy_service_mock.get_grouped_circuits_energy.assert_not_called()
+
+
+def test_get_month_to_date_kwh_queries_yesterday_live_until_it_settles(circuit_energy_service_mock):
+    circuit_id = uuid4()
+    circuit_energy_service_mock.get_grouped_circuits_energy.return_value = [_daily_measure(circuit_id, day, 1.0) for day in range(1, 5)]
+    circuit_energy_service_mock.get_energy_table_circuits_energy.return_value = [_usage(circuit_id, 0.5)]
+    cache = InMemoryCache()
+    service = LocationEnergyUsageService(circuit_energy_service_mock, cache)
+    end_datetime = datetime(2024, 3, 6, 5, 30, tzinfo=ZoneInfo(_TIMEZONE)).astimezone(timezone.utc)
+
+    assert service.get_month_to_date_kwh(uuid4(), _TIMEZONE, [circuit_id], end_datetime) == 4.5
+    grouped_call = circuit_energy_service_mock.get_grouped_circuits_energy.call_args.kwargs
+    assert grouped_call['end_datetime'] == datetime(2024, 3, 5, 4, 59, 59, 999999, tzinfo=timezone.utc)
+    live_call = circuit_energy_service_mock.get_energy_table_circuits_energy.call_args.kwargs
+    assert live_call['start_datetime'] == datetime(2024, 3, 5, 5, tzinfo=timezone.utc)
@@ -0,0 +1,73 @@
+from datetime import datetime, timezone
+from unittest.mock import Mock
+
+from app.v1.cache.in_memory_cache import InMemoryCache
+from app.v1.hvac.schemas.thermostat import ThermostatHvacFanMode, ThermostatHvacMode, ThermostatLockoutType, ThermostatStatus
+from app.v1.hvac_dashboards.services.control_zone_hvac_widgets_service import (
+    ControlZoneHvacWidgetsService,
+    _VIRTUAL_DEVICE_STATE_FIELDS,
+    _parse_virtual_device_state
+)
+
+
+def test_parse_virtual_device_state():
+    state = _parse_virtual_device_state(
+        {
+            'fan::mode': '1',
+            'hvac::mode': '2',
+            'thermostat::status': '1',
+            'thermostat::setpointC': '21.5',
+            'room::temperatureC': '20.25',
+            'keypad::lockout': '2',
+            'auto::mode': '1',
+            'auto::heating-setpointC': '19',
+            'auto::cooling-setpointC': '24',
+        },
+        '1704067200000'
+    )
+
+    assert state.fan_mode == ThermostatHvacFanMode.AUTO
+    assert state.hvac_mode == ThermostatHvacMode.HEATING
+    assert state.thermostat_status == ThermostatStatus.ON
+    assert state.thermostat_setpoint_c == 21.5
+    assert state.room_temperature_c == 20.25
+    assert state.keypad_lockout == ThermostatLockoutType.UNLOCKED
+    assert state.auto_mode == 1
+    assert state.auto_heating_setpoint_c == 19.0
+    assert state.auto_cooling_setpoint_c == 24.0
+    assert state.activity == datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def test_parse_virtual_device_state_leaves_missing_and_unknown_values_unset():
+    values = {field: None for field in _VIRTUAL_DEVICE_STATE_FIELDS}
+    values['fan::mode'] = '0'
+    values['hvac::mode'] = '7'
+
+    state = _parse_virtual_device_state(values, None)
+
+    assert state.fan_mode == ThermostatHvacFanMode.ALWAYS_ON
+    assert state.hvac_mode is None
+    assert state.thermostat_status is None
+    assert state.keypad_lockout is None
+    assert state.auto_mode is None
+    assert state.activity is None
+
+
+def test_get_virtual_device_states_reads_every_thermostat_at_once():
+    cache = InMemoryCache()
+    cache.hset('duid-1::thermostat::status', {'value': 0})
+    cache.hset('duid-2::thermostat::status', {'value': 1})
+    cache.hset('duid-2::room::temperatureC', {'value': 22})
+    consumer_cache = InMemoryCache()
+    consumer_cache.set('activity::duid-2', 1704067200000)
+    service = ControlZoneHvacWidgetsService(Mock(), Mock(), cache, consumer_cache)
+
+    states = service.get_virtual_device_states(['duid-1', 'duid-2', 'duid-3'])
+
+    assert states['duid-1'].thermostat_status == ThermostatStatus.OFF
+    assert states['duid-1'].activity is None
+    assert states['duid-2'].thermostat_status == ThermostatStatus.ON
+    assert states['duid-2'].room_temperature_c == 22.0
+    assert states['duid-2'].activity == datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert states['duid-3'].thermostat_status is None
+    assert service.get_virtual_device_state('duid-2') == states['duid-2']
@@ -0,0 +1,116 @@
+from datetime import datetime, timezone
+from typing import Callable, List
+from unittest.mock import Mock
+from uuid import uuid4
+
+import pytest
+
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.v1.dependencies import get_access_token_data, get_device_status_service
+from app.v1.devices.schemas import DeviceStatus, GatewayStatus, LocationStatus
+from app.v1.devices.services.device_status_service import DeviceStatusService
+from app.v1.locations.schemas.location import Location
+from app.v1.schemas import AccessScope, AccessTokenData
+
+
+test_client = TestClient(app)
+
+
+@pytest.fixture
+def device_status_service_mock():
+    return Mock(spec_set=DeviceStatusService)
+
+
+def test_get_locations_status_is_unauthorized_without_token():
+    response = test_client.get(f'/v1/locations/status?location_ids={uuid4()}')
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.parametrize(
+    ('access_scopes', 'response_code'),
+    [
+        ([AccessScope.ADMIN], status.HTTP_403_FORBIDDEN),
+        ([AccessScope.LOCATIONS_WRITE], status.HTTP_403_FORBIDDEN),
+        ([AccessScope.LOCATIONS_READ], status.HTTP_200_OK),
+        ([], status.HTTP_403_FORBIDDEN),
+    ]
+)
+def test_get_locations_status_access_scope_responses(
+    access_scopes: List[AccessScope],
+    response_code: int,
+    token_data_with_access_scopes: Callable,
+    device_status_service_mock: Mock,
+    location: Location
+):
+    token_data = token_data_with_access_scopes(access_scopes)
+    app.dependency_overrides[get_access_token_data] = lambda: token_data
+    device_status_service_mock.get_location_statuses.return_value = {
+        location.location_id: LocationStatus(devices={}, gateways={})
+    }
+    app.dependency_overrides[get_device_status_service] = lambda: device_status_service_mock
+
+    response = test_client.get(f'/v1/locations/status?location_ids={location.location_id}')
+
+    assert response.status_code == response_code
+
+
+def test_get_locations_status_success_response(
+    admin_all_access_token_data: AccessTokenData,
+    device_status_service_mock: Mock,
+    location: Location
+):
+    app.dependency_overrides[get_access_token_data] = lambda: admin_all_access_token_data
+    last_seen = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    other_location_id = uuid4()
+    device_status_service_mock.get_location_statuses.return_value = {
+        location.location_id: LocationStatus(
+            devices={
+                'device-1': DeviceStatus(status='online', last_seen=last_seen, signal_strength=4),
+                'device-2': None,
+            },
+            gateways={
+                'gateway-1': GatewayStatus(status='offline', last_seen=last_seen),
+            }
+        ),
+        other_location_id: LocationStatus(devices={}, gateways={}),
+    }
+    app.dependency_overrides[get_device_status_service] = lambda: device_status_service_mock
+
+    response = test_client.get(
+        '/v1/locations/status',
+        params={'location_ids': [str(location.location_id), str(other_location_id), str(location.location_id)]}
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    device_status_service_mock.get_location_statuses.assert_called_once_with([location.location_id, other_location_id])
+    assert response.json() == {
+        str(location.location_id): {
+            'devices': {
+                'device-1': {'status': 'online', 'last_seen': '2025-01-01T00:00:00Z', 'signal_strength': 4},
+                'device-2': None,
+            },
+            'gateways': {
+                'gateway-1': {'status': 'offline', 'last_seen': '2025-01-01T00:00:00Z'},
+            }
+        },
+        str(other_location_id): {'devices': {}, 'gateways': {}},
+    }
+
+
+def test_get_locations_status_when_location_is_unauthorized(
+    token_data_with_access_scopes: Callable,
+    device_status_service_mock: Mock,
+    user_access_grants_helper_mock: Mock
+):
+    token_data = token_data_with_access_scopes([AccessScope.LOCATIONS_READ])
+    app.dependency_overrides[get_access_token_data] = lambda: token_data
+    user_access_grants_helper_mock.is_user_authorized_for_location_read.return_value = False
+    app.dependency_overrides[get_device_status_service] = lambda: device_status_service_mock
+
+    response = test_client.get(f'/v1/locations/status?location_ids={uuid4()}')
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    device_status_service_mock.get_location_statuses.assert_not_called()
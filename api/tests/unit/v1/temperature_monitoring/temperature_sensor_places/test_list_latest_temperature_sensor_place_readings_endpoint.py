@@ -0,0 +1,101 @@
+from datetime import datetime, timezone
+from typing import Callable, List
+from unittest.mock import Mock
+from uuid import uuid4
+
+import pytest
+
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.v1.dependencies import get_temperature_sensor_places_service, get_temperature_sensor_place_readings_service, get_access_token_data
+from app.v1.locations.schemas.location import Location
+from app.v1.temperature_monitoring.schemas.temperature_sensor_place import TemperatureSensorPlace
+from app.v1.temperature_monitoring.schemas.temperature_sensor_place_reading import TemperatureSensorPlaceReading
+from app.v1.temperature_monitoring.services.temperature_sensor_place_readings import TemperatureSensorPlaceReadingsService
+from app.v1.schemas import AccessScope, AccessTokenData
+
+
+test_client = TestClient(app)
+
+
+@pytest.fixture
+def temperature_sensor_place_readings_service_mock():
+    return Mock(spec_set=TemperatureSensorPlaceReadingsService)
+
+
+def test_list_latest_temperature_sensor_place_readings_is_unauthorized_without_token():
+    app.dependency_overrides[get_access_token_data] = get_access_token_data
+    response = test_client.get(f'/v1/temperature-sensor-places/latest-readings?location_id={uuid4()}')
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.parametrize(
+    ('access_scopes', 'response_code'),
+    [
+        ([AccessScope.ADMIN], status.HTTP_403_FORBIDDEN),
+        ([AccessScope.TEMPERATURE_MONITORING_WRITE], status.HTTP_403_FORBIDDEN),
+        ([AccessScope.TEMPERATURE_MONITORING_READ], status.HTTP_200_OK),
+        ([], status.HTTP_403_FORBIDDEN),
+    ]
+)
+def test_list_latest_temperature_sensor_place_readings_access_scopes(
+    access_scopes: List[AccessScope],
+    response_code: int,
+    token_data_with_access_scopes: Callable,
+    temperature_sensor_places_service_mock: Mock,
+    temperature_sensor_place_readings_service_mock: Mock,
+    temperature_sensor_place: TemperatureSensorPlace,
+    location: Location
+):
+    token_data = token_data_with_access_scopes(access_scopes)
+    app.dependency_overrides[get_access_token_data] = lambda: token_data
+
+    temperature_sensor_places_service_mock.filter_by.return_value = [temperature_sensor_place,]
+    app.dependency_overrides[get_temperature_sensor_places_service] = lambda: temperature_sensor_places_service_mock
+    temperature_sensor_place_readings_service_mock.get_latest_activity_for_temperature_sensor_places.return_value = {}
+    app.dependency_overrides[get_temperature_sensor_place_readings_service] = lambda: temperature_sensor_place_readings_service_mock
+
+    response = test_client.get(f'/v1/temperature-sensor-places/latest-readings?location_id={location.location_id}')
+
+    assert response.status_code == response_code
+
+
+def test_list_latest_temperature_sensor_place_readings_success_response(
+    admin_all_access_token_data: AccessTokenData,
+    temperature_sensor_places_service_mock: Mock,
+    temperature_sensor_place_readings_service_mock: Mock,
+    temperature_sensor_place: TemperatureSensorPlace,
+    location: Location
+):
+    app.dependency_overrides[get_access_token_data] = lambda: admin_all_access_token_data
+
+    temperature_sensor_place_without_reading = temperature_sensor_place.model_copy(update={'temperature_sensor_place_id': uuid4()})
+    temperature_sensor_places_service_mock.filter_by.return_value = [temperature_sensor_place, temperature_sensor_place_without_reading]
+    app.dependency_overrides[get_temperature_sensor_places_service] = lambda: temperature_sensor_places_service_mock
+
+    reading = TemperatureSensorPlaceReading(
+        temperature_sensor_place_id=temperature_sensor_place.temperature_sensor_place_id,
+        temperature_c=4.5,
+        battery_percentage=87,
+        created_at=datetime(2025, 1, 1, tzinfo=timezone.utc)
+    )
+    temperature_sensor_place_readings_service_mock.get_latest_activity_for_temperature_sensor_places.return_value = {
+        temperature_sensor_place.temperature_sensor_place_id: reading,
+        temperature_sensor_place_without_reading.temperature_sensor_place_id: None,
+    }
+    app.dependency_overrides[get_temperature_sensor_place_readings_service] = lambda: temperature_sensor_place_readings_service_mock
+
+    response = test_client.get(f'/v1/temperature-sensor-places/latest-readings?location_id={location.location_id}')
+
+    assert response.status_code == status.HTTP_200_OK
+    temperature_sensor_place_readings_service_mock.get_latest_activity_for_temperature_sensor_places.assert_called_once_with(
+        [temperature_sensor_place.temperature_sensor_place_id, temperature_sensor_place_without_reading.temperature_sensor_place_id]
+    )
+    assert response.json() == [{
+        'temperature_sensor_place_id': str(temperature_sensor_place.temperature_sensor_place_id),
+        'temperature_c': 4.5,
+        'battery_percentage': 87,
+        'created_at': '2025-01-01T00:00:00Z'
+    }]
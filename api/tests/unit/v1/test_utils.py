@@ -1,4 +1,7 @@
-from app.v1.utils import hash_password, verify_password
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from app.v1.utils import hash_password, local_day_window, verify_password
 
 def test_hash_password_returns_hashed_password():
     password_hash = hash_password('password')
@@ -22,3 +25,15 @@ def test_verify_password_returns_false_for_incorrect_password():
     password = 'password'
     password_hash = hash_password(password)
     assert verify_password('incorrect_password', password_hash) is False
+
+
+def test_local_day_window_follows_dst_fall_back():
+    # DST ends on November 1st 2026 in New York, so that day lasts 25 hours
+    tz = ZoneInfo('America/New_York')
+    windows = [local_day_window(date(2026, 10, 31) + timedelta(days=days), tz) for days in range(3)]
+
+    assert windows[1] == (
+        datetime(2026, 11, 1, 4, tzinfo=timezone.utc),
+        datetime(2026, 11, 2, 5, tzinfo=timezone.utc) - timedelta(microseconds=1)
+    )
+    assert all(previous[1] + timedelta(microseconds=1) == current[0] for previous, current in zip(windows, windows[1:]))
@@ -0,0 +1,45 @@
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.v1.timestream.columns import ColumnType, decode_columns
+
+
+def test_decode_columns_types_each_column():
+    circuit_id = uuid4()
+    rows = [
+        [str(circuit_id), '2024-03-12 10:00:00.000000000', '1.5', '3', 'true'],
+        [str(circuit_id), '2024-03-12 10:10:00.000000000', '2.5', '4', 'false'],
+    ]
+
+    circuit_ids, starts, kwhs, counts, flags = decode_columns(
+        rows,
+        [ColumnType.UUID, ColumnType.TIMESTAMP, ColumnType.DOUBLE, ColumnType.BIGINT, ColumnType.BOOLEAN]
+    )
+
+    assert circuit_ids == [circuit_id, circuit_id]
+    assert starts == [datetime(2024, 3, 12, 10, tzinfo=timezone.utc), datetime(2024, 3, 12, 10, 10, tzinfo=timezone.utc)]
+    assert kwhs == [1.5, 2.5]
+    assert counts == [3, 4]
+    assert flags == [True, False]
+
+
+def test_decode_columns_decodes_repeated_values_once():
+    rows = [[str(uuid4()), '2024-03-12 10:00:00.000000000'] for _ in range(3)]
+
+    columns = decode_columns(rows, [ColumnType.UUID, ColumnType.TIMESTAMP])
+
+    assert len(columns) == 3
+    assert len({id(start) for start in columns[1]}) == 1
+    assert all(isinstance(circuit_id, UUID) for circuit_id in columns[0])
+    assert list(columns.rows())[0] == (UUID(rows[0][0]), datetime(2024, 3, 12, 10, tzinfo=timezone.utc))
+
+
+def test_decode_columns_of_no_rows():
+    assert list(decode_columns([], [ColumnType.UUID, ColumnType.DOUBLE])) == [[], []]
+
+
+def test_decode_columns_rejects_rows_of_other_width():
+    with pytest.raises(ValueError):
+        decode_columns([['a', '1.0']], [ColumnType.VARCHAR])
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional
+
+from app.v1.timestream.downsampling import buckets, lttb
+
+
+class Point(NamedTuple):
+    timestamp: datetime
+    value: Optional[float]
+
+
+def _points(values) -> list:
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [Point(start + timedelta(minutes=10 * index), value) for index, value in enumerate(values)]
+
+
+def _lttb(points, max_points):
+    return lttb(points, max_points, x=lambda point: point.timestamp, y=lambda point: point.value)
+
+
+def test_lttb_keeps_short_series_untouched():
+    points = _points([1.0, 2.0, 3.0])
+
+    assert _lttb(points, 3) == points
+
+
+def test_lttb_keeps_ends_and_peaks():
+    values = [0.0] * 100
+    values[37] = 50.0
+    values[71] = -20.0
+    points = _points(values)
+
+    downsampled = _lttb(points, 10)
+
+    assert len(downsampled) == 10
+    assert downsampled[0] == points[0]
+    assert downsampled[-1] == points[-1]
+    assert points[37] in downsampled
+    assert points[71] in downsampled
+    assert downsampled == sorted(downsampled, key=lambda point: point.timestamp)
+
+
+def test_lttb_keeps_gap_markers_and_does_not_sample_across_them():
+    points = _points([float(index % 7) for index in range(50)] + [None, None] + [float(index % 5) for index in range(50)])
+
+    downsampled = _lttb(points, 20)
+
+    assert len(downsampled) <= 20
+    assert [point for point in downsampled if point.value is None] == points[50:52]
+    # Each run keeps its own ends, so the line stops and resumes right at the gap
+    assert {points[0], points[49], points[52], points[101]} <= set(downsampled)
+
+
+def test_lttb_fits_max_points_with_many_gaps():
+    points = _points([None if index % 5 == 4 else float(index) for index in range(100)])
+
+    downsampled = _lttb(points, 10)
+
+    assert len(downsampled) <= 10
+    assert downsampled[0].value is not None
+    # No two kept values are more than a run apart without a marker between them
+    for previous, current in zip(downsampled, downsampled[1:]):
+        if previous.value is not None and current.value is not None:
+            assert current.timestamp - previous.timestamp < timedelta(minutes=50)
+    assert all(
+        previous.value is not None or current.value is not None
+        for previous, current in zip(downsampled, downsampled[1:])
+    )
+
+
+def test_buckets_splits_in_consecutive_runs():
+    assert buckets([1, 2, 3], 5) == [[1], [2], [3]]
+    assert buckets(list(range(10)), 4) == [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9]]
@@ -0,0 +1,47 @@
+from datetime import datetime
+from typing import List, Optional
+
+from app.v1.timestream.schemas.electric_sensor_voltages import ElectricSensorVoltages
+from app.v1.timestream.services.electric_sensor_voltages_service import TimestreamElectricSensorVoltagesService
+
+
+class _FakeTimestreamClient:
+    def __init__(self, rows: List[List[str]]) -> None:
+        self.rows = rows
+        self.queries: List[str] = []
+
+    def query(self, query: str, window_end: Optional[datetime] = None) -> List[List[str]]:
+        self.queries.append(query)
+        return self.rows
+
+
+def _normalized(query: str) -> str:
+    return ' '.join(query.split())
+
+
+def test_get_latest_pes_voltages_aggregates_latest_voltages_per_sensor():
+    client = _FakeTimestreamClient([
+        ['duid-1', '120.5', '121', '119.75'],
+        ['duid-2', '277', '276.5', '278'],
+    ])
+    service = TimestreamElectricSensorVoltagesService('electricity', 'pes', client)
+
+    voltages = service.get_latest_pes_voltages_for_electric_sensors(['duid-1', 'duid-2'])
+
+    assert voltages == [
+        ElectricSensorVoltages(sensor_duid='duid-1', volt_A=120.5, volt_B=121.0, volt_C=119.75),
+        ElectricSensorVoltages(sensor_duid='duid-2', volt_A=277.0, volt_B=276.5, volt_C=278.0),
+    ]
+    query = _normalized(client.queries[0])
+    assert 'MAX_BY(volt_A, time) AS volt_A, MAX_BY(volt_B, time) AS volt_B, MAX_BY(volt_C, time) AS volt_C' in query
+    assert 'FROM "electricity"."pes"' in query
+    assert "WHERE measure_name in ('duid-1','duid-2') AND time > ago(1h)" in query
+    assert query.endswith('GROUP BY measure_name')
+
+
+def test_get_latest_pes_voltages_does_not_query_without_sensors():
+    client = _FakeTimestreamClient([])
+    service = TimestreamElectricSensorVoltagesService('electricity', 'pes', client)
+
+    assert service.get_latest_pes_voltages_for_electric_sensors([]) == []
+    assert client.queries == []
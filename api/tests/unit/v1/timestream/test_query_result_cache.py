@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.px.pxmetrics import PxMetrics
+from app.v1.cache.in_memory_cache import InMemoryCache
+from app.v1.timestream.query_result_cache import TimestreamQueryResultCache, normalize_query
+
+
+_NOW = datetime(2024, 3, 12, 12, tzinfo=timezone.utc)
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _Query:
+    def __init__(self, rows) -> None:
+        self.rows = rows
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.rows
+
+
+@pytest.fixture
+def clock() -> _Clock:
+    return _Clock()
+
+
+@pytest.fixture
+def metrics() -> PxMetrics:
+    return PxMetrics()
+
+
+@pytest.fixture
+def result_cache(clock, metrics) -> TimestreamQueryResultCache:
+    return TimestreamQueryResultCache(
+        InMemoryCache(clock=clock),
+        settle_delay=timedelta(minutes=15),
+        closed_ttl_seconds=3600,
+        open_ttl_seconds=60,
+        clock=lambda: _NOW,
+        metrics=metrics,
+    )
+
+
+def test_normalize_query_makes_equivalent_queries_equal():
+    assert normalize_query("SELECT *\n  FROM t WHERE sensor IN ('b', 'a')") == normalize_query("SELECT * FROM t WHERE sensor in ('a','b')")
+    assert normalize_query("SELECT * FROM t WHERE sensor = 'A'") != normalize_query("SELECT * FROM t WHERE sensor = 'a'")
+
+
+def test_keeps_closed_windows_long_term(result_cache, clock, metrics):
+    query = _Query([['a', '1.0'], ['b', None]])
+
+    assert result_cache.get_or_query('fingerprint', _NOW - timedelta(hours=1), query) == [['a', '1.0'], ['b', None]]
+    clock.now += 3599
+    assert result_cache.get_or_query('fingerprint', _NOW - timedelta(hours=1), query) == [['a', '1.0'], ['b', None]]
+    assert query.calls == 1
+    assert metrics.snapshot()['counters']['timestream.result_cache.closed.hit'] == 1
+    assert metrics.snapshot()['counters']['timestream.result_cache.bytes_saved'] == len('[["a","1.0"],["b",null]]')
+
+
+def test_keeps_open_windows_briefly(result_cache, clock):
+    query = _Query([['a', '1.0']])
+
+    result_cache.get_or_query('fingerprint', _NOW - timedelta(minutes=5), query)
+    clock.now += 59
+    result_cache.get_or_query('fingerprint', _NOW - timedelta(minutes=5), query)
+    assert query.calls == 1
+    clock.now += 2
+    result_cache.get_or_query('fingerprint', _NOW - timedelta(minutes=5), query)
+    assert query.calls == 2
+
+
+def test_does_not_cache_queries_without_window_end(result_cache):
+    query = _Query([['a', '1.0']])
+
+    result_cache.get_or_query('fingerprint', None, query)
+    result_cache.get_or_query('fingerprint', None, query)
+    assert query.calls == 2
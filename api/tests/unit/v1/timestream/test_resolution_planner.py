@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta, timezone
+
+from app.v1.timestream.resolution_planner import BinPlan, OffsetChange, TimestreamResolutionPlanner
+
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def test_plan_keeps_finest_bins_for_short_windows():
+    planner = TimestreamResolutionPlanner(max_points_per_series=1500)
+
+    assert planner.plan(START, START + timedelta(days=7)) == BinPlan(timedelta(minutes=10))
+
+
+def test_plan_coarsens_bins_to_fit_the_point_budget():
+    planner = TimestreamResolutionPlanner(max_points_per_series=1500)
+
+    assert planner.plan(START, START + timedelta(days=30)).size == timedelta(minutes=30)
+    assert planner.plan(START, START + timedelta(days=90)).size == timedelta(hours=2)
+    # Bins stop growing at max_bin_size, even if the budget is exceeded
+    assert planner.plan(START, START + timedelta(days=365)).size == timedelta(hours=2)
+    assert planner.plan(START, START + timedelta(days=365), max_bin_size=timedelta(days=1)).size == timedelta(hours=6)
+
+
+def test_plan_aligns_bins_to_local_time():
+    planner = TimestreamResolutionPlanner(max_points_per_series=1500)
+
+    assert planner.fixed(timedelta(days=1), START, START, 'America/New_York') == BinPlan(timedelta(days=1), timedelta(hours=19))
+    assert planner.fixed(timedelta(hours=1), START, START, 'Asia/Kolkata') == BinPlan(timedelta(hours=1), timedelta(minutes=30))
+    # Whole hour offsets do not shift hourly bins
+    assert planner.fixed(timedelta(hours=1), START, START, 'America/New_York') == BinPlan(timedelta(hours=1))
+
+
+def test_bin_expression():
+    assert BinPlan(timedelta(minutes=10)).bin() == 'BIN(time, 10m)'
+    assert BinPlan(timedelta(days=1), timedelta(hours=19)).bin() == 'BIN(time + 1140m, 1440m) - 1140m'
+
+
+def test_plan_aligns_bins_to_local_time_across_daylight_saving_changes():
+    planner = TimestreamResolutionPlanner(max_points_per_series=1500)
+    start = datetime(2024, 3, 1, 5, tzinfo=timezone.utc)
+    end = datetime(2024, 11, 30, 5, tzinfo=timezone.utc)
+
+    plan = planner.fixed(timedelta(days=1), start, end, 'America/New_York')
+
+    # The days the clocks change last 23 and 25 hours, from local midnight to local midnight
+    assert plan == BinPlan(timedelta(days=1), timedelta(hours=19), (
+        OffsetChange(
+            datetime(2024, 3, 10, 5, tzinfo=timezone.utc),
+            datetime(2024, 3, 11, 4, tzinfo=timezone.utc),
+            timedelta(hours=20)
+        ),
+        OffsetChange(
+            datetime(2024, 11, 3, 4, tzinfo=timezone.utc),
+            datetime(2024, 11, 4, 5, tzinfo=timezone.utc),
+            timedelta(hours=19)
+        ),
+    ))
+    assert not plan.aligned_to_epoch
+    # Changes of whole hours do not shift hourly bins
+    assert planner.fixed(timedelta(hours=1), start, end, 'America/New_York') == BinPlan(timedelta(hours=1))
+    # Nor does a window without a change
+    assert planner.fixed(timedelta(days=1), START, START + timedelta(days=7), 'America/New_York').changes == ()
+
+
+def test_bin_expression_across_an_offset_change():
+    plan = BinPlan(timedelta(days=1), timedelta(hours=19), (
+        OffsetChange(
+            datetime(2024, 3, 10, 5, tzinfo=timezone.utc),
+            datetime(2024, 3, 11, 4, tzinfo=timezone.utc),
+            timedelta(hours=20)
+        ),
+    ))
+
+    assert plan.bin() == (
+        "CASE WHEN time < from_iso8601_timestamp('2024-03-10T05:00:00Z') THEN BIN(time + 1140m, 1440m) - 1140m"
+        " WHEN time < from_iso8601_timestamp('2024-03-11T04:00:00Z') THEN from_iso8601_timestamp('2024-03-10T05:00:00Z')"
+        " ELSE BIN(time + 1200m, 1440m) - 1200m END"
+    )
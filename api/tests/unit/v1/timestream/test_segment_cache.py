@@ -0,0 +1,113 @@
+import re
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Sequence
+
+import pytest
+
+from app.px.pxmetrics import PxMetrics
+from app.v1.cache.in_memory_cache import InMemoryCache
+from app.v1.timestream.segment_cache import TimestreamSegmentCache
+
+
+_NOW = datetime(2024, 3, 12, 11, 5, tzinfo=timezone.utc)
+_BETWEEN = re.compile(r"time BETWEEN '([^']+)' AND '([^']+)'")
+
+
+def _bin(value: datetime) -> str:
+    return value.strftime('%Y-%m-%d %H:%M:%S.000000000')
+
+
+class _FakeTimestreamClient:
+    """Answers queries from in-memory hourly bins, honouring their time conditions."""
+
+    def __init__(self, series: Sequence[str]) -> None:
+        self.rows = [
+            [series_name, _bin(datetime(2024, 3, 1, tzinfo=timezone.utc) + timedelta(hours=hour)), str(hour)]
+            for series_name in series
+            for hour in range(12 * 24)
+        ]
+        self.queries: List[str] = []
+
+    def query(self, query: str, window_end: Optional[datetime] = None) -> List[List[str]]:
+        self.queries.append(query)
+        ranges = [(datetime.fromisoformat(start), datetime.fromisoformat(end)) for start, end in _BETWEEN.findall(query)]
+        return [
+            row for row in self.rows
+            if row[0] in query and any(start <= datetime.fromisoformat(row[1][:19] + '+00:00') <= end for start, end in ranges)
+        ]
+
+
+def _build_query(measure_names: Sequence[str], time_condition: str) -> str:
+    return f"SELECT measure_name, BIN(time, 1h) FROM t WHERE measure_name IN ({','.join(repr(name) for name in measure_names)}) AND {time_condition}"
+
+
+@pytest.fixture
+def segment_cache() -> TimestreamSegmentCache:
+    return TimestreamSegmentCache(InMemoryCache(), clock=lambda: _NOW, metrics=PxMetrics())
+
+
+def _query(segment_cache, client, series, start, end, bin_size=timedelta(hours=1)):
+    return segment_cache.query(
+        client,
+        _build_query,
+        series=series,
+        start_datetime=start,
+        end_datetime=end,
+        bin_size=bin_size,
+        row_series=lambda row: row[0],
+        sort_key=lambda row: (row[0], row[1])
+    )
+
+
+def test_serves_closed_segments_from_cache(segment_cache):
+    client = _FakeTimestreamClient(['a', 'b'])
+    start = datetime(2024, 3, 5, 10, 30, tzinfo=timezone.utc)
+    # Days are not made of 7 minute bins, so this one is a single query over the whole window
+    expected = _query(segment_cache, _FakeTimestreamClient(['a', 'b']), ['a', 'b'], start, _NOW, bin_size=timedelta(minutes=7))
+
+    assert _query(segment_cache, client, ['a', 'b'], start, _NOW) == expected
+    assert _query(segment_cache, client, ['a', 'b'], start, _NOW) == expected
+    # The second query only reads the partial first day and the current day
+    assert _BETWEEN.findall(client.queries[-1]) == [
+        (str(start), '2024-03-05 23:59:59.999999+00:00'),
+        ('2024-03-12 00:00:00+00:00', str(_NOW)),
+    ]
+
+
+def test_only_queries_segments_missing_for_some_series(segment_cache):
+    client = _FakeTimestreamClient(['a', 'b'])
+    start = datetime(2024, 3, 5, tzinfo=timezone.utc)
+    _query(segment_cache, client, ['a'], start, datetime(2024, 3, 8, tzinfo=timezone.utc) - timedelta(microseconds=1))
+
+    rows = _query(segment_cache, client, ['a', 'b'], start, datetime(2024, 3, 9, tzinfo=timezone.utc) - timedelta(microseconds=1))
+
+    assert len(rows) == 2 * 4 * 24
+    assert _BETWEEN.findall(client.queries[-1]) == [('2024-03-05 00:00:00+00:00', '2024-03-08 23:59:59.999999+00:00')]
+    _query(segment_cache, client, ['b'], start, datetime(2024, 3, 9, tzinfo=timezone.utc) - timedelta(microseconds=1))
+    assert len(client.queries) == 2
+
+
+def test_queries_whole_window_when_nothing_is_closed(segment_cache):
+    client = _FakeTimestreamClient(['a'])
+    start = datetime(2024, 3, 11, 12, tzinfo=timezone.utc)
+
+    rows = _query(segment_cache, client, ['a'], start, _NOW)
+
+    assert len(rows) == 24
+    assert _BETWEEN.findall(client.queries[-1]) == [(str(start), str(_NOW))]
+
+
+def test_segments_without_rows_expire_sooner():
+    cache_now = [0.0]
+    segment_cache = TimestreamSegmentCache(InMemoryCache(clock=lambda: cache_now[0]), clock=lambda: _NOW, metrics=PxMetrics())
+    client = _FakeTimestreamClient(['a'])
+    start = datetime(2024, 3, 5, tzinfo=timezone.utc)
+    end = datetime(2024, 3, 6, tzinfo=timezone.utc) - timedelta(microseconds=1)
+    _query(segment_cache, client, ['a', 'b'], start, end)
+
+    cache_now[0] = timedelta(hours=1).total_seconds()
+    _query(segment_cache, client, ['a'], start, end)
+    assert len(client.queries) == 1
+    # The empty segment of 'b' expired while the one of 'a' is still cached
+    _query(segment_cache, client, ['b'], start, end)
+    assert len(client.queries) == 2
@@ -0,0 +1,141 @@
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from app.v1.cache.in_memory_cache import InMemoryCache
+from app.v1.cache.single_flight_cache import SingleFlightCache
+from app.v1.timestream.timestream_client import TimestreamClient
+
+
+@pytest.fixture
+def timestream_client() -> TimestreamClient:
+    return TimestreamClient(query_client=Mock(), max_workers=4, max_concurrency_per_fan_out=2)
+
+
+def test_fan_out_runs_calls_concurrently(timestream_client):
+    barrier = threading.Barrier(2, timeout=5)
+
+    def call(value: int) -> int:
+        # Only returns once both calls are running at the same time
+        barrier.wait()
+        return value
+
+    with timestream_client.fan_out() as fan_out:
+        first = fan_out.submit(lambda: call(1))
+        second = fan_out.submit(lambda: call(2))
+
+    assert (first.result(), second.result()) == (1, 2)
+
+
+def test_fan_out_caps_concurrency(timestream_client):
+    lock = threading.Lock()
+    running = 0
+    max_running = 0
+
+    def call() -> None:
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        threading.Event().wait(0.01)
+        with lock:
+            running -= 1
+
+    with timestream_client.fan_out() as fan_out:
+        futures = [fan_out.submit(call) for _ in range(6)]
+
+    assert all(future.done() for future in futures)
+    assert max_running == 2
+
+
+def test_fan_out_surfaces_failures_per_call(timestream_client):
+    def fail() -> int:
+        raise RuntimeError('failed')
+
+    with timestream_client.fan_out() as fan_out:
+        failed = fan_out.submit(fail)
+        succeeded = fan_out.submit(lambda: 1)
+
+    with pytest.raises(RuntimeError):
+        failed.result()
+    assert succeeded.result() == 1
+
+
+def test_query_coalesces_identical_concurrent_queries(timestream_client):
+    started = threading.Event()
+    release = threading.Event()
+
+    def paginate(QueryString: str):
+        started.set()
+        release.wait(timeout=5)
+        return [{'Rows': [{'Data': [{'ScalarValue': '1.0'}]}]}]
+
+    timestream_client.query_client.get_paginator.return_value.paginate.side_effect = paginate
+
+    with timestream_client.fan_out() as fan_out:
+        first = fan_out.submit(lambda: timestream_client.query('SELECT 1  FROM t'))
+        started.wait(timeout=5)
+        second = fan_out.submit(lambda: timestream_client.query('SELECT 1\n FROM t'))
+        # Give the second query the time to join the first one
+        threading.Event().wait(0.1)
+        release.set()
+
+    assert first.result() == second.result() == [['1.0']]
+    assert timestream_client.query_client.get_paginator.return_value.paginate.call_count == 1
+
+    # Queries that are not in flight anymore are run again
+    assert timestream_client.query('SELECT 1 FROM t') == [['1.0']]
+    assert timestream_client.query_client.get_paginator.return_value.paginate.call_count == 2
+
+
+def test_query_shares_results_across_workers_through_shared_cache():
+    query_client = Mock()
+    query_client.get_paginator.return_value.paginate.return_value = [{'Rows': [{'Data': [{'ScalarValue': 'a'}]}]}]
+    shared_cache = SingleFlightCache(InMemoryCache())
+    workers = [TimestreamClient(query_client=query_client, shared_cache=shared_cache) for _ in range(2)]
+
+    assert [worker.query('SELECT a FROM t') for worker in workers] == [[['a']], [['a']]]
+    assert query_client.get_paginator.return_value.paginate.call_count == 1
+
+
+def _page(*values: str) -> dict:
+    return {'Rows': [{'Data': [{'ScalarValue': value}]} for value in values]}
+
+
+def test_iter_query_prefetches_next_page_while_current_one_is_processed(timestream_client):
+    fetched = []
+    prefetched = threading.Event()
+
+    def paginate(QueryString: str):
+        for page in (_page('1', '2'), _page('3')):
+            fetched.append(page)
+            if len(fetched) == 2:
+                prefetched.set()
+            yield page
+
+    timestream_client.query_client.get_paginator.return_value.paginate.side_effect = paginate
+
+    pages = timestream_client.iter_query('SELECT v FROM t')
+    assert next(pages) == [['1'], ['2']]
+    # The second page is fetched before the caller asks for it
+    assert prefetched.wait(timeout=5)
+    assert list(pages) == [[['3']]]
+
+
+def test_iter_query_stops_on_empty_timeseries(timestream_client):
+    def paginate(QueryString: str):
+        yield _page('1')
+        raise Exception('At least two points are required in the timeseries')
+
+    timestream_client.query_client.get_paginator.return_value.paginate.side_effect = paginate
+
+    assert list(timestream_client.iter_query('SELECT v FROM t', prefetch=False)) == [[['1']]]
+    assert list(timestream_client.iter_query('SELECT v FROM t')) == [[['1']]]
+
+
+def test_iter_query_raises_other_errors(timestream_client):
+    timestream_client.query_client.get_paginator.return_value.paginate.side_effect = RuntimeError('throttled')
+
+    with pytest.raises(RuntimeError):
+        list(timestream_client.iter_query('SELECT v FROM t'))
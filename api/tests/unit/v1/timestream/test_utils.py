@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional
+from zoneinfo import ZoneInfo
+
+from dateutil.relativedelta import relativedelta
+
+from app.v1.timestream.utils import generate_intervals, group_series, mark_gaps, series_with_gaps
+
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class Reading(NamedTuple):
+    series: str
+    timestamp: datetime
+    value: float
+
+
+class Point(NamedTuple):
+    timestamp: datetime
+    value: Optional[float]
+
+
+def test_group_series_groups_unsorted_readings():
+    readings = [
+        Reading('b', START + timedelta(minutes=10), 2.0),
+        Reading('a', START, 1.0),
+        Reading('b', START, 3.0),
+    ]
+
+    assert group_series(readings, key=lambda reading: reading.series, timestamp=lambda reading: reading.timestamp) == {
+        'b': [readings[2], readings[0]],
+        'a': [readings[1]],
+    }
+
+
+def test_mark_gaps_inserts_none_points_around_gaps():
+    timestamps = [START, START + timedelta(hours=1), START + timedelta(hours=6), START + timedelta(hours=7)]
+
+    assert mark_gaps(timestamps, [1.0, 2.0, 3.0, 4.0], Point) == [
+        Point(timestamps[0], 1.0),
+        Point(timestamps[1], 2.0),
+        Point(timestamps[1] + timedelta(seconds=1), None),
+        Point(timestamps[2] - timedelta(seconds=1), None),
+        Point(timestamps[2], 3.0),
+        Point(timestamps[3], 4.0),
+    ]
+
+
+def test_mark_gaps_uses_gap_threshold():
+    timestamps = [START, START + timedelta(hours=1)]
+
+    assert mark_gaps(timestamps, [1.0, 2.0], Point) == [Point(timestamps[0], 1.0), Point(timestamps[1], 2.0)]
+    assert len(mark_gaps(timestamps, [1.0, 2.0], Point, gap_threshold=timedelta(minutes=30))) == 4
+
+
+def test_series_with_gaps_marks_gaps_per_series():
+    readings = [
+        Reading('a', START, 1.0),
+        Reading('b', START, 1.0),
+        Reading('a', START + timedelta(hours=5), 2.0),
+        Reading('b', START + timedelta(hours=1), 2.0),
+    ]
+
+    series = series_with_gaps(
+        readings,
+        key=lambda reading: reading.series,
+        timestamp=lambda reading: reading.timestamp,
+        value=lambda reading: reading.value,
+        point=Point
+    )
+
+    assert [point.value for point in series['a']] == [1.0, None, None, 2.0]
+    assert [point.value for point in series['b']] == [1.0, 2.0]
+
+
+def test_generate_intervals_ends_last_interval_at_period_end():
+    intervals = generate_intervals(START, START + timedelta(minutes=25), relativedelta(minutes=10))
+
+    assert list(intervals) == [
+        (START, START + timedelta(minutes=10, microseconds=-1)),
+        (START + timedelta(minutes=10), START + timedelta(minutes=20, microseconds=-1)),
+        (START + timedelta(minutes=20), START + timedelta(minutes=25)),
+    ]
+
+
+def test_generate_intervals_is_lazy():
+    intervals = generate_intervals(START, START + timedelta(days=10_000), relativedelta(minutes=1))
+
+    assert next(intervals) == (START, START + timedelta(minutes=1, microseconds=-1))
+
+
+def test_generate_intervals_follows_local_days_across_dst():
+    # DST starts on March 10th in New York, so that day lasts 23 hours
+    period_start = datetime(2024, 3, 9, 5, tzinfo=timezone.utc)
+
+    starts = [
+        start
+        for start, _ in generate_intervals(period_start, period_start + timedelta(days=3), relativedelta(days=1), tz=ZoneInfo('America/New_York'))
+    ]
+
+    assert starts == [
+        period_start,
+        datetime(2024, 3, 10, 5, tzinfo=timezone.utc),
+        datetime(2024, 3, 11, 4, tzinfo=timezone.utc),
+        datetime(2024, 3, 12, 4, tzinfo=timezone.utc),
+    ]
+
+
+def test_generate_intervals_steps_calendar_months():
+    period_start = datetime(2024, 1, 31, tzinfo=timezone.utc)
+
+    starts = [start for start, _ in generate_intervals(period_start, datetime(2024, 4, 1, tzinfo=timezone.utc), relativedelta(months=1))]
+
+    assert starts == [period_start, datetime(2024, 2, 29, tzinfo=timezone.utc), datetime(2024, 3, 31, tzinfo=timezone.utc)]